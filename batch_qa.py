@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Batch question answering for bulk offline workloads
+
+Reads questions as JSON Lines (the same shape as requests.jsonl:
+request_id, title, body - or just request_id and question), retrieves
+context for them in batches, fans the LLM calls out with bounded
+concurrency and yields NDJSON-ready results as they complete. Completed
+results are appended to a checkpoint file so an interrupted run resumes
+where it stopped.
+
+Usage:
+    python batch_qa.py questions.jsonl --output answers.ndjson
+    python batch_qa.py questions.jsonl --output answers.ndjson --url http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import AsyncIterator, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def parse_questions(lines: Iterable[str]) -> List[dict]:
+    """Parse JSONL question records into {request_id, question}; raises ValueError on bad input"""
+    questions = []
+    seen: Set[str] = set()
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {number}: invalid JSON ({e})")
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {number}: expected a JSON object")
+        question = record.get("question")
+        if not question:
+            question = "\n\n".join(part for part in (record.get("title"), record.get("body")) if part)
+        if not question:
+            raise ValueError(f"Line {number}: needs a question, title or body")
+        request_id = str(record.get("request_id") or record.get("id") or f"line-{number}")
+        if request_id in seen:
+            raise ValueError(f"Line {number}: duplicate request_id {request_id}")
+        seen.add(request_id)
+        questions.append({"request_id": request_id, "question": question})
+    return questions
+
+
+class Checkpoint:
+    """Append-only NDJSON file of completed results, used to skip them on resume"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.completed: Set[str] = set()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        result = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # A line cut short by a crash; that question is simply redone
+                    if result.get("status") == "ok":
+                        self.completed.add(result["request_id"])
+        self._file = open(path, "a", encoding="utf-8")
+
+    def record(self, result: dict):
+        self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self._file.flush()
+        if result.get("status") == "ok":
+            self.completed.add(result["request_id"])
+
+    def close(self):
+        self._file.close()
+
+
+class BatchRunner:
+    """Answers questions with batched retrieval and a bounded number of LLM calls in flight"""
+
+    def __init__(self, client, rag_manager=None, concurrency: int = 8, batch_size: int = 32, limiter=None):
+        self.client = client
+        self.rag_manager = rag_manager
+        self.concurrency = max(1, concurrency)
+        self.batch_size = max(1, batch_size)
+        # The service's AdaptiveLimiter, so batch calls count against the same cap as Slack replies
+        self.limiter = limiter
+
+    async def _retrieve(self, questions: List[dict]) -> List[Optional[str]]:
+        if not self.rag_manager:
+            return [None] * len(questions)
+        return await self.rag_manager.query_documents_batch([q["question"] for q in questions])
+
+    async def _answer(self, question: dict, context: Optional[str]) -> dict:
+        started = time.perf_counter()
+        result = {"request_id": question["request_id"], "question": question["question"]}
+        # Batch work waits for a slot rather than being shed
+        slot = await self.limiter.acquire() if self.limiter else None
+        ok = False
+        try:
+            # answer() raises on failure, so apologies are never recorded (and checkpointed) as answers
+            answer = await self.client.answer(question["question"], "batch", context=context, retrieve=False)
+            result.update(status="ok", answer=answer)
+            ok = True
+        except Exception as e:
+            logger.error(f"Batch question {question['request_id']} failed: {e}")
+            result.update(status="error", error=str(e))
+        finally:
+            if slot is not None:
+                self.limiter.release(slot, ok=ok)
+        result.update(has_context=bool(context), latency_ms=round((time.perf_counter() - started) * 1000, 1))
+        return result
+
+    async def run(self, questions: List[dict], checkpoint: Optional[Checkpoint] = None) -> AsyncIterator[dict]:
+        """Yield results in completion order, skipping questions already in the checkpoint"""
+        pending = [q for q in questions if not checkpoint or q["request_id"] not in checkpoint.completed]
+        results: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+
+        async def answer(question: dict, context: Optional[str]):
+            try:
+                await results.put(await self._answer(question, context))
+            finally:
+                semaphore.release()
+
+        async def produce():
+            try:
+                # Retrieval for the next batch overlaps with LLM calls still running for this one
+                for start in range(0, len(pending), self.batch_size):
+                    batch = pending[start:start + self.batch_size]
+                    contexts = await self._retrieve(batch)
+                    for question, context in zip(batch, contexts):
+                        await semaphore.acquire()
+                        task = asyncio.create_task(answer(question, context))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                await asyncio.gather(*tasks)
+            finally:
+                await results.put(_DONE)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                result = await results.get()
+                if result is _DONE:
+                    break
+                if checkpoint:
+                    checkpoint.record(result)
+                yield result
+            await producer
+        finally:
+            # The consumer went away (e.g. client disconnected): stop outstanding work
+            producer.cancel()
+            for task in list(tasks):
+                task.cancel()
+
+
+async def run_in_process(questions: List[dict], checkpoint: Checkpoint, concurrency: int, batch_size: int,
+                         echo: bool) -> int:
+    import main
+
+    if not main.hypermode_client:
+        raise SystemExit("HYPERMODE_API_KEY is not configured")
+    await main.rag_manager.warm_up()
+    runner = BatchRunner(main.hypermode_client, main.rag_manager, concurrency, batch_size, limiter=main.llm_limiter)
+    count = 0
+    try:
+        async for result in runner.run(questions, checkpoint):
+            if echo:
+                print(json.dumps(result, ensure_ascii=False), flush=True)
+            count += 1
+    finally:
+        await main.hypermode_client.aclose()
+    return count
+
+
+async def run_against_url(questions: List[dict], checkpoint: Checkpoint, url: str, concurrency: int,
+                          batch_size: int, echo: bool) -> int:
+    import httpx
+
+    pending = [q for q in questions if q["request_id"] not in checkpoint.completed]
+    body = "".join(json.dumps(q, ensure_ascii=False) + "\n" for q in pending)
+    count = 0
+    async with httpx.AsyncClient(timeout=None) as client:
+        async with client.stream("POST", f"{url.rstrip('/')}/batch/qa", content=body.encode("utf-8"),
+                                 params={"concurrency": concurrency, "batch_size": batch_size},
+                                 headers={"Content-Type": "application/x-ndjson"}) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if line.strip():
+                    result = json.loads(line)
+                    checkpoint.record(result)
+                    if echo:
+                        print(line, flush=True)
+                    count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of questions against the knowledge base")
+    parser.add_argument("input", help="JSONL with request_id and question (or title/body) per line")
+    parser.add_argument("--output", help="NDJSON results; also the checkpoint for resuming (default: stdout only)")
+    parser.add_argument("--url", help="Use a running server's /batch/qa instead of answering in-process")
+    parser.add_argument("--concurrency", type=int, default=8, help="LLM calls in flight")
+    parser.add_argument("--batch-size", type=int, default=32, help="Questions per retrieval batch")
+    args = parser.parse_args()
+
+    with open(args.input, encoding="utf-8") as f:
+        questions = parse_questions(f)
+    checkpoint = Checkpoint(args.output) if args.output else Checkpoint(os.devnull)
+    remaining = sum(1 for q in questions if q["request_id"] not in checkpoint.completed)
+    print(f"📋 {len(questions)} questions, {len(questions) - remaining} already answered", file=sys.stderr)
+
+    started = time.perf_counter()
+    echo = not args.output
+    try:
+        if args.url:
+            count = asyncio.run(run_against_url(questions, checkpoint, args.url, args.concurrency,
+                                                args.batch_size, echo))
+        else:
+            count = asyncio.run(run_in_process(questions, checkpoint, args.concurrency, args.batch_size, echo))
+    finally:
+        checkpoint.close()
+    print(f"✅ Answered {count} questions in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
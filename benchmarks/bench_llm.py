@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Load test HypermodeClient.generate_response against the mock provider
+
+Runs each latency distribution with hedging off and on and reports
+throughput and latency percentiles.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+# Add the repository root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_llm_server import MockBehavior, MockLLMServer
+from report import print_summary, save_results, summarize
+from hedging import HedgePolicy
+from main import HypermodeClient
+
+DISTRIBUTIONS = {
+    "constant": "0.05",
+    "lognormal": "lognormal:0.05:0.6",
+    "heavy-tail": "tail:0.03:1.0:0.05",
+}
+
+
+async def run_load(client: HypermodeClient, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one(i: int):
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            reply = await client.generate_response(f"benchmark question {i}", "bench", model="gpt-3.5-turbo")
+            latencies.append(time.perf_counter() - started)
+            if reply.startswith("Sorry"):
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    await client.aclose()
+    return summarize(latencies, elapsed, success_rate=round(1 - failures / requests, 3))
+
+
+def run_case(latency: str, hedging: bool, requests: int, concurrency: int) -> dict:
+    with MockLLMServer(MockBehavior(latency=latency, seed=42)) as server:
+        policy = HedgePolicy(enabled=hedging, budget_ratio=0.1)
+        client = HypermodeClient("bench-key", server.base_url, hedging=policy)
+        summary = asyncio.run(run_load(client, requests, concurrency))
+        summary["upstream_calls"] = sum(server.stats.values())
+        if hedging:
+            summary["hedges_fired"] = policy.hedges_fired
+            summary["hedges_won"] = policy.hedges_won
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test generate_response against the mock provider")
+    parser.add_argument("--distribution", choices=sorted(DISTRIBUTIONS), nargs="*", default=sorted(DISTRIBUTIONS))
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--output", help="Where to write JSON results (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    results = {}
+    print("=== LLM Client Benchmark ===")
+    for name in args.distribution:
+        for hedging in (False, True):
+            case = f"{name}[{'hedged' if hedging else 'plain'}]"
+            results[case] = run_case(DISTRIBUTIONS[name], hedging, args.requests, args.concurrency)
+            print_summary(case, results[case])
+
+    print(f"📄 Results saved to {save_results('llm', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
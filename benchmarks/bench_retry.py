@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark HypermodeClient retry behavior under 429/500 storms
+
+Runs the same load against the local stub server with and without the
+retry policy and reports success rate and latency for each.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+# Add the repository root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_llm_server import MockBehavior, MockLLMServer
+from report import print_summary, save_results, summarize
+from main import HypermodeClient
+from retry_policy import RetryPolicy
+
+SCENARIOS = {
+    "429-storm": dict(error_rate=0.5, error_status=429, retry_after=0.2),
+    "500-storm": dict(error_rate=0.3, error_status=500),
+    "brownout": dict(brownout_seconds=0.5, error_status=503),
+}
+
+
+async def run_load(client: HypermodeClient, requests: int, concurrency: int) -> dict:
+    """Send requests through generate_response with bounded concurrency"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    successes = 0
+
+    async def one(i: int):
+        nonlocal successes
+        async with semaphore:
+            started = time.perf_counter()
+            reply = await client.generate_response(f"benchmark question {i}", "bench", model="gpt-3.5-turbo")
+            latencies.append(time.perf_counter() - started)
+            if not reply.startswith("Sorry"):
+                successes += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    await client.aclose()
+    return summarize(latencies, elapsed, success_rate=round(successes / requests, 3))
+
+
+def run_scenario(name: str, retry_policy: RetryPolicy, requests: int, concurrency: int) -> dict:
+    behavior = MockBehavior(latency=0.02, seed=42, **SCENARIOS[name])
+    with MockLLMServer(behavior) as server:
+        client = HypermodeClient("bench-key", server.base_url, retry_policy=retry_policy)
+        result = asyncio.run(run_load(client, requests, concurrency))
+        result["upstream_calls"] = sum(server.stats.values())
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark retry behavior against the stub server")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), nargs="*", default=sorted(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--output", help="Where to write JSON results (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    logging.disable(logging.ERROR)
+    results = {}
+    print("=== Retry Benchmark ===")
+    for name in args.scenario:
+        for label, policy in [
+            ("no-retries", RetryPolicy(max_attempts=1)),
+            ("retry-policy", RetryPolicy(base_delay=0.05, max_delay=1.0, deadline=10.0)),
+        ]:
+            case = f"{name}[{label}]"
+            results[case] = run_scenario(name, policy, args.requests, args.concurrency)
+            results[case]["retries"] = policy.retries
+            results[case]["budget_exhausted"] = policy.budget_exhausted
+            print_summary(case, results[case])
+
+    print(f"📄 Results saved to {save_results('retry', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
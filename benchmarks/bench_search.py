@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for document loading and search across corpus sizes
+
+simple_search over in-process strings is compared with the inverted index
+RAGManager searches in a single worker (alone, and followed by reranking),
+the SQLite FTS5 backend and the shared mmap index used by multi-worker
+deployments. Index build throughput is reported for each index.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add the repository root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report import print_summary, save_results, summarize
+from shared_index import SharedIndexStore
+from fts_index import FTSIndex
+from reranking import Reranker, TwoStageRetriever
+from simple_rag import InvertedIndex, load_document_files, simple_search
+
+VOCABULARY_SIZE = 5000
+QUERIES = [
+    "personal assistant",
+    "how do I deploy this app?",
+    "slack integration setup",
+    "what is the configuration for the API endpoints",
+    "a",
+]
+
+
+def make_corpus(directory: str, documents: int, words_per_document: int = 300, seed: int = 7):
+    """Write a synthetic corpus with a Zipf-like word distribution"""
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(VOCABULARY_SIZE)]
+    # Mix in words the benchmark queries use so searches have matches
+    vocabulary[:12] = ["personal", "assistant", "deploy", "slack", "integration", "setup",
+                       "configuration", "api", "endpoints", "app", "the", "a"]
+    weights = [1.0 / (rank + 1) for rank in range(VOCABULARY_SIZE)]
+    for i in range(documents):
+        words = rng.choices(vocabulary, weights=weights, k=words_per_document)
+        extension = ".md" if i % 2 else ".txt"
+        with open(os.path.join(directory, f"doc{i:06d}{extension}"), "w", encoding="utf-8") as f:
+            f.write(f"# Document {i}\n\n" + " ".join(words))
+
+
+def time_queries(search, iterations: int) -> tuple:
+    latencies = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        query = QUERIES[i % len(QUERIES)]
+        t = time.perf_counter()
+        search(query)
+        latencies.append(time.perf_counter() - t)
+    return latencies, time.perf_counter() - started
+
+
+def postings_memory(index: InvertedIndex) -> dict:
+    """Bytes per posting of the packed postings versus plain per-term Python lists"""
+    postings = index.postings
+    shared_ids = list(range(len(index)))  # Lists built at index time share one int object per document
+    tracemalloc.start()
+    lists = []
+    for term_id in range(len(postings)):
+        doc_ids, freqs = postings.postings(term_id)
+        lists.append(([shared_ids[doc_id] for doc_id in doc_ids], freqs))
+    list_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    count = postings.posting_count
+    return {"postings": count, "compact_bytes_per_posting": round(postings.nbytes / count, 2),
+            "list_bytes_per_posting": round(list_bytes / count, 2),
+            "reduction": round(list_bytes / postings.nbytes, 1)}
+
+
+def bench_corpus(documents: int, iterations: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory, tempfile.TemporaryDirectory() as index_directory:
+        make_corpus(directory, documents)
+
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            files = load_document_files(directory)
+        corpus = [file["text"] for file in files]
+        load_seconds = time.perf_counter() - started
+
+        latencies, elapsed = time_queries(lambda query: simple_search(query, corpus, max_results=3), iterations)
+
+        started = time.perf_counter()
+        inverted = InvertedIndex(corpus)
+        inverted_build_seconds = time.perf_counter() - started
+        inverted_latencies, inverted_elapsed = time_queries(
+            lambda query: inverted.search(query, max_results=3), iterations
+        )
+        # Candidate generation plus reranking, with budgets large enough to never cut a stage short
+        retriever = TwoStageRetriever(inverted, Reranker(files), candidates=20, candidate_budget=10.0,
+                                      rerank_budget=10.0)
+        two_stage_latencies, two_stage_elapsed = time_queries(
+            lambda query: retriever.retrieve(inverted.query_key(query), max_results=3), iterations
+        )
+
+        fts = FTSIndex(os.path.join(index_directory, "fts.db"))
+        started = time.perf_counter()
+        fts.rebuild(files, "bench")
+        fts_build_seconds = time.perf_counter() - started
+        fts_latencies, fts_elapsed = time_queries(lambda query: fts.search(query, max_results=3), iterations)
+        fts_bytes = fts.get_status()["bytes"]
+        fts.close()
+
+        store = SharedIndexStore(os.path.join(index_directory, "shared"))
+        started = time.perf_counter()
+        store.rebuild(files, "bench")
+        build_seconds = time.perf_counter() - started
+        index = store.current()
+        shared_latencies, shared_elapsed = time_queries(
+            lambda query: [index.document(doc_id) for doc_id in index.search(query, max_results=3)], iterations
+        )
+        index_bytes = os.path.getsize(index.path)
+
+    return {
+        "load_documents": {"documents": documents, "seconds": round(load_seconds, 4),
+                           "docs_per_second": round(documents / load_seconds, 1)},
+        "simple_search": summarize(latencies, elapsed, documents=documents),
+        "inverted_index_search": summarize(inverted_latencies, inverted_elapsed, documents=documents,
+                                           build_seconds=round(inverted_build_seconds, 4),
+                                           build_docs_per_second=round(documents / inverted_build_seconds, 1),
+                                           terms=len(inverted.terms), postings=inverted.posting_count),
+        "postings_memory": postings_memory(inverted),
+        "two_stage_search": summarize(two_stage_latencies, two_stage_elapsed, documents=documents, candidates=20),
+        "fts5_search": summarize(fts_latencies, fts_elapsed, documents=documents,
+                                 build_seconds=round(fts_build_seconds, 4),
+                                 build_docs_per_second=round(documents / fts_build_seconds, 1), index_bytes=fts_bytes),
+        "shared_index_search": summarize(shared_latencies, shared_elapsed, documents=documents,
+                                         build_seconds=round(build_seconds, 4), index_bytes=index_bytes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark load_documents, simple_search and the shared index")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[100, 1000, 5000])
+    parser.add_argument("--iterations", type=int, default=50, help="Queries per corpus size")
+    parser.add_argument("--output", help="Where to write JSON results (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    results = {}
+    print("=== Search Benchmark ===")
+    for size in args.sizes:
+        corpus_results = bench_corpus(size, args.iterations)
+        for name, summary in corpus_results.items():
+            results[f"{name}[{size}]"] = summary
+            print_summary(f"{name}[{size}]", summary)
+
+    print(f"📄 Results saved to {save_results('search', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+End-to-end load test of /slack/events against the mock provider
+
+Starts the mock server (LLM + Slack Web API), points the app at it and
+drives signed message events through the ASGI app in-process, or through a
+running server with --url.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+# Add the repository root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from mock_llm_server import MockBehavior, MockLLMServer
+from report import print_summary, save_results, summarize
+from slack_events import signed_event
+
+SIGNING_SECRET = "bench-signing-secret"
+QUESTIONS = [
+    "What is this system?",
+    "How do I deploy this app?",
+    "Explain the technical stack in detail",
+    "What are the features?",
+]
+
+
+async def drive(client: httpx.AsyncClient, url: str, signing_secret: str, events: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = {}
+
+    async def one(i: int):
+        async with semaphore:
+            body, headers = signed_event(signing_secret, QUESTIONS[i % len(QUESTIONS)],
+                                         channel=f"C{i % 8:08d}")
+            started = time.perf_counter()
+            response = await client.post(url, content=body, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(events)))
+    return summarize(latencies, time.perf_counter() - started, statuses={str(k): v for k, v in statuses.items()})
+
+
+def run_in_process(latency: str, events: int, concurrency: int) -> dict:
+    with MockLLMServer(MockBehavior(latency=latency, seed=42)) as server:
+        os.environ.update({
+            "HYPERMODE_API_KEY": "bench-key",
+            "HYPERMODE_BASE_URL": server.base_url,
+            "SLACK_BOT_TOKEN": "xoxb-bench",
+            "SLACK_SIGNING_SECRET": SIGNING_SECRET,
+            "SLACK_API_URL": f"{server.base_url}/api/",
+            # The mock does not rate limit, so do not pace replies like real Slack
+            "SLACK_DELIVERY_RATE": "1000",
+        })
+        import main
+
+        async def go():
+            # ASGITransport does not run the lifespan, so start the app's subsystems here
+            async with main.app.router.lifespan_context(main.app):
+                await main.readiness.wait()
+                transport = httpx.ASGITransport(app=main.app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60.0) as client:
+                    return await drive(client, "/slack/events", SIGNING_SECRET, events, concurrency)
+
+        # Shutdown drains the delivery queues, so every reply has been posted here
+        summary = asyncio.run(go())
+        summary["slack_posts"] = len(server.slack_messages)
+        summary["slack_delivery"] = main.slack_delivery.get_status()
+        summary["load_shedding"] = main.llm_limiter.get_status()
+        return summary
+
+
+def run_against_url(url: str, signing_secret: str, events: int, concurrency: int) -> dict:
+    async def go():
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            return await drive(client, url, signing_secret, events, concurrency)
+    return asyncio.run(go())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test /slack/events with signed events")
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", default="lognormal:0.2:0.5", help="Mock LLM latency (see mock_llm_server.py)")
+    parser.add_argument("--url", help="Drive a running server instead, e.g. http://localhost:8000/slack/events")
+    parser.add_argument("--signing-secret", default=os.getenv("SLACK_SIGNING_SECRET", SIGNING_SECRET))
+    parser.add_argument("--output", help="Where to write JSON results (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    print("=== Slack Events Benchmark ===")
+    if args.url:
+        summary = run_against_url(args.url, args.signing_secret, args.events, args.concurrency)
+    else:
+        summary = run_in_process(args.latency, args.events, args.concurrency)
+    print_summary("slack_events", summary)
+    print(f"📄 Results saved to {save_results('slack_events', {'slack_events': summary}, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark import time and server startup against a time budget
+
+Measures how long `import main` takes in a fresh interpreter, then starts
+uvicorn on a synthetic corpus and times how long until /healthz (liveness)
+and /readyz (readiness, after RAG warm-up) answer. Exits non-zero when any
+measurement is over budget, so it can gate CI.
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the repository root to Python path
+sys.path.append(REPO_ROOT)
+
+from bench_search import make_corpus
+from report import print_summary, save_results
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+
+
+def bench_env(data_dir: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "HYPERMODE_API_KEY": "bench-key",
+        "HYPERMODE_BASE_URL": "http://127.0.0.1:9",
+        "SLACK_BOT_TOKEN": "xoxb-bench",
+        "SLACK_SIGNING_SECRET": "bench-secret",
+        "RAG_DATA_DIR": data_dir,
+    })
+    return env
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env: dict, runs: int) -> dict:
+    """Time `import main` in fresh interpreters"""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=REPO_ROOT, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return {"runs": runs, "median_s": round(statistics.median(samples), 4), "max_s": round(max(samples), 4)}
+
+
+def wait_for(client: httpx.Client, url: str, started: float, timeout: float) -> float:
+    """Poll url until it returns 200; seconds since started"""
+    while time.perf_counter() - started < timeout:
+        try:
+            if client.get(url).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"{url} not ready after {timeout}s")
+
+
+def measure_server(env: dict, timeout: float) -> dict:
+    """Start uvicorn and time liveness and readiness"""
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            live = wait_for(client, "/healthz", started, timeout)
+            ready = wait_for(client, "/readyz", started, timeout)
+            timings = client.get("/readyz").json()["timings"]
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+    return {"live_s": round(live, 4), "ready_s": round(ready, 4), **{f"{k}_s": v for k, v in timings.items()}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check import and startup time against a budget")
+    parser.add_argument("--documents", type=int, default=2000, help="Synthetic corpus size for RAG warm-up")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time the import in")
+    parser.add_argument("--import-budget", type=float, default=1.5, help="Max median seconds for `import main`")
+    parser.add_argument("--live-budget", type=float, default=3.0, help="Max seconds until /healthz answers")
+    parser.add_argument("--ready-budget", type=float, default=10.0, help="Max seconds until /readyz answers")
+    parser.add_argument("--output", help="Where to write JSON results (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    print("=== Startup Benchmark ===")
+    with tempfile.TemporaryDirectory() as directory:
+        make_corpus(directory, args.documents)
+        env = bench_env(directory)
+        results = {
+            "import": measure_import(env, args.runs),
+            "server": measure_server(env, timeout=max(args.ready_budget, args.live_budget) * 3),
+        }
+    results["server"]["documents"] = args.documents
+    for name, summary in results.items():
+        print_summary(name, summary)
+    print(f"📄 Results saved to {save_results('startup', results, args.output)}")
+
+    checks = [
+        ("import main", results["import"]["median_s"], args.import_budget),
+        ("liveness", results["server"]["live_s"], args.live_budget),
+        ("readiness", results["server"]["ready_s"], args.ready_budget),
+    ]
+    over = [(name, value, budget) for name, value, budget in checks if value > budget]
+    for name, value, budget in checks:
+        print(f"{'❌' if value > budget else '✅'} {name}: {value:.3f}s (budget {budget:.1f}s)")
+    sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
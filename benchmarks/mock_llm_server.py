@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Local stub chat-completions server for offline benchmarks
+
+Serves OpenAI-style /chat/completions responses with configurable latency
+distributions and failure modes (random errors, 429 storms with Retry-After,
+brownouts at the start of traffic) so client behavior can be measured
+without calling a real provider. It also answers the Slack Web API calls
+the bot makes (auth.test, chat.postMessage) so whole Slack events can be
+driven offline, optionally rate limiting posts per channel like Slack.
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Union
+from urllib.parse import parse_qs
+
+# Latency distributions: name -> (parameter names, sampler)
+LATENCY_DISTRIBUTIONS = {
+    "constant": (["seconds"], lambda rng, s: s),
+    "uniform": (["low", "high"], lambda rng, low, high: rng.uniform(low, high)),
+    "exponential": (["mean"], lambda rng, mean: rng.expovariate(1.0 / mean)),
+    "lognormal": (["median", "sigma"], lambda rng, median, sigma: median * math.exp(rng.gauss(0.0, sigma))),
+    "tail": (["fast", "slow", "p_slow"], lambda rng, fast, slow, p_slow: slow if rng.random() < p_slow else fast),
+}
+
+
+def parse_latency(spec: Union[str, float]) -> tuple:
+    """Parse a latency spec such as 0.05, uniform:0.02:0.2 or tail:0.05:2:0.01"""
+    if isinstance(spec, (int, float)):
+        return "constant", (float(spec),)
+    name, *params = str(spec).split(":")
+    if not params:
+        return "constant", (float(name),)
+    if name not in LATENCY_DISTRIBUTIONS:
+        raise ValueError(f"Unknown latency distribution '{name}'; choose from {sorted(LATENCY_DISTRIBUTIONS)}")
+    expected = LATENCY_DISTRIBUTIONS[name][0]
+    if len(params) != len(expected):
+        raise ValueError(f"{name} latency takes {len(expected)} parameters: {':'.join(expected)}")
+    return name, tuple(float(p) for p in params)
+
+
+class MockBehavior:
+    """How the stub server responds"""
+
+    def __init__(self, latency: Union[str, float] = 0.05, error_rate: float = 0.0, error_status: int = 500,
+                 retry_after: Optional[float] = None, brownout_seconds: float = 0.0, seed: Optional[int] = None,
+                 slack_channel_interval: float = 0.0, model_latency: Optional[Dict[str, Union[str, float]]] = None):
+        self.latency_name, self.latency_params = parse_latency(latency)
+        # Latency specs for particular models, overriding latency for them
+        self.model_latency = {model: parse_latency(spec) for model, spec in (model_latency or {}).items()}
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.brownout_seconds = brownout_seconds
+        # Minimum seconds between chat.postMessage calls to one channel; faster posts get a 429
+        self.slack_channel_interval = slack_channel_interval
+        self.random = random.Random(seed)
+
+    def sample_latency(self, model: Optional[str] = None) -> float:
+        name, params = self.model_latency.get(model, (self.latency_name, self.latency_params))
+        return max(0.0, LATENCY_DISTRIBUTIONS[name][1](self.random, *params))
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops SYNs under concurrent load, adding 1s retransmits
+    request_queue_size = 256
+
+
+class MockLLMServer:
+    """Threaded stub server running in the background"""
+
+    def __init__(self, behavior: Optional[MockBehavior] = None, host: str = "127.0.0.1", port: int = 0):
+        self.behavior = behavior or MockBehavior()
+        self.first_request_at: Optional[float] = None
+        self.stats: Dict[str, int] = {}
+        self.slack_messages: List[dict] = []
+        self.slack_rate_limited = 0
+        self._slack_last_post: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def _should_fail(self) -> bool:
+        behavior = self.behavior
+        with self._lock:
+            now = time.monotonic()
+            if self.first_request_at is None:
+                self.first_request_at = now
+            if now - self.first_request_at < behavior.brownout_seconds:
+                return True
+            return behavior.random.random() < behavior.error_rate
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status: int, body: dict, headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(body).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    for name, value in (headers or {}).items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client gave up (e.g. a cancelled hedge loser)
+                    self.close_connection = True
+                    server._count("abandoned")
+                    return
+                server._count(str(status))
+
+            def _read_payload(self) -> dict:
+                length = int(self.headers.get("Content-Length", 0))
+                raw = self.rfile.read(length) or b""
+                if "application/x-www-form-urlencoded" in self.headers.get("Content-Type", ""):
+                    return {k: v[0] for k, v in parse_qs(raw.decode("utf-8")).items()}
+                try:
+                    return json.loads(raw or b"{}")
+                except ValueError:
+                    return {}
+
+            def _slack_api(self, method: str, payload: dict):
+                if method == "auth.test":
+                    self._send(200, {"ok": True, "url": "https://mock.slack.com/", "team": "Mock",
+                                     "user": "assistant", "team_id": "T0MOCK", "user_id": "U0BOT", "bot_id": "B0BOT"})
+                elif method == "chat.postMessage":
+                    interval = server.behavior.slack_channel_interval
+                    with server._lock:
+                        now = time.monotonic()
+                        channel = payload.get("channel")
+                        wait = server._slack_last_post.get(channel, -interval) + interval - now
+                        if wait > 0:
+                            server.slack_rate_limited += 1
+                        else:
+                            server._slack_last_post[channel] = now
+                            server.slack_messages.append({**payload, "received_at": now})
+                    if wait > 0:
+                        self._send(429, {"ok": False, "error": "ratelimited"}, {"Retry-After": f"{wait:.3f}"})
+                        return
+                    self._send(200, {"ok": True, "channel": payload.get("channel"),
+                                     "ts": f"{time.time():.6f}", "message": {"text": payload.get("text")}})
+                else:
+                    self._send(200, {"ok": True})
+
+            def do_POST(self):
+                payload = self._read_payload()
+
+                if not self.path.endswith("/chat/completions"):
+                    if self.path.startswith("/api/"):
+                        self._slack_api(self.path[len("/api/"):], payload)
+                    else:
+                        self._send(404, {"error": "not found"})
+                    return
+
+                behavior = server.behavior
+                time.sleep(behavior.sample_latency(payload.get("model")))
+
+                if server._should_fail():
+                    headers = {}
+                    if behavior.retry_after is not None:
+                        headers["Retry-After"] = str(behavior.retry_after)
+                    self._send(behavior.error_status, {"error": {"message": "mock failure"}}, headers)
+                    return
+
+                messages = payload.get("messages") or [{}]
+                question = messages[-1].get("content", "")
+                self._send(200, {
+                    "id": "mock-completion",
+                    "object": "chat.completion",
+                    "model": payload.get("model", "mock"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": f"Mock answer to: {question[-80:]}"},
+                        "finish_reason": "stop"
+                    }],
+                    "usage": {"prompt_tokens": sum(len(m.get("content", "")) // 4 for m in messages),
+                              "completion_tokens": 12}
+                })
+
+        return Handler
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a stub chat-completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", default="0.05",
+                        help="Seconds per response, or a distribution: " +
+                             ", ".join(f"{name}:{':'.join(params)}" for name, (params, _) in LATENCY_DISTRIBUTIONS.items()))
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=500, help="Status code for failures")
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After seconds sent with failures")
+    parser.add_argument("--brownout-seconds", type=float, default=0.0, help="Fail every request for this long after the first one")
+    parser.add_argument("--slack-channel-interval", type=float, default=0.0,
+                        help="Rate limit chat.postMessage to one post per channel per this many seconds")
+    args = parser.parse_args()
+
+    behavior = MockBehavior(args.latency, args.error_rate, args.error_status, args.retry_after, args.brownout_seconds,
+                            slack_channel_interval=args.slack_channel_interval)
+    server = MockLLMServer(behavior, args.host, args.port).start()
+    print(f"🤖 Mock LLM server listening on {server.base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
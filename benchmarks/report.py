@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark result reporting: latency summaries, JSON results, regression checks
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from typing import Dict, List, Optional
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Metrics where a larger value is better; everything else is treated as a latency
+HIGHER_IS_BETTER = ("throughput", "success_rate", "qps", "hit_rate")
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(latencies: List[float], elapsed: float, **extra) -> dict:
+    """Throughput and p50/p95/p99 (milliseconds) for a set of timed operations"""
+    ordered = sorted(latencies)
+    summary = {
+        "count": len(ordered),
+        "throughput": round(len(ordered) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+    summary.update(extra)
+    return summary
+
+
+def print_summary(name: str, summary: dict):
+    fields = ", ".join(f"{key}={value}" for key, value in summary.items())
+    print(f"  {name}: {fields}")
+
+
+def save_results(suite: str, results: Dict[str, dict], path: Optional[str] = None) -> str:
+    """Write results as JSON (to benchmarks/results/ by default) and return the path"""
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{suite}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    document = {
+        "suite": suite,
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+    return path
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.10) -> List[str]:
+    """List metrics that regressed by more than threshold between two result files"""
+    regressions = []
+    for case, metrics in current.get("results", {}).items():
+        base_metrics = baseline.get("results", {}).get(case)
+        if not base_metrics:
+            continue
+        for metric, value in metrics.items():
+            base = base_metrics.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(base, (int, float)) or base == 0:
+                continue
+            if metric == "count":
+                continue
+            change = (value - base) / abs(base)
+            worse = -change if any(metric.startswith(p) for p in HIGHER_IS_BETTER) else change
+            if worse > threshold:
+                regressions.append(f"{case}.{metric}: {base} -> {value} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative regression")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print("❌ Regressions found:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("✅ No regressions beyond threshold")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Adaptive concurrency limit for load shedding
+
+Caps how many replies are generated at once and adapts the cap with AIMD
+on observed latency. Each completion within the latency target adds about
+1/limit, so the cap grows by about one per round of requests. A completion
+over the target (or a failure) cuts the cap by a factor, at most once per
+round: completions that started before the last cut do not cut again.
+Requests over the cap are turned away at once, so callers can answer "busy"
+quickly instead of queueing work that will miss its deadline anyway.
+Background work (batch runs) waits in line for a slot instead, so it shares
+the cap with interactive requests without being shed. It is woken by the
+release that frees a slot, and it only takes a slot while a share of the limit
+(`batch_reserve`) is still free, so interactive requests are not shed because
+batch work picked up every slot they released.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Deque, Optional
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit driven by request latency"""
+
+    def __init__(self, initial: int = 20, min_limit: int = 2, max_limit: int = 200,
+                 latency_target: float = 8.0, backoff: float = 0.9, batch_reserve: float = 0.25):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(max(min_limit, min(max_limit, initial)))
+        self.latency_target = latency_target
+        self.backoff = backoff
+        # Fraction of the limit that waiting (batch) callers leave free for try_acquire
+        self.batch_reserve = batch_reserve
+        self.inflight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.shed = 0
+        self.decreases = 0
+
+    def try_acquire(self) -> Optional[float]:
+        """Admit a request, returning its start time to pass to release; None if it should be shed"""
+        with self._lock:
+            if self.inflight >= int(self.limit):
+                self.shed += 1
+                return None
+            self.inflight += 1
+            self.admitted += 1
+            return time.monotonic()
+
+    async def acquire(self) -> float:
+        """Wait in line for a slot instead of being shed; returns the start time to pass to release"""
+        with self._lock:
+            if not self._waiters and self._waiter_room():
+                self.inflight += 1
+                self.admitted += 1
+                return time.monotonic()
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    # Handed a slot just as it was cancelled: pass it on
+                    self._return_slot()
+            raise
+
+    def _waiter_room(self) -> bool:
+        return self.inflight < int(self.limit) - int(self.limit * self.batch_reserve)
+
+    def _wake_waiters(self):
+        """Hand free slots to waiting callers in order (called with the lock held)"""
+        while self._waiters and self._waiter_room():
+            waiter = self._waiters.popleft()
+            self.inflight += 1
+            self.admitted += 1
+            waiter.get_loop().call_soon_threadsafe(self._grant, waiter, time.monotonic())
+
+    def _grant(self, waiter: asyncio.Future, started: float):
+        if waiter.cancelled():
+            with self._lock:
+                self._return_slot()
+        else:
+            waiter.set_result(started)
+
+    def _return_slot(self):
+        """Give back a slot that was never used, without adapting the limit"""
+        self.admitted -= 1
+        self.inflight -= 1
+        self._wake_waiters()
+
+    def release(self, started: float, ok: bool = True):
+        """Finish an admitted request, adapt the limit to its outcome and wake the next waiter"""
+        now = time.monotonic()
+        with self._lock:
+            # Grow only when the limit was actually in use, so idle periods do not inflate it
+            saturated = self.inflight >= self.limit / 2
+            self.inflight -= 1
+            if ok and now - started <= self.latency_target:
+                if saturated:
+                    self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            elif started >= self._last_decrease:
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                self._last_decrease = now
+                self.decreases += 1
+            self._wake_waiters()
+
+    def get_status(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "inflight": self.inflight,
+            "waiting": len(self._waiters),
+            "batch_reserve": self.batch_reserve,
+            "latency_target": self.latency_target,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "decreases": self.decreases
+        }
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Conversation memory for Slack threads
+
+Each thread keeps a small ring buffer of recent turns plus a rolling
+extractive summary of the turns that fell out of it, so history stays
+bounded no matter how long a conversation runs. Threads are queued for
+persistence under the same lock that updates them, so a thread's saves land
+in the order its turns were added.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (role, content) - tuples keep per-turn overhead small
+Turn = Tuple[str, str]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for prompt budgeting"""
+    return (len(text) + 3) // 4
+
+
+def build_thread_key(channel: Optional[str], thread_ts: Optional[str] = None, user: Optional[str] = None) -> str:
+    """Build the memory key for a Slack conversation
+
+    Threaded messages get their own history; top-level messages share a
+    history per user in the channel (or the channel's, without a user).
+    """
+    channel = channel or "unknown"
+    if thread_ts:
+        return f"{channel}:{thread_ts}"
+    return f"{channel}:{user}" if user else channel
+
+
+class ThreadMemory:
+    """Recent turns and rolling summary for a single thread"""
+
+    __slots__ = ("turns", "summary", "last_active")
+
+    def __init__(self, max_turns: int, turns: Optional[List[Turn]] = None, summary: str = ""):
+        self.turns: Deque[Turn] = deque(turns or [], maxlen=max_turns)
+        self.summary = summary
+        self.last_active = time.monotonic()
+
+
+class SQLiteMemoryStore:
+    """Optional SQLite persistence for conversation memory with batched writes"""
+
+    def __init__(self, path: str, batch_size: int = 20, flush_interval: float = 5.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Tuple[str, str, float]] = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS threads ("
+            "key TEXT PRIMARY KEY, summary TEXT NOT NULL, turns TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def load(self, key: str) -> Optional[Tuple[str, List[Turn]]]:
+        """Load a thread's summary and turns, preferring unflushed writes"""
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending:
+                summary, turns_json, _ = pending
+            else:
+                row = self._conn.execute(
+                    "SELECT summary, turns FROM threads WHERE key = ?", (key,)
+                ).fetchone()
+                if not row:
+                    return None
+                summary, turns_json = row
+        return summary, [tuple(turn) for turn in json.loads(turns_json)]
+
+    def save(self, key: str, thread: ThreadMemory) -> bool:
+        """Queue a thread for writing; True once the batch has filled or aged out and should be flushed"""
+        turns_json = json.dumps(list(thread.turns), separators=(",", ":"))
+        with self._lock:
+            self._pending[key] = (thread.summary, turns_json, time.time())
+            return (len(self._pending) >= self.batch_size or
+                    time.monotonic() - self._last_flush >= self.flush_interval)
+
+    def flush(self) -> int:
+        """Write all pending threads in a single transaction"""
+        with self._lock:
+            if not self._pending:
+                self._last_flush = time.monotonic()
+                return 0
+            rows = [(key, summary, turns, ts) for key, (summary, turns, ts) in self._pending.items()]
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO threads (key, summary, turns, updated_at) VALUES (?, ?, ?, ?)",
+                        rows
+                    )
+                self._pending.clear()
+            except sqlite3.Error as e:
+                logger.error(f"Failed to persist conversation memory: {e}")
+                return 0
+            finally:
+                self._last_flush = time.monotonic()
+        return len(rows)
+
+    def close(self):
+        """Flush pending writes and close the connection"""
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+
+class ConversationMemory:
+    """Bounded, LRU-evicted conversation history keyed by channel/thread"""
+
+    def __init__(self, max_turns: int = 10, max_threads: int = 1000, idle_seconds: float = 3600.0,
+                 summary_max_chars: int = 600, store: Optional[SQLiteMemoryStore] = None):
+        self.max_turns = max_turns
+        self.max_threads = max_threads
+        self.idle_seconds = idle_seconds
+        self.summary_max_chars = summary_max_chars
+        self.store = store
+        self._threads: "OrderedDict[str, ThreadMemory]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def _get_thread(self, key: str, create: bool = True) -> Optional[ThreadMemory]:
+        thread = self._threads.get(key)
+        if thread is not None:
+            self._threads.move_to_end(key)
+            return thread
+
+        if self.store:
+            stored = self.store.load(key)
+            if stored:
+                summary, turns = stored
+                thread = ThreadMemory(self.max_turns, turns, summary)
+        if thread is None and create:
+            thread = ThreadMemory(self.max_turns)
+        if thread is not None:
+            self._threads[key] = thread
+            self._evict()
+        return thread
+
+    def _evict(self):
+        """Drop idle threads and enforce the thread cap (least recently used first)"""
+        cutoff = time.monotonic() - self.idle_seconds
+        while self._threads:
+            key, thread = next(iter(self._threads.items()))
+            if len(self._threads) <= self.max_threads and thread.last_active >= cutoff:
+                break
+            self._threads.popitem(last=False)
+            self.evictions += 1
+
+    def _fold_into_summary(self, thread: ThreadMemory, turn: Turn):
+        """Fold a turn leaving the ring buffer into the rolling summary"""
+        role, content = turn
+        snippet = " ".join(content.split())
+        if len(snippet) > 160:
+            snippet = snippet[:157] + "..."
+        line = f"{'User' if role == 'user' else 'Assistant'}: {snippet}"
+        lines = (thread.summary.split("\n") if thread.summary else []) + [line]
+        # Keep the most recent lines that fit the summary budget
+        while len(lines) > 1 and sum(len(l) + 1 for l in lines) > self.summary_max_chars:
+            lines.pop(0)
+        thread.summary = "\n".join(lines)
+
+    def _record(self, key: str, turns: List[Turn]) -> bool:
+        """Append turns to a thread and queue it for saving; True if the store is due a flush"""
+        with self._lock:
+            thread = self._get_thread(key)
+            for turn in turns:
+                if len(thread.turns) == thread.turns.maxlen:
+                    self._fold_into_summary(thread, thread.turns[0])
+                thread.turns.append(turn)
+            thread.last_active = time.monotonic()
+            # Saved under the lock, so a later turn's save cannot be overwritten by an earlier one
+            return self.store.save(key, thread) if self.store else False
+
+    def add_turn(self, key: str, role: str, content: str):
+        """Append a turn to a thread's history"""
+        if self._record(key, [(role, content)]):
+            self.store.flush()
+
+    def add_exchange(self, key: str, user_message: str, assistant_message: str):
+        """Record a user message and the assistant's reply"""
+        if self._record(key, [("user", user_message), ("assistant", assistant_message)]):
+            self.store.flush()
+
+    async def record_exchange(self, key: str, user_message: str, assistant_message: str):
+        """add_exchange for the event loop: SQLite writes run on a worker thread"""
+        if self._record(key, [("user", user_message), ("assistant", assistant_message)]):
+            await asyncio.to_thread(self.store.flush)
+
+    def get_history(self, key: str, token_budget: int = 800) -> List[dict]:
+        """Return chat messages for a thread trimmed to a token budget
+
+        The summary is included first when it fits, then as many of the most
+        recent turns as the remaining budget allows.
+        """
+        with self._lock:
+            thread = self._get_thread(key, create=False)
+            if thread is None:
+                return []
+            turns = list(thread.turns)
+            summary = thread.summary
+
+        messages: List[dict] = []
+        remaining = token_budget
+        if summary:
+            summary_content = f"Summary of earlier conversation:\n{summary}"
+            cost = estimate_tokens(summary_content)
+            if cost <= remaining:
+                messages.append({"role": "system", "content": summary_content})
+                remaining -= cost
+
+        recent: List[dict] = []
+        for role, content in reversed(turns):
+            cost = estimate_tokens(content)
+            if cost > remaining:
+                break
+            recent.append({"role": role, "content": content})
+            remaining -= cost
+        messages.extend(reversed(recent))
+        return messages
+
+    def clear(self, key: str):
+        """Forget a thread's in-memory history"""
+        with self._lock:
+            self._threads.pop(key, None)
+
+    def flush(self) -> int:
+        """Persist pending writes, if a store is configured"""
+        return self.store.flush() if self.store else 0
+
+    def close(self):
+        """Flush and close the persistence backend"""
+        if self.store:
+            self.store.close()
+
+    def get_status(self) -> dict:
+        """Get conversation memory status"""
+        with self._lock:
+            turns = sum(len(thread.turns) for thread in self._threads.values())
+            return {
+                "threads": len(self._threads),
+                "turns": turns,
+                "max_turns": self.max_turns,
+                "max_threads": self.max_threads,
+                "idle_seconds": self.idle_seconds,
+                "evictions": self.evictions,
+                "persistence": self.store.path if self.store else None
+            }
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Per-request deadlines
+
+A request's deadline is set once where it enters the service (the Slack
+event endpoint, the API endpoints) and carried in a context variable, so
+retrieval, prompt building and upstream calls all see how much time the
+whole request has left instead of each picking its own timeout. Stages
+skip optional work when time is short and stop once it has run out.
+
+Deadlines are absolute time.monotonic() values. Nested scopes can only
+tighten the deadline, never extend it. asyncio tasks and to_thread calls
+copy the context, so work they run on a request's behalf keeps its deadline.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The request's deadline passed before a stage could start"""
+
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[float]:
+    """Give the enclosed work at most seconds, within any deadline already set; yields the deadline"""
+    current = _deadline.get()
+    deadline = time.monotonic() + seconds
+    if current is not None:
+        deadline = min(current, deadline)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def current_deadline() -> Optional[float]:
+    """The current request's deadline, or None outside any deadline scope"""
+    return _deadline.get()
+
+
+def remaining(default: Optional[float] = None) -> Optional[float]:
+    """Seconds left before the deadline (never negative); default when there is no deadline"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return default
+    return max(0.0, deadline - time.monotonic())
+
+
+def has_time(seconds: float) -> bool:
+    """Whether at least seconds are left, i.e. optional work is still affordable"""
+    left = remaining()
+    return left is None or left >= seconds
+
+
+def check(stage: str):
+    """Raise DeadlineExceeded if the deadline has passed before a stage starts"""
+    if remaining() == 0.0:
+        raise DeadlineExceeded(f"Deadline passed before {stage}")
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+SQLite FTS5 retrieval backend
+
+An alternative to the in-memory inverted index for deployments that want
+a durable index without running a custom one: documents live in an FTS5
+table in a WAL-mode SQLite file that survives restarts and is shared by
+all workers, and queries are ranked with FTS5's built-in bm25().
+
+Documents are indexed by text_analysis's terms (a column of stems next
+to the original text), and queries match those stems exactly, so
+"deploying" finds "deployment" but "time" does not find "timber". These are
+the same stems the other backends and the retrieval cache key on. SQLite
+calls block, so queries run on worker threads, each borrowing a
+connection from a small pool.
+"""
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from text_analysis import analyze, query_key
+
+logger = logging.getLogger(__name__)
+
+# Bump when the schema or text_analysis's terms change; older index files are then rebuilt
+SCHEMA_VERSION = "3"
+META_SCHEMA = "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+# Only the analyzed terms are searched; the original text is kept to return
+DOCUMENTS_SCHEMA = ("CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5("
+                    "name UNINDEXED, body UNINDEXED, terms, tokenize = 'unicode61 remove_diacritics 2')")
+
+
+def match_expression(terms: Sequence[str]) -> str:
+    """FTS5 query matching any of the terms exactly"""
+    # Terms are \w+ tokens, so quoting them is enough to keep FTS5 syntax out
+    return " OR ".join(f'"{term}"' for term in terms)
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections for use from worker threads"""
+
+    def __init__(self, path: str, size: int = 4):
+        self.path = path
+        self.size = size
+        self._idle: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection, opening one if the pool is not full yet, else waiting for one"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            conn = self._connect() if create else self._idle.get()
+        try:
+            yield conn
+        finally:
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class FTSIndex:
+    """Documents in an SQLite FTS5 table, ranked with bm25()"""
+
+    def __init__(self, path: str, pool_size: int = 4, batch_size: int = 500, refresh_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.refresh_interval = refresh_interval
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.pool = ConnectionPool(path, pool_size)
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(META_SCHEMA)
+                if self._meta(conn, "schema") != SCHEMA_VERSION:
+                    # An index from an older version: drop it so ensure() rebuilds, keeping generations increasing
+                    conn.execute("DROP TABLE IF EXISTS documents")
+                    conn.execute("DELETE FROM meta WHERE key != 'generation'")
+                    conn.execute("INSERT INTO meta (key, value) VALUES ('schema', ?)", (SCHEMA_VERSION,))
+                conn.execute(DOCUMENTS_SCHEMA)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        self.last_build: Optional[dict] = None
+        self._generation: Optional[int] = None
+        self._generation_read = 0.0
+
+    def _meta(self, conn: sqlite3.Connection, key: str) -> Optional[str]:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _write(self, conn: sqlite3.Connection, files: List[dict], fingerprint: str) -> int:
+        """Replace every document inside the caller's write transaction; returns the new generation"""
+        started = time.perf_counter()
+        generation = int(self._meta(conn, "generation") or 0) + 1
+        conn.execute("DELETE FROM documents")
+        for start in range(0, len(files), self.batch_size):
+            conn.executemany("INSERT INTO documents (rowid, name, body, terms) VALUES (?, ?, ?, ?)",
+                             [(doc_id, file["name"], file["text"], " ".join(analyze(file["text"])))
+                              for doc_id, file in enumerate(files[start:start + self.batch_size], start)])
+        # Merge the b-tree segments written by the batches so queries read one
+        conn.execute("INSERT INTO documents (documents) VALUES ('optimize')")
+        conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                         [("generation", str(generation)), ("fingerprint", fingerprint),
+                          ("documents", str(len(files)))])
+        seconds = time.perf_counter() - started
+        self.last_build = {"documents": len(files), "seconds": round(seconds, 4),
+                           "docs_per_second": round(len(files) / seconds, 1) if seconds else None}
+        logger.info(f"Indexed {len(files)} documents into FTS5 generation {generation} in {seconds:.2f}s")
+        return generation
+
+    def _checkpoint(self, conn: sqlite3.Connection):
+        """Fold a bulk load's WAL into the database file so the WAL does not stay large"""
+        try:
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error as e:
+            logger.warning(f"FTS5 checkpoint failed: {e}")
+
+    def ensure(self, load_files: Callable[[], List[dict]], fingerprint: str) -> int:
+        """Index the corpus unless the stored index already matches it; returns the generation
+
+        BEGIN IMMEDIATE serializes workers starting together: the first
+        builds, the rest find a matching fingerprint.
+        """
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                built = self._meta(conn, "fingerprint") != fingerprint
+                if built:
+                    generation = self._write(conn, load_files(), fingerprint)
+                else:
+                    generation = int(self._meta(conn, "generation"))
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            if built:
+                self._checkpoint(conn)
+        self._remember_generation(generation)
+        return generation
+
+    def rebuild(self, files: List[dict], fingerprint: str) -> int:
+        """Reindex every document as a new generation"""
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                generation = self._write(conn, files, fingerprint)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            self._checkpoint(conn)
+        self._remember_generation(generation)
+        return generation
+
+    def _remember_generation(self, generation: int):
+        self._generation = generation
+        self._generation_read = time.monotonic()
+
+    def generation(self) -> int:
+        """Generation of the stored index; other workers' rebuilds show up within refresh_interval
+
+        The generation is read from SQLite at most once per refresh_interval,
+        so calling this per request (e.g. from the event loop) stays cheap.
+        """
+        if self._generation is None or time.monotonic() - self._generation_read >= self.refresh_interval:
+            with self.pool.connection() as conn:
+                self._remember_generation(int(self._meta(conn, "generation") or 0))
+        return self._generation
+
+    def __len__(self) -> int:
+        with self.pool.connection() as conn:
+            return int(self._meta(conn, "documents") or 0)
+
+    def query_key(self, query: str) -> Tuple[str, ...]:
+        return query_key(query)
+
+    def search_terms(self, terms: Tuple[str, ...], max_results: int = 3) -> List[int]:
+        """Top document IDs for analyzed terms by bm25(), best first"""
+        if not terms:
+            return []
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT rowid FROM documents WHERE documents MATCH ? ORDER BY bm25(documents), rowid LIMIT ?",
+                (match_expression(terms), max_results)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def search_batch(self, keys: List[Tuple[str, ...]], max_results: int = 3) -> List[List[int]]:
+        return [self.search_terms(key, max_results) for key in keys]
+
+    def document(self, doc_id: int) -> str:
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT body FROM documents WHERE rowid = ?", (doc_id,)).fetchone()
+        return row[0] if row else ""
+
+    def search(self, query: str, max_results: int = 3) -> List[str]:
+        """Top documents for a query, best first (the same interface as simple_search)"""
+        return [self.document(doc_id) for doc_id in self.search_terms(self.query_key(query), max_results)]
+
+    def close(self):
+        self.pool.close()
+
+    def get_status(self) -> dict:
+        return {
+            "path": self.path,
+            "generation": self.generation(),
+            "documents": len(self),
+            "bytes": sum(os.path.getsize(path) for path in (self.path, f"{self.path}-wal") if os.path.exists(path)),
+            "pool_size": self.pool.size,
+            "last_build": self.last_build
+        }
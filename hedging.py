@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Hedged requests for cutting upstream tail latency
+
+If the primary call has not finished within a percentile of its recent
+latency, a backup call is started; whichever succeeds first wins and the
+other is cancelled. A cancelled primary's elapsed time is still recorded,
+as a lower bound on its latency. A token bucket caps the extra load
+hedging can add.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class HedgeBudget:
+    """Token bucket limiting hedges to a fraction of requests"""
+
+    def __init__(self, ratio: float = 0.1, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+            return False
+
+
+class HedgePolicy:
+    """Decides when to fire a backup request and tracks how hedging performs"""
+
+    def __init__(self, enabled: bool = True, percentile: float = 0.95, default_delay: float = 2.0,
+                 min_delay: float = 0.25, max_delay: float = 10.0, budget_ratio: float = 0.1,
+                 min_samples: int = 10, window: int = 200):
+        self.enabled = enabled
+        self.percentile = percentile
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.window = window
+        self.budget = HedgeBudget(budget_ratio)
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.budget_exhausted = 0
+
+    def record_latency(self, key: str, latency: float):
+        """Record a completed primary call's latency"""
+        with self._lock:
+            window = self._latencies.get(key)
+            if window is None:
+                window = self._latencies[key] = deque(maxlen=self.window)
+            window.append(latency)
+
+    def delay_for(self, key: str) -> float:
+        """How long to wait on the primary before hedging"""
+        with self._lock:
+            window = self._latencies.get(key)
+            if not window or len(window) < self.min_samples:
+                return self.default_delay
+            ordered = sorted(window)
+        delay = ordered[min(len(ordered) - 1, int(self.percentile * len(ordered)))]
+        return max(self.min_delay, min(self.max_delay, delay))
+
+    async def run(self, key: str, primary: Callable[[], Awaitable[T]],
+                  backup: Optional[Callable[[], Awaitable[T]]] = None,
+                  delay: Optional[float] = None) -> T:
+        """Run primary, hedging with backup if it is slower than the hedge delay
+
+        Returns the first successful result; raises the last error if both
+        calls fail.
+        """
+        self.requests += 1
+        self.budget.deposit()
+
+        started = time.monotonic()
+        primary_task = asyncio.ensure_future(primary())
+        if not self.enabled or backup is None:
+            result = await primary_task
+            self.record_latency(key, time.monotonic() - started)
+            return result
+
+        pending = {primary_task}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self.delay_for(key) if delay is None else delay)
+            if done:
+                result = primary_task.result()
+                self.record_latency(key, time.monotonic() - started)
+                return result
+
+            if not self.budget.try_withdraw():
+                self.budget_exhausted += 1
+                result = await primary_task
+                self.record_latency(key, time.monotonic() - started)
+                return result
+
+            self.hedges_fired += 1
+            backup_task = asyncio.ensure_future(backup())
+            pending = {primary_task, backup_task}
+            last_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup_task:
+                            self.hedges_won += 1
+                        # When the backup wins, the primary has taken at least this long; leaving it
+                        # out would drag the percentile down and make hedging fire ever earlier
+                        self.record_latency(key, time.monotonic() - started)
+                        return task.result()
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            # The losing (or abandoned) call is cancelled
+            for task in pending:
+                task.cancel()
+
+    def get_status(self) -> dict:
+        """Get hedging configuration and counters"""
+        return {
+            "enabled": self.enabled,
+            "percentile": self.percentile,
+            "budget_ratio": self.budget.ratio,
+            "budget_tokens": round(self.budget.tokens, 2),
+            "requests": self.requests,
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "hedge_rate": round(self.hedges_fired / self.requests, 3) if self.requests else 0.0,
+            "hedge_win_rate": round(self.hedges_won / self.hedges_fired, 3) if self.hedges_fired else 0.0,
+            "budget_exhausted": self.budget_exhausted,
+            "delays": {key: round(self.delay_for(key), 3) for key in list(self._latencies)}
+        }
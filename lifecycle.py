@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Startup lifecycle and readiness
+
+The server accepts connections (liveness) as soon as the cheap subsystems
+are up; heavier work such as loading the RAG corpus runs in the background
+and readiness is reported separately until it finishes.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from metrics import STARTUP_DURATION
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+
+
+class Readiness:
+    """Tracks named startup tasks; ready once every required task has finished"""
+
+    def __init__(self):
+        self._tasks: Dict[str, dict] = {}
+        self.timings: Dict[str, float] = {}
+
+    def record_timing(self, phase: str, seconds: float):
+        """Record how long a startup phase took"""
+        self.timings[phase] = seconds
+        STARTUP_DURATION.set(seconds, phase=phase)
+
+    def begin(self, name: str, required: bool = True):
+        self._tasks[name] = {"state": PENDING, "required": required, "started": time.perf_counter()}
+
+    def finish(self, name: str, ok: bool = True, detail: Optional[str] = None):
+        task = self._tasks[name]
+        task["state"] = READY if ok else FAILED
+        task["detail"] = detail
+        self.record_timing(name, time.perf_counter() - task["started"])
+
+    @asynccontextmanager
+    async def track(self, name: str, required: bool = True) -> AsyncIterator[None]:
+        """Mark a task pending for the duration of the block; errors mark it failed"""
+        self.begin(name, required)
+        try:
+            yield
+        except Exception as e:
+            logger.error(f"Startup task {name} failed: {e}")
+            self.finish(name, ok=False, detail=str(e))
+            if required:
+                raise
+        else:
+            self.finish(name)
+
+    @property
+    def is_ready(self) -> bool:
+        if not self._tasks:
+            return False
+        # Optional tasks (e.g. the RAG corpus) may fail without taking the service out of rotation
+        return all(task["state"] == READY or (task["state"] == FAILED and not task["required"])
+                   for task in self._tasks.values())
+
+    async def wait(self, timeout: float = 30.0, interval: float = 0.01) -> bool:
+        """Wait until ready; False on timeout"""
+        deadline = time.monotonic() + timeout
+        while not self.is_ready:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(interval)
+        return True
+
+    def get_status(self) -> dict:
+        return {
+            "ready": self.is_ready,
+            "tasks": {name: {key: value for key, value in task.items() if key != "started" and value is not None}
+                      for name, task in self._tasks.items()},
+            "timings": {phase: round(seconds, 4) for phase, seconds in self.timings.items()}
+        }
@@ -1,18 +1,41 @@
+import time
+_import_started = time.perf_counter()  # For the import-time budget, see /readyz
+
 from fastapi import FastAPI, Request, Form, HTTPException
-from fastapi.responses import Response
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 import os
 import httpx
 from dotenv import load_dotenv
 import logging
-from typing import Optional
-from slack_bolt import App
-from slack_bolt.adapter.fastapi import SlackRequestHandler
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
 import json
 # RAG imports - only import when actually needed to avoid circular import issues
 # from llama_index.core import VectorStoreIndex, SimpleDirectoryReader, Settings
 # from llama_index.embeddings.openai import OpenAIEmbedding  
 # from llama_index.llms.openai import OpenAI
 import asyncio
+import contextvars
+import re
+from collections import OrderedDict
+from urllib.parse import urlparse
+from conversation_memory import ConversationMemory, SQLiteMemoryStore, build_thread_key
+from prompt_templates import PromptLibrary
+from model_router import ModelRouter
+from hedging import HedgePolicy
+from retry_policy import RetryBudget, RetryPolicy
+from metrics import INDEX_SIZE, INFLIGHT_REQUESTS, LLM_REQUESTS, REGISTRY, SHED_REQUESTS, STAGE_DURATION, time_stage
+from tracing import SPAN_KIND_CLIENT, SPAN_KIND_SERVER, create_tracer, detached_context, root_span
+from lifecycle import Readiness
+from shared_index import SharedIndex, SharedIndexStore, corpus_fingerprint
+from response_cache import ResponseCache
+from retrieval_cache import RetrievalCache
+from reranking import Reranker, TwoStageRetriever
+from fts_index import FTSIndex
+from batch_qa import BatchRunner, Checkpoint, parse_questions
+from slack_delivery import SlackDelivery, SlackWebClient
+from deadlines import DeadlineExceeded, check, deadline_scope, has_time, remaining
+from concurrency_limit import AdaptiveLimiter
 
 # Load environment variables
 load_dotenv()
@@ -26,7 +49,14 @@ if not os.getenv("OPENROUTER_API_KEY"):
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Personal Assistant with RAG", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize subsystems on startup and release them on shutdown"""
+    await startup()
+    yield
+    await shutdown()
+
+app = FastAPI(title="Personal Assistant with RAG", version="1.0.0", lifespan=lifespan)
 
 # Configuration
 HYPERMODE_API_KEY = os.getenv("HYPERMODE_API_KEY")
@@ -39,26 +69,140 @@ OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/ap
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
 SLACK_SIGNING_SECRET = os.getenv("SLACK_SIGNING_SECRET")
 SLACK_APP_TOKEN = os.getenv("SLACK_APP_TOKEN")
+SLACK_API_URL = os.getenv("SLACK_API_URL", "https://slack.com/api/")  # Override to point at a local mock
+SLACK_DELIVERY_RATE = float(os.getenv("SLACK_DELIVERY_RATE", "1.0"))  # Posts per second per channel
+SLACK_DELIVERY_BURST = int(os.getenv("SLACK_DELIVERY_BURST", "3"))  # Posts a quiet channel may send back to back
+SLACK_DELIVERY_MAX_QUEUE = int(os.getenv("SLACK_DELIVERY_MAX_QUEUE", "100"))  # Pending messages per channel
+
+# Worker processes; with more than one, the index and response cache are shared between them
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# RAG configuration
+RAG_DATA_DIR = os.getenv("RAG_DATA_DIR", "data/")
+RAG_INDEX_DIR = os.getenv("RAG_INDEX_DIR") or ("index/" if WEB_CONCURRENCY > 1 else None)  # Shared mmap index
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "memory").lower()  # "memory" or "fts5"
+RAG_FTS_PATH = os.getenv("RAG_FTS_PATH", "index/fts.db")  # SQLite file for the fts5 backend
+RAG_FTS_POOL_SIZE = int(os.getenv("RAG_FTS_POOL_SIZE", "4"))  # Connections for queries on worker threads
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "1024"))  # Queries whose results are cached; 0 disables
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "20"))  # First-stage candidates passed to the reranker
+RETRIEVAL_CANDIDATE_BUDGET_MS = float(os.getenv("RETRIEVAL_CANDIDATE_BUDGET_MS", "50"))
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "20"))
+RERANK_HALF_LIFE_DAYS = float(os.getenv("RERANK_HALF_LIFE_DAYS", "180"))  # Age at which the recency boost halves
+
+# Response cache configuration (SQLite, shared by all workers; disabled unless a path is set)
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH")
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+
+# Batch question answering configuration
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))  # Cap on LLM calls in flight per batch
+BATCH_CHECKPOINT_DIR = os.getenv("BATCH_CHECKPOINT_DIR", "batch_checkpoints/")  # Used when a job_id is given
+
+# Conversation Memory Configuration
+MEMORY_MAX_TURNS = int(os.getenv("MEMORY_MAX_TURNS", "10"))
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "800"))
+MEMORY_MAX_THREADS = int(os.getenv("MEMORY_MAX_THREADS", "1000"))
+MEMORY_IDLE_SECONDS = float(os.getenv("MEMORY_IDLE_SECONDS", "3600"))
+MEMORY_DB_PATH = os.getenv("MEMORY_DB_PATH")  # Optional SQLite persistence
+
+# Model Routing Configuration
+ROUTER_LATENCY_SLO = float(os.getenv("ROUTER_LATENCY_SLO", "8.0"))  # Target p95 seconds per reply
+ROUTER_MAX_ERROR_RATE = float(os.getenv("ROUTER_MAX_ERROR_RATE", "0.5"))
+ROUTER_ERROR_WINDOW = float(os.getenv("ROUTER_ERROR_WINDOW", "120"))  # Seconds a failure counts against a model
+ROUTER_LATENCY_WINDOW = float(os.getenv("ROUTER_LATENCY_WINDOW", "300"))  # Seconds a latency sample counts
+
+# Request Hedging Configuration
+HEDGING_ENABLED = os.getenv("HEDGING_ENABLED", "false").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.95"))  # Primary latency percentile to wait before hedging
+HEDGE_BUDGET_RATIO = float(os.getenv("HEDGE_BUDGET_RATIO", "0.1"))  # Max extra requests as a fraction of traffic
+
+# Retry Configuration
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))  # Attempts per endpoint, including the first
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.25"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "8.0"))
+RETRY_DEADLINE = float(os.getenv("RETRY_DEADLINE", "45.0"))  # Total seconds per reply across all attempts
+RETRY_BUDGET_RATIO = float(os.getenv("RETRY_BUDGET_RATIO", "0.2"))  # Max retries as a fraction of traffic
+
+# Deadline and Load Shedding Configuration
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "30.0"))  # Seconds from receiving a request to its reply
+STATUS_CHECK_DEADLINE = float(os.getenv("STATUS_CHECK_DEADLINE", "10.0"))  # Seconds for /hypermode/status
+DEADLINE_RESERVE = float(os.getenv("DEADLINE_RESERVE", "5.0"))  # Skip optional work (reranking, hedging) with less time left
+CONCURRENCY_LIMIT_INITIAL = int(os.getenv("CONCURRENCY_LIMIT_INITIAL", "20"))  # Replies generated at once, then adapted
+CONCURRENCY_LIMIT_MIN = int(os.getenv("CONCURRENCY_LIMIT_MIN", "2"))
+CONCURRENCY_LIMIT_MAX = int(os.getenv("CONCURRENCY_LIMIT_MAX", "200"))
+CONCURRENCY_LATENCY_TARGET = float(os.getenv("CONCURRENCY_LATENCY_TARGET") or ROUTER_LATENCY_SLO)  # Slower replies shrink the limit
+CONCURRENCY_BATCH_RESERVE = float(os.getenv("CONCURRENCY_BATCH_RESERVE", "0.25"))  # Share of the limit batch work leaves free
+
+# Tracing configuration (disabled unless an export target is set)
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH")  # OTLP/JSON lines file, e.g. traces/traces.jsonl
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT")  # OTLP/HTTP collector, e.g. http://localhost:4318
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+TRACE_SLOW_THRESHOLD = float(os.getenv("TRACE_SLOW_THRESHOLD")) if os.getenv("TRACE_SLOW_THRESHOLD") else None  # Always keep slower traces (seconds)
 
 # RAG Configuration
 class RAGManager:
     """Manages document loading and querying with SimpleRAG (OpenRouter-based)"""
     
-    def __init__(self, data_dir: str = "data/"):
+    def __init__(self, data_dir: str = "data/", load: bool = True, index_store: Optional[SharedIndexStore] = None,
+                 retrieval_cache: Optional[RetrievalCache] = None, fts_index: Optional[FTSIndex] = None):
         self.data_dir = data_dir
         self.rag = None
-        self._initialize_rag()
+        self.documents = []
+        self.retriever: Optional[TwoStageRetriever] = None
+        self.loaded = False
+        # With a shared index the corpus lives in an mmap'd generation file shared by all workers
+        self.index_store = index_store
+        # Alternatively the corpus lives in a durable SQLite FTS5 index
+        self.fts_index = fts_index
+        self.generation = 0
+        # Ranked document IDs per normalized query, emptied when the generation changes
+        self.retrieval_cache = retrieval_cache or RetrievalCache(max_entries=0)
+        if load:
+            self._initialize_rag()
+    
+    async def warm_up(self):
+        """Load the corpus in a worker thread so the event loop keeps serving"""
+        await asyncio.to_thread(self._initialize_rag)
     
-    def _initialize_rag(self):
-        """Initialize RAG system using simple search functions"""
+    def _initialize_rag(self, rebuild: bool = False):
+        """Initialize RAG system using simple search functions
+
+        With a shared or FTS5 index, the first worker to start builds a
+        generation (unless one already matches the corpus) and the others
+        use it; rebuild publishes a new generation for every worker.
+        """
         try:
             # Load documents using simple_rag functions
-            from simple_rag import load_documents, simple_search
-            self.documents = load_documents(self.data_dir)
-            self.search_func = simple_search
+            from simple_rag import InvertedIndex, load_document_files
+            if self.fts_index is not None:
+                fingerprint = corpus_fingerprint(self.data_dir)
+                if rebuild:
+                    self.generation = self.fts_index.rebuild(load_document_files(self.data_dir), fingerprint)
+                else:
+                    self.generation = self.fts_index.ensure(lambda: load_document_files(self.data_dir), fingerprint)
+                document_count = len(self.fts_index)
+                INDEX_SIZE.set(document_count, unit="documents")
+            elif self.index_store:
+                fingerprint = corpus_fingerprint(self.data_dir)
+                if rebuild:
+                    self.index_store.rebuild(load_document_files(self.data_dir), fingerprint)
+                else:
+                    self.index_store.ensure(lambda: load_document_files(self.data_dir), fingerprint)
+                document_count = self._use_index(self.index_store.current())
+            else:
+                files = load_document_files(self.data_dir)
+                documents = [file["text"] for file in files]
+                index = InvertedIndex(documents)
+                self.retriever = self._make_retriever(index, files)
+                self.documents = documents
+                self.generation += 1
+                INDEX_SIZE.set(len(index.terms), unit="terms")
+                INDEX_SIZE.set(index.posting_count, unit="postings")
+                INDEX_SIZE.set(len(self.documents), unit="documents")
+                INDEX_SIZE.set(sum(len(doc) for doc in self.documents), unit="characters")
+                document_count = len(self.documents)
             
-            if self.documents:
-                logger.info(f"RAG initialized with {len(self.documents)} documents")
+            if document_count:
+                logger.info(f"RAG initialized with {document_count} documents (generation {self.generation})")
                 self.rag = True
             else:
                 logger.warning("No documents found - RAG features will be disabled")
@@ -67,59 +211,227 @@ class RAGManager:
         except Exception as e:
             logger.error(f"Failed to initialize RAG: {e}")
             self.rag = None
+        finally:
+            self.loaded = True
+    
+    @staticmethod
+    def _make_retriever(index: "InvertedIndex", files: Sequence[dict]) -> TwoStageRetriever:
+        """Candidate generation on an index followed by reranking its files"""
+        return TwoStageRetriever(
+            index, Reranker(files, half_life_days=RERANK_HALF_LIFE_DAYS),
+            candidates=RERANK_CANDIDATES,
+            candidate_budget=RETRIEVAL_CANDIDATE_BUDGET_MS / 1000,
+            rerank_budget=RERANK_BUDGET_MS / 1000,
+            reserve=DEADLINE_RESERVE
+        )
+    
+    def _use_index(self, index: Optional[SharedIndex]) -> int:
+        """Switch to a shared index generation; returns its document count"""
+        if index is None:
+            return 0
+        # Retriever first: a search in between then only caches under the old generation
+        self.retriever = self._make_retriever(index.index, index.files)
+        self.generation = index.generation
+        INDEX_SIZE.set(index.metadata["terms"], unit="terms")
+        INDEX_SIZE.set(index.metadata["postings"], unit="postings")
+        INDEX_SIZE.set(index.metadata["documents"], unit="documents")
+        INDEX_SIZE.set(index.metadata["characters"], unit="characters")
+        return len(index)
+    
+    def document_count(self) -> int:
+        """Documents in the corpus being searched, from whichever backend holds it"""
+        if self.fts_index is not None:
+            return len(self.fts_index)
+        if self.index_store:
+            index = self.index_store.current()
+            return len(index) if index is not None else 0
+        return len(self.documents)
+    
+    def current_generation(self) -> int:
+        """Generation of the corpus being searched; changes whenever it is reloaded"""
+        if self.fts_index is not None:
+            self.generation = self.fts_index.generation()
+        elif self.index_store:
+            index = self.index_store.current()
+            if index is not None and index.generation != self.generation:
+                self._use_index(index)
+        return self.generation
+    
+    def _snapshot(self) -> Optional[Tuple[int, Callable[[str], tuple],
+                                          Callable[[List[tuple], int], List[Tuple[List[int], bool]]],
+                                          Callable[[int], str]]]:
+        """The corpus to search as (generation, query_key, search_keys, document), or None if there is none
+
+        query_key normalizes a query into the cache key that search_keys
+        ranks; search_keys also reports whether each search finished within
+        its time budgets.
+        """
+        if self.fts_index is not None:
+            fts_index = self.fts_index
+            
+            def search_fts(keys: List[tuple], max_results: int) -> List[Tuple[List[int], bool]]:
+                return [(doc_ids, True) for doc_ids in fts_index.search_batch(keys, max_results=max_results)]
+            
+            return self.current_generation(), fts_index.query_key, search_fts, fts_index.document
+        if self.index_store:
+            # Picks up generations published by other workers, then searches like a single worker
+            index = self.index_store.current()
+            if index is None:
+                return None
+            if index.generation != self.generation:
+                self._use_index(index)
+        # Generation first: a reload in between then only caches under the old generation
+        generation = self.generation
+        retriever = self.retriever
+        if retriever is None:
+            return None
+        
+        def search_term_ids(keys: List[tuple], max_results: int) -> List[Tuple[List[int], bool]]:
+            return [retriever.retrieve(key, max_results=max_results) for key in keys]
+        
+        return generation, retriever.index.query_key, search_term_ids, retriever.index.documents.__getitem__
+    
+    def _search(self, query: str, max_results: int = 3) -> Tuple[List[int], List[str]]:
+        """Top documents for a query as (document IDs, texts)"""
+        return self._search_batch([query], max_results)[0]
+    
+    def _search_batch(self, queries: List[str], max_results: int = 3) -> List[Tuple[List[int], List[str]]]:
+        """_search for many queries, answering repeated ones from the retrieval cache
+
+        Queries are searched by their normalized terms, so rewordings that
+        normalize alike share a cache entry and rank identically.
+        """
+        snapshot = self._snapshot()
+        if snapshot is None:
+            return [([], []) for _ in queries]
+        generation, make_key, search_keys, document = snapshot
+        keys = [make_key(query) for query in queries]
+        ranked: Dict[tuple, List[int]] = {(): []}  # No searchable terms left: no match
+        missing = []
+        for key in dict.fromkeys(keys):
+            if key in ranked:
+                continue
+            doc_ids = self.retrieval_cache.get(generation, (key, max_results))
+            if doc_ids is None:
+                missing.append(key)
+            else:
+                ranked[key] = list(doc_ids)
+        if missing:
+            for key, (doc_ids, complete) in zip(missing, search_keys(missing, max_results)):
+                ranked[key] = doc_ids
+                if complete:
+                    # Results cut short by a time budget are not cached
+                    self.retrieval_cache.put(generation, (key, max_results), doc_ids)
+        return [(ranked[key], [document(doc_id) for doc_id in ranked[key]]) for key in keys]
+    
+    @staticmethod
+    def _build_context(results: List[str]) -> Optional[str]:
+        if results:
+            # Combine the top results into a context string
+            context = "\n\n".join(results[:2])  # Use top 2 results
+            return context[:1000]  # Limit context length
+        return None
     
     async def query_documents(self, query: str) -> Optional[str]:
         """Query the document index for relevant information"""
-        if not self.rag or not self.documents:
+        if not self.rag or not (self.documents or self.index_store or self.fts_index is not None):
             return None
         
         try:
-            results = self.search_func(query, self.documents, max_results=3)
-            if results:
-                # Combine the top results into a context string
-                context = "\n\n".join(results[:2])  # Use top 2 results
-                return context[:1000]  # Limit context length
-            return None
+            with time_stage("retrieval"), tracer.span("rag.query_documents", **{"rag.generation": self.generation}) as span:
+                if self.fts_index is not None:
+                    # SQLite calls block; run them on a worker thread with a pooled connection
+                    doc_ids, results = await asyncio.to_thread(self._search, query, 3)
+                else:
+                    doc_ids, results = self._search(query, max_results=3)
+                span.set_attribute("rag.chunk_ids", [f"doc-{doc_id}" for doc_id in doc_ids[:2]])
+            return self._build_context(results)
         except Exception as e:
             logger.error(f"Error querying documents: {e}")
             return None
     
+    async def query_documents_batch(self, queries: List[str]) -> List[Optional[str]]:
+        """Context for many queries at once, searched off the event loop"""
+        if not self.rag or not (self.documents or self.index_store or self.fts_index is not None):
+            return [None] * len(queries)
+        
+        try:
+            with tracer.span("rag.query_documents_batch", **{"rag.queries": len(queries)}):
+                hits = await asyncio.to_thread(self._search_batch, queries, 3)
+            return [self._build_context(results) for _, results in hits]
+        except Exception as e:
+            logger.error(f"Error querying documents: {e}")
+            return [None] * len(queries)
+    
     def get_status(self) -> dict:
         """Get RAG system status"""
+        generation = self.current_generation()
         if self.rag:
             return {
                 "initialized": True,
                 "provider": "Simple Search",
-                "documents_loaded": len(self.documents) if hasattr(self, 'documents') else 0,
+                "loaded": self.loaded,
+                "documents_loaded": self.document_count(),
+                "generation": generation,
+                "backend": "fts5" if self.fts_index is not None else "memory",
+                "shared_index": self.index_store.get_status() if self.index_store else None,
+                "fts": self.fts_index.get_status() if self.fts_index is not None else None,
+                "retrieval_cache": self.retrieval_cache.get_status(),
+                "two_stage": self.retriever.get_status() if self.retriever else None,
                 "data_directory": os.path.exists(self.data_dir)
             }
         else:
             return {
                 "initialized": False,
                 "provider": "None",
+                "loaded": self.loaded,
                 "documents_loaded": 0,
                 "data_directory": os.path.exists(self.data_dir)
             }
     
     def reload_documents(self) -> str:
-        """Reload documents from the data directory"""
+        """Reload documents from the data directory (for every worker, with a shared index)"""
         try:
-            self._initialize_rag()
+            self._initialize_rag(rebuild=True)
             if self.rag:
-                return f"Successfully reloaded {len(self.documents)} documents"
+                return f"Successfully reloaded {self.document_count()} documents"
             else:
                 return "No documents found to load"
         except Exception as e:
             logger.error(f"Error reloading documents: {e}")
             return f"Error reloading documents: {e}"
 
+class UpstreamError(Exception):
+    """An upstream LLM call failed
+
+    reply is set when the failure should be reported to the user as-is
+    instead of falling back to another model.
+    """
+    
+    def __init__(self, message: str, reply: Optional[str] = None):
+        super().__init__(message)
+        self.reply = reply
+
 class HypermodeClient:
-    def __init__(self, api_key: Optional[str], base_url: str, rag_manager: Optional[RAGManager] = None):
+    def __init__(self, api_key: Optional[str], base_url: str, rag_manager: Optional[RAGManager] = None,
+                 memory: Optional[ConversationMemory] = None, prompts: Optional[PromptLibrary] = None,
+                 router: Optional[ModelRouter] = None, hedging: Optional[HedgePolicy] = None,
+                 retry_policy: Optional[RetryPolicy] = None, response_cache: Optional[ResponseCache] = None):
         if not api_key:
             raise ValueError("HYPERMODE_API_KEY is required")
         self.api_key = api_key
         self.base_url = base_url
+        self.provider = urlparse(base_url).hostname or "unknown"
         self.rag_manager = rag_manager
+        self.memory = memory
+        self.prompts = prompts or PromptLibrary()
+        self.hedging = hedging or HedgePolicy(enabled=False)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.response_cache = response_cache
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._http_client_loop = None
+        self.history_token_budget = MEMORY_TOKEN_BUDGET
+        self.deadline_reserve = DEADLINE_RESERVE
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
@@ -130,6 +442,7 @@ class HypermodeClient:
         self.default_model = "gpt-4"
         self.default_max_tokens = 200
         self.default_temperature = 0.7
+        self.router = router or ModelRouter(completion_tokens=self.default_max_tokens)
         
         # Available models for different use cases
         self.models = {
@@ -140,126 +453,301 @@ class HypermodeClient:
         }
     
     def _get_model_for_query(self, message: str) -> str:
-        """Select appropriate model based on query complexity"""
-        # Simple heuristic: longer messages or complex queries use better models
-        if len(message) > 100 or any(keyword in message.lower() for keyword in 
-                                   ['explain', 'analyze', 'complex', 'detailed', 'how does', 'why']):
-            return self.models["premium"]
-        elif len(message) > 50:
-            return self.models["balanced"]
-        else:
-            return self.models["fast"]
+        """Select the model the router would pick for a bare query"""
+        return self.router.choose(message, [{"role": "user", "content": message}]).model
     
-    async def generate_response(self, message: str, user_phone: str, model: Optional[str] = None, 
-                              use_streaming: bool = False) -> str:
-        """Generate response using Hypermode API with RAG enhancement"""
-        try:
-            # First, try to get relevant information from documents
-            context = ""
-            if self.rag_manager:
-                rag_response = await self.rag_manager.query_documents(message)
-                if rag_response:
-                    context = f"\n\nRelevant information from knowledge base:\n{rag_response}"
-                    logger.info(f"RAG context found for query: {message[:50]}...")
-            
-            # Select model if not provided
-            selected_model = model or self._get_model_for_query(message)
-            
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                system_content = """You are a helpful and intelligent SMS assistant. Keep responses concise but informative, 
-                ideally under 160 characters for SMS compatibility. You can help with weather, general questions, calculations, 
-                definitions, and basic tasks. If provided with relevant information from a knowledge base, incorporate it 
-                naturally and accurately into your response. Be friendly and professional."""
-                
-                user_content = f"User ({user_phone}) asks: {message}{context}"
-                
-                payload = {
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": system_content
-                        },
-                        {
-                            "role": "user", 
-                            "content": user_content
-                        }
-                    ],
-                    "model": selected_model,
-                    "max_tokens": self.default_max_tokens,
-                    "temperature": self.default_temperature,
-                    "stream": use_streaming,
-                    "presence_penalty": 0.1,  # Reduce repetition
-                    "frequency_penalty": 0.1   # Encourage variety
-                }
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Shared connection-pooled HTTP client for the running event loop
+
+        Creating a client per request rebuilds the SSL context and drops
+        keep-alive connections, which dominates latency under load.
+        """
+        loop = asyncio.get_running_loop()
+        if self._http_client is None or self._http_client.is_closed or self._http_client_loop is not loop:
+            # Each call passes a timeout derived from its request's deadline
+            self._http_client = httpx.AsyncClient(
+                timeout=self.retry_policy.deadline,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            )
+            self._http_client_loop = loop
+        return self._http_client
+    
+    async def aclose(self):
+        """Close the pooled HTTP client"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+    
+    def _endpoints(self) -> List[str]:
+        """Chat completion endpoints to try (Hypermode API variations)"""
+        return [
+            f"{self.base_url}/chat/completions",
+            f"{self.base_url}/api/v1/chat/completions"
+        ]
+    
+    async def _complete(self, client: httpx.AsyncClient, payload: dict, timeout: Optional[float] = None,
+                        endpoints: Optional[List[str]] = None, deadline: Optional[float] = None) -> dict:
+        """Send a chat completion, trying each endpoint in turn
+
+        Transient failures on an endpoint are retried by the retry policy
+        before moving on. Each attempt may use whatever is left before the
+        deadline. A timeout, when given, is a cut-off (the latency SLO before
+        switching to a faster model): running into it is neither retried nor
+        counted against the model, and raises UpstreamError straight away.
+        Raises UpstreamError when no endpoint produced a usable response.
+        """
+        model = payload["model"]
+        endpoints = endpoints or self._endpoints()
+        deadline = deadline if deadline is not None else self.retry_policy.new_deadline()
+        
+        last_error = None
+        for endpoint in endpoints:
+            started = time.monotonic()
+            try:
+                logger.info(f"Trying Hypermode endpoint: {endpoint} ({model})")
                 
-                # Try multiple endpoints (Hypermode API variations)
-                endpoints = [
-                    f"{self.base_url}/chat/completions",
-                    f"{self.base_url}/api/v1/chat/completions"
-                ]
+                attempts = 0
                 
-                last_error = None
-                for endpoint in endpoints:
-                    try:
-                        logger.info(f"Trying Hypermode endpoint: {endpoint}")
-                        
+                async def send(attempt_timeout: float) -> httpx.Response:
+                    nonlocal attempts
+                    attempts += 1
+                    with tracer.span("llm.request", SPAN_KIND_CLIENT, **{
+                        "url.full": endpoint,
+                        "gen_ai.request.model": model,
+                        "llm.attempt": attempts,
+                        "llm.timeout": attempt_timeout
+                    }) as span:
                         response = await client.post(
                             endpoint,
                             headers=self.headers,
                             json=payload,
-                            timeout=30.0
+                            timeout=attempt_timeout
                         )
-                        
-                        if response.status_code == 200:
-                            data = response.json()
-                            
-                            # Handle different response formats
-                            if "choices" in data and len(data["choices"]) > 0:
-                                content = data["choices"][0]["message"]["content"]
-                                logger.info(f"Hypermode response received: {content[:50]}...")
-                                return content
-                            else:
-                                logger.warning(f"Unexpected response format from {endpoint}")
-                                continue
-                                
-                        elif response.status_code == 401:
-                            logger.error("Hypermode API authentication failed - check API key")
-                            return "Sorry, there's an authentication issue with the AI service."
-                            
-                        elif response.status_code == 429:
-                            logger.warning("Hypermode API rate limit reached")
-                            return "Sorry, the AI service is currently busy. Please try again in a moment."
-                            
-                        elif response.status_code == 500:
-                            logger.error(f"Hypermode API server error: {response.text}")
-                            last_error = "Server error"
-                            continue
-                            
-                        else:
-                            logger.warning(f"Hypermode API error {response.status_code} from {endpoint}: {response.text}")
-                            last_error = f"HTTP {response.status_code}"
-                            continue
-                            
-                    except httpx.TimeoutException:
-                        logger.warning(f"Timeout calling {endpoint}")
-                        last_error = "Timeout"
-                        continue
-                    except httpx.ConnectError:
-                        logger.warning(f"Connection error to {endpoint}")
-                        last_error = "Connection error"
-                        continue
-                    except Exception as e:
-                        logger.warning(f"Error calling {endpoint}: {e}")
-                        last_error = str(e)
-                        continue
+                        span.set_attribute("http.response.status_code", response.status_code)
+                        if response.status_code >= 400:
+                            span.set_error(f"HTTP {response.status_code}")
+                        return response
+                
+                # Chat completions have no side effects, so timeouts and 5xx are safe to retry
+                response = await self.retry_policy.execute(
+                    send,
+                    timeout=timeout if timeout is not None else self.retry_policy.deadline,
+                    deadline=deadline,
+                    idempotent=True,
+                    retry_timeouts=timeout is None
+                )
+                elapsed = time.monotonic() - started
                 
-                # If all endpoints failed
-                logger.error(f"All Hypermode endpoints failed. Last error: {last_error}")
-                return "Sorry, I'm having trouble connecting to the AI service right now. Please try again later."
+                LLM_REQUESTS.inc(provider=self.provider, model=model, status=str(response.status_code))
+                
+                if response.status_code == 200:
+                    data = response.json()
+                    
+                    # Handle different response formats
+                    if "choices" in data and len(data["choices"]) > 0:
+                        self.router.record(model, elapsed, success=True)
+                        return data
+                    else:
+                        logger.warning(f"Unexpected response format from {endpoint}")
+                        last_error = "Unexpected response format"
+                        continue
+                        
+                elif response.status_code == 401:
+                    logger.error("Hypermode API authentication failed - check API key")
+                    raise UpstreamError("Authentication failed",
+                                        reply="Sorry, there's an authentication issue with the AI service.")
+                    
+                elif response.status_code == 429:
+                    # Throttling says nothing about the model's health, so it is not recorded as a failure
+                    logger.warning("Hypermode API rate limit reached")
+                    raise UpstreamError("Rate limited",
+                                        reply="Sorry, the AI service is currently busy. Please try again in a moment.")
+                    
+                elif response.status_code == 500:
+                    logger.error(f"Hypermode API server error: {response.text}")
+                    self.router.record(model, elapsed, success=False)
+                    last_error = "Server error"
+                    continue
                     
+                else:
+                    logger.warning(f"Hypermode API error {response.status_code} from {endpoint}: {response.text}")
+                    self.router.record(model, elapsed, success=False)
+                    last_error = f"HTTP {response.status_code}"
+                    continue
+                    
+            except UpstreamError:
+                raise
+            except httpx.TimeoutException:
+                logger.warning(f"Timeout calling {endpoint}")
+                LLM_REQUESTS.inc(provider=self.provider, model=model, status="timeout")
+                if timeout is not None:
+                    # The model was only slow; the caller moves on to a faster one
+                    raise UpstreamError(f"No reply within {timeout:g}s")
+                # Running out of the caller's deadline is not the model failing
+                if time.monotonic() < deadline:
+                    self.router.record(model, time.monotonic() - started, success=False)
+                last_error = "Timeout"
+                continue
+            except httpx.ConnectError:
+                logger.warning(f"Connection error to {endpoint}")
+                LLM_REQUESTS.inc(provider=self.provider, model=model, status="connect_error")
+                last_error = "Connection error"
+                continue
+            except Exception as e:
+                logger.warning(f"Error calling {endpoint}: {e}")
+                LLM_REQUESTS.inc(provider=self.provider, model=model, status="error")
+                last_error = str(e)
+                continue
+        
+        raise UpstreamError(last_error or "No endpoints available")
+    
+    async def generate_response(self, message: str, user_phone: str, model: Optional[str] = None, 
+                              use_streaming: bool = False, thread_key: Optional[str] = None,
+                              context: Optional[str] = None, retrieve: bool = True) -> str:
+        """Generate response using Hypermode API with RAG enhancement
+
+        Failures come back as an apology to show the user; callers that need
+        to know whether the answer is real use respond() or answer().
+        """
+        reply, _ = await self.respond(message, user_phone, model, use_streaming, thread_key, context, retrieve)
+        return reply
+    
+    async def respond(self, message: str, user_phone: str, model: Optional[str] = None,
+                      use_streaming: bool = False, thread_key: Optional[str] = None,
+                      context: Optional[str] = None, retrieve: bool = True) -> Tuple[str, bool]:
+        """Reply to a message as (text, ok); ok is False when the text apologizes for a failure"""
+        try:
+            return await self.answer(message, user_phone, model, use_streaming, thread_key, context, retrieve), True
         except Exception as e:
-            logger.error(f"Unexpected error in Hypermode client: {e}")
-            return "Sorry, I'm experiencing technical difficulties. Please try again later."
+            return self.failure_reply(e), False
+    
+    @staticmethod
+    def failure_reply(error: Exception) -> str:
+        """What to tell the user when answer() failed"""
+        if isinstance(error, DeadlineExceeded):
+            logger.warning(f"Gave up on a reply: {error}")
+            return "Sorry, that took too long to answer. Please try again."
+        if isinstance(error, UpstreamError):
+            if error.reply:
+                return error.reply
+            # If all endpoints failed
+            logger.error(f"All Hypermode endpoints failed. Last error: {error}")
+            return "Sorry, I'm having trouble connecting to the AI service right now. Please try again later."
+        logger.error(f"Unexpected error in Hypermode client: {error}")
+        return "Sorry, I'm experiencing technical difficulties. Please try again later."
+    
+    async def answer(self, message: str, user_phone: str, model: Optional[str] = None,
+                     use_streaming: bool = False, thread_key: Optional[str] = None,
+                     context: Optional[str] = None, retrieve: bool = True) -> str:
+        """Answer a message, raising DeadlineExceeded or UpstreamError when no answer could be produced
+
+        When a thread_key is given, recent history for that conversation is
+        included in the prompt and the exchange is recorded afterwards.
+        Callers that already retrieved context (e.g. batch runs) pass it in
+        with retrieve=False.
+        """
+        INFLIGHT_REQUESTS.inc(kind="llm")
+        # A reply gets at most the retry deadline, within the caller's deadline if it set one
+        with deadline_scope(self.retry_policy.deadline):
+            try:
+                history = []
+                if self.memory and thread_key:
+                    history = self.memory.get_history(thread_key, self.history_token_budget)
+            
+                # Stand-alone questions can be answered from the cache shared by all workers
+                cache_namespace = None
+                if self.response_cache and not history and not model:
+                    generation = self.rag_manager.current_generation() if self.rag_manager else 0
+                    # The prompt names the user, so their answers are cached for them only
+                    cache_namespace = f"{self.prompts.get().prefix_hash}:{generation}:{user_phone}"
+                    with tracer.span("response_cache.get") as span:
+                        cached = self.response_cache.get(message, cache_namespace)
+                        span.set_attribute("cache.hit", cached[1] if cached else "miss")
+                    if cached:
+                        if self.memory and thread_key:
+                            await self.memory.record_exchange(thread_key, message, cached[0])
+                        return cached[0]
+            
+                # First, try to get relevant information from documents
+                check("retrieval")
+                if retrieve and self.rag_manager:
+                    context = await self.rag_manager.query_documents(message)
+                    if context:
+                        logger.info(f"RAG context found for query: {message[:50]}...")
+            
+                check("prompt_build")
+                with time_stage("prompt_build"), tracer.span("prompt_build") as span:
+                    # Static prefix first so the provider can cache it; variable parts last
+                    template = self.prompts.get()
+                    messages = template.build_messages(message, user_phone, context=context, history=history)
+                    self.prompts.stats.record(template, messages)
+                
+                    # Route to the cheapest model expected to meet the latency SLO unless one was requested
+                    hedge_model = None
+                    if model:
+                        selected_model = model
+                    else:
+                        decision = self.router.choose(message, messages, has_context=bool(context))
+                        selected_model, hedge_model = decision.model, decision.hedge_model
+                        logger.info(f"Routed to {selected_model} ({decision.reason}, hedge: {hedge_model})")
+                        span.set_attribute("router.reason", decision.reason)
+                    span.set_attributes(**{
+                        "memory.history_messages": len(history),
+                        "gen_ai.request.model": selected_model,
+                        "router.hedge_model": hedge_model
+                    })
+                
+                    payload = {
+                        "messages": messages,
+                        "model": selected_model,
+                        "max_tokens": self.default_max_tokens,
+                        "temperature": self.default_temperature,
+                        "stream": use_streaming,
+                        "presence_penalty": 0.1,  # Reduce repetition
+                        "frequency_penalty": 0.1   # Encourage variety
+                    }
+            
+                check("upstream")
+                with time_stage("upstream"), tracer.span("upstream", **{"gen_ai.request.model": selected_model}) as span:
+                    client = self._get_http_client()
+                    # Hedging is optional work: with little time left the primary gets all of it
+                    can_hedge = has_time(self.deadline_reserve)
+                    span.set_attribute("deadline.remaining", round(remaining(), 3))
+                    try:
+                        # A slow primary only gets the SLO before we hedge to the faster model
+                        primary_timeout = self.router.latency_slo if hedge_model and can_hedge else None
+                        # Backup goes to the hedge model if there is one, otherwise the other endpoint first
+                        backup_payload = {**payload, "model": hedge_model or selected_model}
+                        deadline = self.retry_policy.new_deadline()
+                        data = await self.hedging.run(
+                            selected_model,
+                            lambda: self._complete(client, payload, timeout=primary_timeout, deadline=deadline),
+                            (lambda: self._complete(client, backup_payload, endpoints=self._endpoints()[::-1],
+                                                    deadline=deadline)) if can_hedge else None
+                        )
+                    except UpstreamError as e:
+                        if e.reply or not hedge_model or not has_time(self.deadline_reserve):
+                            raise
+                        logger.warning(f"{selected_model} failed ({e}); hedging to {hedge_model}")
+                        data = await self._complete(client, {**payload, "model": hedge_model}, deadline=deadline)
+                    usage = data.get("usage") or {}
+                    span.set_attributes(**{
+                        "gen_ai.response.model": data.get("model"),
+                        "gen_ai.usage.input_tokens": usage.get("prompt_tokens"),
+                        "gen_ai.usage.output_tokens": usage.get("completion_tokens"),
+                        "gen_ai.usage.cached_tokens": (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+                    })
+            
+                content = data["choices"][0]["message"]["content"]
+                self.prompts.stats.record_usage(data.get("usage"))
+                logger.info(f"Hypermode response received: {content[:50]}...")
+                if self.memory and thread_key:
+                    await self.memory.record_exchange(thread_key, message, content)
+                if cache_namespace:
+                    self.response_cache.put(message, cache_namespace, content)
+                return content
+            finally:
+                INFLIGHT_REQUESTS.dec(kind="llm")
     
     async def generate_streaming_response(self, message: str, user_phone: str, model: Optional[str] = None):
         """Generate streaming response for real-time applications"""
@@ -268,82 +756,282 @@ class HypermodeClient:
         return await self.generate_response(message, user_phone, model, use_streaming=False)
     
     async def test_connection(self) -> dict:
-        """Test Hypermode API connection and return status"""
+        """Test Hypermode API connection and return status, within the current request's deadline"""
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                test_payload = {
-                    "messages": [{"role": "user", "content": "Hello"}],
-                    "model": self.models["fast"],
-                    "max_tokens": 10
-                }
-                
-                endpoints = [
-                    f"{self.base_url}/chat/completions",
-                    f"{self.base_url}/api/v1/chat/completions"
-                ]
-                
-                for endpoint in endpoints:
-                    try:
-                        response = await client.post(
-                            endpoint,
-                            headers=self.headers,
-                            json=test_payload,
-                            timeout=10.0
-                        )
-                        
-                        if response.status_code == 200:
-                            return {
-                                "status": "connected",
-                                "endpoint": endpoint,
-                                "model": self.models["fast"]
-                            }
-                        elif response.status_code == 401:
-                            return {
-                                "status": "authentication_failed",
-                                "endpoint": endpoint,
-                                "error": "Invalid API key"
-                            }
-                    except Exception:
-                        continue
-                
-                return {
-                    "status": "connection_failed",
-                    "error": "All endpoints unreachable"
-                }
-                
+            client = self._get_http_client()
+            test_payload = {
+                "messages": [{"role": "user", "content": "Hello"}],
+                "model": self.models["fast"],
+                "max_tokens": 10
+            }
+            
+            endpoints = [
+                f"{self.base_url}/chat/completions",
+                f"{self.base_url}/api/v1/chat/completions"
+            ]
+            
+            for endpoint in endpoints:
+                check("connection test")
+                try:
+                    response = await client.post(
+                        endpoint,
+                        headers=self.headers,
+                        json=test_payload,
+                        timeout=remaining(default=self.retry_policy.deadline)
+                    )
+                    
+                    if response.status_code == 200:
+                        return {
+                            "status": "connected",
+                            "endpoint": endpoint,
+                            "model": self.models["fast"]
+                        }
+                    elif response.status_code == 401:
+                        return {
+                            "status": "authentication_failed",
+                            "endpoint": endpoint,
+                            "error": "Invalid API key"
+                        }
+                except Exception:
+                    continue
+            
+            return {
+                "status": "connection_failed",
+                "error": "All endpoints unreachable"
+            }
+            
         except Exception as e:
             return {
                 "status": "error",
                 "error": str(e)
             }
 
-# Initialize RAG Manager
-rag_manager = RAGManager()
+# Initialize tracing
+tracer = create_tracer(
+    export_path=TRACE_EXPORT_PATH,
+    otlp_endpoint=TRACE_OTLP_ENDPOINT,
+    sample_rate=TRACE_SAMPLE_RATE,
+    slow_threshold=TRACE_SLOW_THRESHOLD
+)
+
+# RAG Manager; the corpus is loaded in the background after startup
+if RETRIEVAL_BACKEND not in ("memory", "fts5"):
+    raise ValueError(f"RETRIEVAL_BACKEND must be 'memory' or 'fts5', not {RETRIEVAL_BACKEND!r}")
+use_fts = RETRIEVAL_BACKEND == "fts5"
+rag_manager = RAGManager(RAG_DATA_DIR, load=False,
+                         index_store=SharedIndexStore(RAG_INDEX_DIR) if RAG_INDEX_DIR and not use_fts else None,
+                         retrieval_cache=RetrievalCache(max_entries=RETRIEVAL_CACHE_SIZE))
+
+# Shared response cache
+response_cache = ResponseCache(RESPONSE_CACHE_PATH, ttl=RESPONSE_CACHE_TTL) if RESPONSE_CACHE_PATH else None
+
+# Compile prompt templates once at startup
+prompt_library = PromptLibrary()
+
+# Initialize conversation memory
+conversation_memory = ConversationMemory(
+    max_turns=MEMORY_MAX_TURNS,
+    max_threads=MEMORY_MAX_THREADS,
+    idle_seconds=MEMORY_IDLE_SECONDS,
+    store=SQLiteMemoryStore(MEMORY_DB_PATH) if MEMORY_DB_PATH else None
+)
+
+# Initialize model router
+model_router = ModelRouter(
+    latency_slo=ROUTER_LATENCY_SLO,
+    max_error_rate=ROUTER_MAX_ERROR_RATE,
+    error_window=ROUTER_ERROR_WINDOW,
+    latency_window=ROUTER_LATENCY_WINDOW,
+    completion_tokens=200
+)
+
+# Initialize request hedging
+hedge_policy = HedgePolicy(
+    enabled=HEDGING_ENABLED,
+    percentile=HEDGE_PERCENTILE,
+    budget_ratio=HEDGE_BUDGET_RATIO
+)
+
+# Initialize retry policy
+retry_policy = RetryPolicy(
+    max_attempts=RETRY_MAX_ATTEMPTS,
+    base_delay=RETRY_BASE_DELAY,
+    max_delay=RETRY_MAX_DELAY,
+    deadline=RETRY_DEADLINE,
+    budget=RetryBudget(RETRY_BUDGET_RATIO)
+)
+
+# Adaptive cap on replies generated at once; excess requests get a fast "busy" reply
+llm_limiter = AdaptiveLimiter(
+    initial=CONCURRENCY_LIMIT_INITIAL,
+    min_limit=CONCURRENCY_LIMIT_MIN,
+    max_limit=CONCURRENCY_LIMIT_MAX,
+    latency_target=CONCURRENCY_LATENCY_TARGET,
+    batch_reserve=CONCURRENCY_BATCH_RESERVE
+)
 
 # Initialize Hypermode client with RAG
 try:
-    hypermode_client = HypermodeClient(HYPERMODE_API_KEY, HYPERMODE_BASE_URL, rag_manager)
+    hypermode_client = HypermodeClient(HYPERMODE_API_KEY, HYPERMODE_BASE_URL, rag_manager, conversation_memory,
+                                      prompt_library, model_router, hedge_policy, retry_policy, response_cache)
 except ValueError as e:
     logger.error(f"Failed to initialize Hypermode client: {e}")
     hypermode_client = None
 
-# Initialize Slack App
+# Slack App, created in startup()
 slack_app = None
 slack_handler = None
 
-if SLACK_BOT_TOKEN and SLACK_SIGNING_SECRET:
+# Outbound Slack messages, posted by per-channel queues rather than the handlers
+slack_delivery = SlackDelivery(
+    SlackWebClient(SLACK_BOT_TOKEN, SLACK_API_URL),
+    rate=SLACK_DELIVERY_RATE,
+    burst=SLACK_DELIVERY_BURST,
+    max_queue=SLACK_DELIVERY_MAX_QUEUE,
+    tracer=tracer
+) if SLACK_BOT_TOKEN else None
+
+# Startup progress, reported by /readyz
+readiness = Readiness()
+
+# When the current Slack request reached /slack/events (perf_counter), for queue-time metrics
+slack_received_at: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("slack_received_at", default=None)
+# The event being answered, so the reply's spans can be found from the event's
+slack_event_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("slack_event_id", default=None)
+
+def tag_slack_event(body: dict):
+    """Remember the event ID for this event's reply and tag the request's trace with it"""
+    slack_event_id.set(body.get("event_id"))
+    root_span().set_attribute("slack.event_id", body.get("event_id"))
+
+def observe_slack_queue_time():
+    """Record how long a Slack event waited between receipt and its listener starting"""
+    received_at = slack_received_at.get()
+    if received_at is not None:
+        STAGE_DURATION.observe(time.perf_counter() - received_at, stage="queue")
+
+BUSY_REPLY = "Sorry, I'm handling a lot of requests right now. Please try again in a moment."
+
+def deliver_reply(channel: str, text: str, thread_ts: Optional[str] = None):
+    """Queue a reply for delivery; the handler returns without waiting on the Slack API"""
+    with tracer.span("slack.deliver", **{"slack.channel": channel, "slack.reply_length": len(text)}):
+        slack_delivery.deliver(channel, text, thread_ts, event_id=slack_event_id.get())
+
+async def answer_in_slack(text: str, user_id: str, channel: str, thread_ts: Optional[str]):
+    """Generate and queue a reply, or shed the request with a busy reply when over the concurrency limit"""
+    started = llm_limiter.try_acquire()
+    if started is None:
+        SHED_REQUESTS.inc(kind="slack")
+        logger.warning(f"Shed Slack message from {user_id}: concurrency limit {llm_limiter.limit:.1f} reached")
+        deliver_reply(channel, BUSY_REPLY, thread_ts)
+        return
+    ok = False
+    try:
+        response, ok = await hypermode_client.respond(text, user_id, thread_key=build_thread_key(channel, thread_ts, user_id))
+    except Exception as e:
+        logger.error(f"Error answering Slack message from {user_id}: {e}")
+        response = "Sorry, I encountered an error processing your message."
+    finally:
+        # Failures (timeouts, upstream errors) cut the limit even when they fail fast
+        llm_limiter.release(started, ok=ok)
+    deliver_reply(channel, response, thread_ts)
+    logger.info(f"Queued Slack response: {response}")
+
+class RecentEvents:
+    """Slack event IDs seen recently, so an event Slack retries is answered only once"""
+
+    def __init__(self, ttl: float = 600.0):
+        self.ttl = ttl
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self.duplicates = 0
+
+    def first_time(self, event_id: Optional[str]) -> bool:
+        """Record an event ID; False if it was already seen within the TTL"""
+        if not event_id:
+            return True
+        now = time.monotonic()
+        while self._seen and next(iter(self._seen.values())) < now - self.ttl:
+            self._seen.popitem(last=False)
+        if event_id in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen[event_id] = now
+        return True
+
+# Slack retries events it did not see acknowledged in time (x-slack-retry-num); each is answered once
+recent_slack_events = RecentEvents()
+
+# Replies still being generated after their event was acknowledged, awaited at shutdown
+slack_reply_tasks: Set[asyncio.Task] = set()
+
+async def answer_traced(text: str, user_id: str, channel: str, thread_ts: Optional[str], ts: Optional[str]):
+    """answer_in_slack as a trace of its own, since the event's trace ends when the event is acknowledged
+
+    Its root span links to the event's trace (see answer_in_background).
+    """
+    # The reply has REQUEST_DEADLINE from when the event arrived; retrieval, prompt building and upstream calls share it
+    received_at = slack_received_at.get()
+    waited = time.perf_counter() - received_at if received_at is not None else 0.0
+    with deadline_scope(REQUEST_DEADLINE - waited), \
+            tracer.span("slack.answer", **{"slack.event_id": slack_event_id.get(), "slack.channel": channel,
+                                           "slack.user": user_id, "slack.ts": ts, "slack.thread_ts": thread_ts,
+                                           "slack.text_length": len(text)}):
+        await answer_in_slack(text, user_id, channel, thread_ts)
+
+def answer_in_background(text: str, user_id: str, channel: str, thread_ts: Optional[str],
+                         ts: Optional[str] = None):
+    """Answer after the listener returns, so Slack gets its 200 well inside its 3 second window"""
+    task = asyncio.get_running_loop().create_task(answer_traced(text, user_id, channel, thread_ts, ts),
+                                                  context=detached_context())
+    slack_reply_tasks.add(task)
+    task.add_done_callback(slack_reply_tasks.discard)
+
+def is_retried_event(body: dict) -> bool:
+    """Whether an event was already received (Slack retried it); logs and counts the duplicate"""
+    if recent_slack_events.first_time(body.get("event_id")):
+        return False
+    logger.info(f"Ignoring retried Slack event {body.get('event_id')}")
+    return True
+
+def slack_span_attributes(event: dict) -> dict:
+    """Span attributes identifying a Slack message"""
+    return {
+        "slack.channel": event.get("channel"),
+        "slack.user": event.get("user"),
+        "slack.ts": event.get("ts"),
+        "slack.thread_ts": event.get("thread_ts"),
+        "slack.text_length": len(event.get("text", ""))
+    }
+
+def create_slack_app():
+    """Build the Slack app and register its listeners
+
+    slack_bolt (and aiohttp under it) is imported here rather than at module
+    level, so importing main stays fast and Slack costs nothing when unconfigured.
+    """
+    if not (SLACK_BOT_TOKEN and SLACK_SIGNING_SECRET):
+        logger.warning("Slack configuration missing - Slack integration disabled")
+        return None, None
+    
+    from slack_bolt.async_app import AsyncApp
+    from slack_bolt.adapter.fastapi.async_handler import AsyncSlackRequestHandler
+    from slack_sdk.web.async_client import AsyncWebClient
+    
     try:
-        slack_app = App(
+        # Async app so the async listeners below are actually awaited
+        slack_app = AsyncApp(
             token=SLACK_BOT_TOKEN,
             signing_secret=SLACK_SIGNING_SECRET,
+            client=AsyncWebClient(token=SLACK_BOT_TOKEN, base_url=SLACK_API_URL),
+            # Listeners only queue the reply (answer_in_background), so acknowledging after them is fast
             process_before_response=True
         )
-        slack_handler = SlackRequestHandler(slack_app)
+        slack_handler = AsyncSlackRequestHandler(slack_app)
         logger.info("Slack app initialized successfully")
         
         # Slack event handlers
         @slack_app.message(".*")
-        async def handle_message_events(body, say, logger):
+        async def handle_message_events(body, logger):
             """Handle incoming Slack messages"""
             try:
                 # Extract message details
@@ -351,64 +1039,68 @@ if SLACK_BOT_TOKEN and SLACK_SIGNING_SECRET:
                 user_id = event.get("user")
                 text = event.get("text", "")
                 channel = event.get("channel")
+                thread_ts = event.get("thread_ts")
                 
-                # Ignore bot messages to prevent loops
-                if event.get("bot_id"):
+                # Ignore bot messages to prevent loops, and events Slack is retrying
+                if event.get("bot_id") or is_retried_event(body):
                     return
                 
+                tag_slack_event(body)
+                observe_slack_queue_time()
                 logger.info(f"Received Slack message from {user_id}: {text}")
                 
-                if hypermode_client:
-                    # Generate response using Hypermode
-                    response = await hypermode_client.generate_response(text, user_id)
-                    
-                    # Send response back to Slack
-                    await say(text=response, channel=channel)
-                    logger.info(f"Sent Slack response: {response}")
-                else:
-                    await say("Sorry, the AI assistant is not properly configured.", channel=channel)
+                with tracer.span("slack.handle_message", **slack_span_attributes(event)):
+                    if hypermode_client:
+                        # Generate response using Hypermode and send it back to Slack
+                        answer_in_background(text, user_id, channel, thread_ts, event.get("ts"))
+                    else:
+                        deliver_reply(channel, "Sorry, the AI assistant is not properly configured.")
                     
             except Exception as e:
                 logger.error(f"Error handling Slack message: {e}")
-                await say("Sorry, I encountered an error processing your message.", channel=channel)
+                deliver_reply(channel, "Sorry, I encountered an error processing your message.")
         
         @slack_app.event("app_mention")
-        async def handle_app_mention_events(body, say, logger):
+        async def handle_app_mention_events(body, logger):
             """Handle when the bot is mentioned"""
             try:
                 event = body.get("event", {})
                 user_id = event.get("user")
                 text = event.get("text", "")
                 channel = event.get("channel")
+                thread_ts = event.get("thread_ts")
+                
+                if is_retried_event(body):
+                    return
                 
                 # Remove the bot mention from the text
                 # Slack mentions look like <@U1234567890>
                 import re
                 cleaned_text = re.sub(r'<@[A-Z0-9]+>', '', text).strip()
                 
+                tag_slack_event(body)
+                observe_slack_queue_time()
                 logger.info(f"Bot mentioned by {user_id}: {cleaned_text}")
                 
-                if hypermode_client:
-                    response = await hypermode_client.generate_response(cleaned_text, user_id)
-                    await say(text=response, channel=channel)
-                else:
-                    await say("Sorry, the AI assistant is not properly configured.", channel=channel)
+                with tracer.span("slack.handle_app_mention", **slack_span_attributes(event)):
+                    if hypermode_client:
+                        answer_in_background(cleaned_text, user_id, channel, thread_ts, event.get("ts"))
+                    else:
+                        deliver_reply(channel, "Sorry, the AI assistant is not properly configured.")
                     
             except Exception as e:
                 logger.error(f"Error handling app mention: {e}")
-                await say("Sorry, I encountered an error.", channel=channel)
+                deliver_reply(channel, "Sorry, I encountered an error.")
         
+        return slack_app, slack_handler
     except Exception as e:
         logger.error(f"Failed to initialize Slack app: {e}")
-        slack_app = None
-        slack_handler = None
-else:
-    logger.warning("Slack configuration missing - Slack integration disabled")
+        return None, None
 
 @app.get("/")
 async def root():
     """Health check endpoint"""
-    rag_status = "enabled" if rag_manager.rag else "disabled"
+    rag_status = "enabled" if rag_manager.rag else ("disabled" if rag_manager.loaded else "loading")
     hypermode_status = "configured" if hypermode_client else "not_configured"
     slack_status = "configured" if slack_app else "not_configured"
     
@@ -426,14 +1118,104 @@ async def root():
             "hypermode_status": "/hypermode/status",
             "hypermode_models": "/hypermode/models",
             "hypermode_test": "/hypermode/test",
+            "batch_qa": "/batch/qa",
+            "memory_status": "/memory/status",
+            "prompt_status": "/prompt/status",
+            "cache_status": "/cache/status",
+            "liveness": "/healthz",
+            "readiness": "/readyz",
+            "metrics": "/metrics",
+            "tracing_status": "/tracing/status",
             "slack_events": "/slack/events"
         }
     }
 
+@app.get("/healthz")
+async def liveness():
+    """Liveness probe: the process is up and serving requests"""
+    return {"status": "alive"}
+
+@app.get("/readyz")
+async def readiness_check():
+    """Readiness probe: startup tasks (Slack, RAG warm-up) have finished"""
+    status = readiness.get_status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
 @app.get("/rag/status")
 async def rag_status():
     """Check RAG system status"""
-    return rag_manager.get_status()
+    # Index backends read files or SQLite, so the status is gathered on a worker thread
+    return await asyncio.to_thread(rag_manager.get_status)
+
+@app.get("/memory/status")
+async def memory_status():
+    """Check conversation memory status"""
+    return conversation_memory.get_status()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: per-stage latency, upstream calls, in-flight requests, index size"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/status")
+async def cache_status():
+    """Check the shared response cache"""
+    if not response_cache:
+        return {"enabled": False}
+    return {"enabled": True, **response_cache.get_status()}
+
+@app.get("/prompt/status")
+async def prompt_status():
+    """Check prompt templates and how much of each prompt is cacheable"""
+    return prompt_library.get_status()
+
+@app.get("/tracing/status")
+async def tracing_status():
+    """Check tracing configuration and export counters"""
+    return tracer.get_status()
+
+async def warm_up_rag():
+    """Load the RAG corpus; the service is usable without it, so failure does not block readiness"""
+    async with readiness.track("rag", required=False):
+        if use_fts and rag_manager.fts_index is None:
+            # Opening the index runs SQLite statements, so it happens here, off the event loop, not at import
+            rag_manager.fts_index = await asyncio.to_thread(FTSIndex, RAG_FTS_PATH, pool_size=RAG_FTS_POOL_SIZE)
+        await rag_manager.warm_up()
+
+rag_warmup: Optional[asyncio.Task] = None
+
+async def startup():
+    """Bring up Slack, then warm the RAG index in the background
+
+    Only cheap work happens before the server starts accepting connections;
+    /healthz answers immediately and /readyz reports when warm-up is done.
+    """
+    global slack_app, slack_handler, rag_warmup
+    started = time.perf_counter()
+    async with readiness.track("slack"):
+        slack_app, slack_handler = create_slack_app()
+    rag_warmup = asyncio.create_task(warm_up_rag())
+    readiness.record_timing("startup", time.perf_counter() - started)
+
+async def shutdown():
+    """Drain Slack replies, persist buffered conversation memory, flush traces and close pooled connections"""
+    if rag_warmup and not rag_warmup.done():
+        rag_warmup.cancel()
+    if slack_reply_tasks:
+        # Let replies in progress finish, so they are queued before delivery drains
+        _, pending = await asyncio.wait(list(slack_reply_tasks), timeout=REQUEST_DEADLINE)
+        if pending:
+            logger.warning(f"Shut down with {len(pending)} Slack replies still being generated")
+    if slack_delivery:
+        await slack_delivery.aclose(timeout=5.0)
+    await asyncio.to_thread(conversation_memory.close)
+    if response_cache:
+        response_cache.close()
+    if rag_manager.fts_index is not None:
+        rag_manager.fts_index.close()
+    tracer.shutdown()
+    if hypermode_client:
+        await hypermode_client.aclose()
 
 @app.get("/debug/env")
 async def debug_env():
@@ -451,7 +1233,7 @@ async def debug_env():
 async def reload_rag():
     """Reload RAG system with updated documents"""
     try:
-        result = rag_manager.reload_documents()
+        result = await asyncio.to_thread(rag_manager.reload_documents)
         status = "enabled" if rag_manager.rag else "disabled"
         return {"status": "reloaded", "rag_status": status, "message": result}
     except Exception as e:
@@ -465,12 +1247,44 @@ async def hypermode_status():
         return {"status": "not_configured", "error": "Hypermode client not initialized"}
     
     try:
-        status = await hypermode_client.test_connection()
+        with deadline_scope(STATUS_CHECK_DEADLINE):
+            status = await hypermode_client.test_connection()
         return status
     except Exception as e:
         logger.error(f"Error testing Hypermode connection: {e}")
         return {"status": "error", "error": str(e)}
 
+@app.post("/batch/qa")
+async def batch_qa(request: Request, concurrency: int = 8, batch_size: int = 32, job_id: Optional[str] = None):
+    """Answer a JSONL body of questions, streaming NDJSON results as they complete
+
+    With a job_id, completed results are checkpointed on the server and
+    re-posting the same job only answers the questions that are left.
+    """
+    if not hypermode_client:
+        raise HTTPException(status_code=500, detail="Hypermode client not configured")
+    try:
+        questions = parse_questions((await request.body()).decode("utf-8").splitlines())
+    except (UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid questions: {e}")
+    checkpoint = None
+    if job_id:
+        if not re.fullmatch(r"[\w.-]{1,100}", job_id):
+            raise HTTPException(status_code=400, detail="job_id may only contain letters, digits, '.', '_' and '-'")
+        checkpoint = Checkpoint(os.path.join(BATCH_CHECKPOINT_DIR, f"{job_id}.ndjson"))
+    runner = BatchRunner(hypermode_client, rag_manager, concurrency=min(concurrency, BATCH_MAX_CONCURRENCY),
+                         batch_size=batch_size, limiter=llm_limiter)
+    
+    async def stream():
+        try:
+            async for result in runner.run(questions, checkpoint):
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        finally:
+            if checkpoint:
+                checkpoint.close()
+    
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 @app.get("/hypermode/models")
 async def hypermode_models():
     """Get available Hypermode models"""
@@ -483,7 +1297,11 @@ async def hypermode_models():
         "configuration": {
             "max_tokens": hypermode_client.default_max_tokens,
             "temperature": hypermode_client.default_temperature
-        }
+        },
+        "routing": hypermode_client.router.routing_table(),
+        "hedging": hypermode_client.hedging.get_status(),
+        "retries": hypermode_client.retry_policy.get_status(),
+        "load_shedding": llm_limiter.get_status()
     }
 
 @app.post("/hypermode/test")
@@ -495,14 +1313,16 @@ async def test_hypermode(
     if not hypermode_client:
         raise HTTPException(status_code=500, detail="Hypermode client not configured")
     
+    started = llm_limiter.try_acquire()
+    if started is None:
+        SHED_REQUESTS.inc(kind="api")
+        raise HTTPException(status_code=503, detail="Too many requests in progress", headers={"Retry-After": "1"})
+    ok = False
     try:
-        response = await hypermode_client.generate_response(
-            message, 
-            "test_user", 
-            model
-        )
+        with deadline_scope(REQUEST_DEADLINE):
+            response, ok = await hypermode_client.respond(message, "test_user", model)
         return {
-            "status": "success",
+            "status": "success" if ok else "error",
             "test_message": message,
             "model_used": model or hypermode_client._get_model_for_query(message),
             "response": response
@@ -510,6 +1330,8 @@ async def test_hypermode(
     except Exception as e:
         logger.error(f"Error testing Hypermode: {e}")
         raise HTTPException(status_code=500, detail=f"Test failed: {str(e)}")
+    finally:
+        llm_limiter.release(started, ok=ok)
 
 # Removed SMS endpoint since no longer using Twilio
 
@@ -520,8 +1342,16 @@ async def slack_events(request: Request):
     if not slack_handler:
         raise HTTPException(status_code=500, detail="Slack integration not configured")
     
+    slack_received_at.set(time.perf_counter())
     try:
-        return await slack_handler.handle(request)
+        # Only the acknowledgement happens here; the reply's deadline starts in answer_traced
+        with INFLIGHT_REQUESTS.track_inprogress(kind="slack"), \
+                time_stage("slack_receive"), \
+                tracer.span("POST /slack/events", SPAN_KIND_SERVER,
+                            **{"slack.retry_num": request.headers.get("x-slack-retry-num")}) as span:
+            response = await slack_handler.handle(request)
+            span.set_attribute("http.response.status_code", response.status_code)
+            return response
     except Exception as e:
         logger.error(f"Error handling Slack event: {e}")
         raise HTTPException(status_code=500, detail="Error processing Slack event")
@@ -548,9 +1378,18 @@ async def slack_status():
         "status": "configured",
         "bot_token": bool(SLACK_BOT_TOKEN),
         "signing_secret": bool(SLACK_SIGNING_SECRET),
-        "app_token": bool(SLACK_APP_TOKEN)
+        "app_token": bool(SLACK_APP_TOKEN),
+        "replies_in_progress": len(slack_reply_tasks),
+        "duplicate_events": recent_slack_events.duplicates,
+        "delivery": slack_delivery.get_status() if slack_delivery else None
     }
 
+readiness.record_timing("import", time.perf_counter() - _import_started)
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    if WEB_CONCURRENCY > 1:
+        # Workers each import the app; the index and response cache are shared through files
+        uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=WEB_CONCURRENCY)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
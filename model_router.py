@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Cost- and latency-aware model routing
+
+Keeps rolling latency and error statistics per model and picks the cheapest
+model expected to answer within the latency SLO, with a faster model to
+hedge to when the primary is running slow.
+
+A model is skipped once enough of its recent calls failed. Failures age out
+of the error window, so a skipped model gets traffic again later and stays
+in rotation if it has recovered. Latency samples likewise age out of the
+latency window: a model avoided after a slow spell (and so getting no new
+samples) falls back to its prior and is tried again.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from conversation_memory import estimate_tokens
+
+# Keywords that suggest the user wants a longer, reasoned answer
+COMPLEX_QUERY_KEYWORDS = ('explain', 'analyze', 'complex', 'detailed', 'how does', 'why')
+
+
+class ModelProfile:
+    """Static facts about a model: quality tier, price and latency priors"""
+
+    def __init__(self, name: str, tier: int, input_cost_per_1k: float, output_cost_per_1k: float,
+                 base_latency: float, seconds_per_1k_prompt_tokens: float = 0.0):
+        self.name = name
+        self.tier = tier
+        self.input_cost_per_1k = input_cost_per_1k
+        self.output_cost_per_1k = output_cost_per_1k
+        self.base_latency = base_latency
+        self.seconds_per_1k_prompt_tokens = seconds_per_1k_prompt_tokens
+
+    def estimate_cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        return (prompt_tokens * self.input_cost_per_1k + completion_tokens * self.output_cost_per_1k) / 1000
+
+
+DEFAULT_PROFILES = [
+    ModelProfile("gpt-3.5-turbo", tier=0, input_cost_per_1k=0.0005, output_cost_per_1k=0.0015,
+                 base_latency=1.0, seconds_per_1k_prompt_tokens=0.1),
+    ModelProfile("gpt-4-turbo", tier=2, input_cost_per_1k=0.01, output_cost_per_1k=0.03,
+                 base_latency=2.5, seconds_per_1k_prompt_tokens=0.3),
+    ModelProfile("gpt-4", tier=2, input_cost_per_1k=0.03, output_cost_per_1k=0.06,
+                 base_latency=4.0, seconds_per_1k_prompt_tokens=0.5),
+]
+
+
+class ModelStats:
+    """Rolling latency and error window for one model"""
+
+    def __init__(self, window: int = 200):
+        self.latencies: Deque[Tuple[float, float]] = deque(maxlen=window)
+        self.outcomes: Deque[Tuple[float, bool]] = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+
+    def record(self, latency: float, success: bool, now: float):
+        self.requests += 1
+        if success:
+            self.latencies.append((now, latency))
+        else:
+            self.errors += 1
+        self.outcomes.append((now, success))
+
+    def recent_latencies(self, since: float) -> List[float]:
+        return [latency for at, latency in self.latencies if at >= since]
+
+    def percentile(self, q: float, since: float) -> Optional[float]:
+        """Latency percentile over calls made at or after since"""
+        ordered = sorted(self.recent_latencies(since))
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def recent_outcomes(self, since: float) -> List[bool]:
+        return [success for at, success in self.outcomes if at >= since]
+
+    def error_rate(self, since: float) -> float:
+        """Share of failed calls made at or after since"""
+        outcomes = self.recent_outcomes(since)
+        if not outcomes:
+            return 0.0
+        return outcomes.count(False) / len(outcomes)
+
+
+class RouteDecision:
+    """The model chosen for a request and why"""
+
+    __slots__ = ("model", "hedge_model", "predicted_latency", "estimated_cost", "prompt_tokens", "reason")
+
+    def __init__(self, model: str, hedge_model: Optional[str], predicted_latency: float,
+                 estimated_cost: float, prompt_tokens: int, reason: str):
+        self.model = model
+        self.hedge_model = hedge_model
+        self.predicted_latency = predicted_latency
+        self.estimated_cost = estimated_cost
+        self.prompt_tokens = prompt_tokens
+        self.reason = reason
+
+    def to_dict(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class ModelRouter:
+    """Routes each request to the cheapest model expected to meet the latency SLO"""
+
+    def __init__(self, profiles: Optional[List[ModelProfile]] = None, latency_slo: float = 8.0,
+                 max_error_rate: float = 0.5, min_samples: int = 5, window: int = 200,
+                 completion_tokens: int = 200, error_window: float = 120.0, latency_window: float = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.profiles: Dict[str, ModelProfile] = {p.name: p for p in (profiles or DEFAULT_PROFILES)}
+        self.latency_slo = latency_slo
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        # Seconds a failure counts against a model
+        self.error_window = error_window
+        # Seconds a latency sample counts towards a model's percentiles
+        self.latency_window = latency_window
+        self._clock = clock
+        self.completion_tokens = completion_tokens
+        self._stats: Dict[str, ModelStats] = {name: ModelStats(window) for name in self.profiles}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_prompt_tokens(messages: List[dict]) -> int:
+        return sum(estimate_tokens(m.get("content", "")) for m in messages)
+
+    @staticmethod
+    def required_tier(message: str, has_context: bool) -> int:
+        """Minimum quality tier for a query
+
+        Open-ended questions need a stronger model unless retrieved context
+        already grounds the answer.
+        """
+        lowered = message.lower()
+        complex_query = len(message) > 100 or any(keyword in lowered for keyword in COMPLEX_QUERY_KEYWORDS)
+        if complex_query and not has_context:
+            return 2
+        return 0
+
+    def _stats_for(self, model: str) -> ModelStats:
+        stats = self._stats.get(model)
+        if stats is None:
+            stats = self._stats[model] = ModelStats()
+        return stats
+
+    def _observed_p95(self, stats: ModelStats) -> Optional[float]:
+        """p95 over the latency window, or None with fewer than min_samples in it"""
+        since = self._clock() - self.latency_window
+        if len(stats.recent_latencies(since)) < self.min_samples:
+            return None
+        return stats.percentile(0.95, since)
+
+    def is_healthy(self, model: str) -> bool:
+        """False once at least min_samples recent calls were made and too many of them failed"""
+        stats = self._stats_for(model)
+        since = self._clock() - self.error_window
+        if len(stats.recent_outcomes(since)) < self.min_samples:
+            return True
+        return stats.error_rate(since) <= self.max_error_rate
+
+    def predicted_latency(self, model: str, prompt_tokens: int) -> float:
+        """Expected p95 latency: observed once warmed up, prior otherwise"""
+        profile = self.profiles[model]
+        prompt_cost = prompt_tokens / 1000 * profile.seconds_per_1k_prompt_tokens
+        observed = self._observed_p95(self._stats_for(model))
+        if observed is not None:
+            return observed + prompt_cost
+        return profile.base_latency + prompt_cost
+
+    def is_running_slow(self, model: str) -> bool:
+        """True when a model's observed p95 is over the SLO"""
+        observed = self._observed_p95(self._stats_for(model))
+        return observed is not None and observed > self.latency_slo
+
+    def choose(self, message: str, messages: List[dict], has_context: bool = False) -> RouteDecision:
+        """Pick a model for a request"""
+        prompt_tokens = self.estimate_prompt_tokens(messages)
+        floor = self.required_tier(message, has_context)
+        with self._lock:
+            healthy = [p for p in self.profiles.values() if self.is_healthy(p.name)]
+            candidates = [p for p in healthy if p.tier >= floor] or healthy or list(self.profiles.values())
+            candidates.sort(key=lambda p: p.estimate_cost(prompt_tokens, self.completion_tokens))
+            latencies = {p.name: self.predicted_latency(p.name, prompt_tokens) for p in self.profiles.values()}
+
+            primary = next((p for p in candidates if latencies[p.name] <= self.latency_slo), None)
+            if primary is not None:
+                reason = "cheapest model within latency SLO"
+            else:
+                primary = min(candidates, key=lambda p: latencies[p.name])
+                reason = "no model within latency SLO; using fastest candidate"
+
+            hedge_model = None
+            if self.is_running_slow(primary.name) or latencies[primary.name] > self.latency_slo:
+                faster = [p for p in healthy if p.name != primary.name and latencies[p.name] < latencies[primary.name]]
+                if faster:
+                    hedge_model = min(faster, key=lambda p: latencies[p.name]).name
+
+        return RouteDecision(
+            model=primary.name,
+            hedge_model=hedge_model,
+            predicted_latency=round(latencies[primary.name], 3),
+            estimated_cost=round(primary.estimate_cost(prompt_tokens, self.completion_tokens), 6),
+            prompt_tokens=prompt_tokens,
+            reason=reason
+        )
+
+    def record(self, model: str, latency: float, success: bool):
+        """Record the outcome of an upstream call
+
+        Only failures of the model itself count: callers do not record rate
+        limiting or calls cut short by their own deadline.
+        """
+        with self._lock:
+            self._stats_for(model).record(latency, success, self._clock())
+
+    def routing_table(self) -> dict:
+        """Live routing state for each model"""
+        with self._lock:
+            models = {}
+            since = self._clock() - self.error_window
+            latency_since = self._clock() - self.latency_window
+            for name, profile in self.profiles.items():
+                stats = self._stats_for(name)
+                p50, p95 = stats.percentile(0.5, latency_since), stats.percentile(0.95, latency_since)
+                models[name] = {
+                    "tier": profile.tier,
+                    "input_cost_per_1k": profile.input_cost_per_1k,
+                    "output_cost_per_1k": profile.output_cost_per_1k,
+                    "requests": stats.requests,
+                    "errors": stats.errors,
+                    "error_rate": round(stats.error_rate(since), 3),
+                    "healthy": self.is_healthy(name),
+                    "p50_latency": round(p50, 3) if p50 is not None else None,
+                    "p95_latency": round(p95, 3) if p95 is not None else None,
+                    "predicted_latency": round(self.predicted_latency(name, 0), 3),
+                    "within_slo": self.predicted_latency(name, 0) <= self.latency_slo,
+                    "running_slow": self.is_running_slow(name)
+                }
+            return {
+                "latency_slo": self.latency_slo,
+                "max_error_rate": self.max_error_rate,
+                "error_window": self.error_window,
+                "latency_window": self.latency_window,
+                "models": models
+            }
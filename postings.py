@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Compact postings lists
+
+Each term's postings (ascending document IDs and term frequencies) are
+split into blocks of BLOCK_SIZE. Within a block, document IDs are stored
+as deltas from the previous ID, and deltas and frequencies are each
+packed at the narrowest width that holds the block's largest value
+(1, 2 or 4 bytes). Small gaps are the common case, so most postings cost
+two or three bytes instead of the tens of bytes a Python list entry and
+int object take.
+
+A skip table records each block's last document ID and byte offset, so
+a cursor can jump straight to the block that may hold a target document
+without decoding the blocks before it. Decoding uses array.frombytes and
+itertools.accumulate, which run in C.
+"""
+
+import struct
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+from typing import List, Optional, Sequence, Tuple
+
+BLOCK_SIZE = 128
+SKIP_RATIO = 8  # Seek with skip pointers when a list is this many times longer than the candidates
+
+_WIDTHS = ("B", "H", "I")  # Index stored in the block's width code
+_LIMITS = (1 << 8, 1 << 16, 1 << 32)
+# Serialized tables in order, with their array types
+_TABLES = (("_doc_freq", "I"), ("_first_block", "I"), ("_block_last", "I"), ("_block_offset", "Q"),
+           ("_block_widths", "B"), ("_max_frequency", "I"))
+_LENGTHS = struct.Struct(f"<{len(_TABLES) + 1}Q")  # Entries per table, then packed data bytes
+
+
+def _width(values: Sequence[int]) -> int:
+    """Index into _WIDTHS of the narrowest type holding every value"""
+    largest = max(values)
+    for code, limit in enumerate(_LIMITS):
+        if largest < limit:
+            return code
+    raise ValueError(f"Posting value {largest} does not fit in 32 bits")
+
+
+class CompactPostings:
+    """Immutable, block-packed postings for every term ID of an index"""
+
+    def __init__(self, postings: Sequence[Sequence[int]], frequencies: Sequence[Sequence[int]]):
+        data = bytearray()
+        self._doc_freq = array("I")  # Per term: number of postings
+        self._first_block = array("I", [0])  # Per term: its blocks are [first_block[t], first_block[t + 1])
+        self._block_last = array("I")  # Per block: last document ID (the skip pointer key)
+        self._block_offset = array("Q")  # Per block: byte offset of its packed data
+        self._block_widths = array("B")  # Per block: delta width code + 4 * frequency width code
+        self._max_frequency = array("I")  # Per term: largest frequency, an upper bound for scoring
+        for doc_ids, freqs in zip(postings, frequencies):
+            self._doc_freq.append(len(doc_ids))
+            self._max_frequency.append(max(freqs, default=0))
+            previous = 0
+            for start in range(0, len(doc_ids), BLOCK_SIZE):
+                block_docs = doc_ids[start:start + BLOCK_SIZE]
+                block_freqs = freqs[start:start + BLOCK_SIZE]
+                deltas = [block_docs[0] - previous]
+                deltas.extend(b - a for a, b in zip(block_docs, block_docs[1:]))
+                delta_code, freq_code = _width(deltas), _width(block_freqs)
+                self._block_last.append(block_docs[-1])
+                self._block_offset.append(len(data))
+                self._block_widths.append(delta_code + 4 * freq_code)
+                data += array(_WIDTHS[delta_code], deltas).tobytes()
+                data += array(_WIDTHS[freq_code], block_freqs).tobytes()
+                previous = block_docs[-1]
+            self._first_block.append(len(self._block_last))
+        self._data = bytes(data)
+        self._view = memoryview(self._data)
+
+    def to_bytes(self) -> bytes:
+        """Serialized postings, for writing to an index file; from_buffer reads them back"""
+        tables = [getattr(self, name) for name, _ in _TABLES]
+        return b"".join([_LENGTHS.pack(*(len(table) for table in tables), len(self._data)),
+                         *(table.tobytes() for table in tables), bytes(self._data)])
+
+    @classmethod
+    def from_buffer(cls, buffer: memoryview) -> "CompactPostings":
+        """Postings over serialized bytes, e.g. a slice of a memory map
+
+        The small per-term and per-block tables are copied; the packed data
+        is read in place, so processes mapping the same file share it.
+        """
+        postings = cls.__new__(cls)
+        lengths = _LENGTHS.unpack_from(buffer, 0)
+        position = _LENGTHS.size
+        for (name, typecode), length in zip(_TABLES, lengths):
+            table = array(typecode)
+            table.frombytes(buffer[position:position + length * table.itemsize])
+            setattr(postings, name, table)
+            position += length * table.itemsize
+        postings._data = postings._view = buffer[position:position + lengths[-1]]
+        return postings
+
+    def release(self):
+        """Let go of a from_buffer buffer, so the memory map under it can be closed"""
+        self._view.release()
+
+    def __len__(self) -> int:
+        return len(self._doc_freq)
+
+    @property
+    def posting_count(self) -> int:
+        return sum(self._doc_freq)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the packed data and the per-term and per-block tables"""
+        tables = (self._doc_freq, self._first_block, self._block_last, self._block_offset,
+                  self._block_widths, self._max_frequency)
+        return len(self._data) + sum(table.itemsize * len(table) for table in tables)
+
+    def doc_freq(self, term_id: int) -> int:
+        return self._doc_freq[term_id]
+
+    def max_frequency(self, term_id: int) -> int:
+        return self._max_frequency[term_id]
+
+    def _decode_block(self, term_id: int, block: int) -> Tuple[List[int], List[int]]:
+        """(document IDs, frequencies) of one block of a term"""
+        first = self._first_block[term_id]
+        count = min(BLOCK_SIZE, self._doc_freq[term_id] - (block - first) * BLOCK_SIZE)
+        widths = self._block_widths[block]
+        deltas = array(_WIDTHS[widths & 3])
+        freqs = array(_WIDTHS[widths >> 2])
+        offset = self._block_offset[block]
+        middle = offset + count * deltas.itemsize
+        deltas.frombytes(self._view[offset:middle])
+        freqs.frombytes(self._view[middle:middle + count * freqs.itemsize])
+        previous = self._block_last[block - 1] if block > first else 0
+        return list(accumulate(deltas, initial=previous))[1:], freqs.tolist()
+
+    def postings(self, term_id: int) -> Tuple[List[int], List[int]]:
+        """All (document IDs, frequencies) of a term"""
+        doc_ids: List[int] = []
+        freqs: List[int] = []
+        for block in range(self._first_block[term_id], self._first_block[term_id + 1]):
+            block_docs, block_freqs = self._decode_block(term_id, block)
+            doc_ids.extend(block_docs)
+            freqs.extend(block_freqs)
+        return doc_ids, freqs
+
+    def cursor(self, term_id: int) -> "PostingsCursor":
+        return PostingsCursor(self, term_id)
+
+    def intersect(self, term_ids: Sequence[int]) -> Tuple[List[int], List[int]]:
+        """Documents containing every term, with their summed frequencies
+
+        Terms are applied rarest first. A list much longer than the current
+        candidates is probed with a cursor, whose skip pointers jump over
+        blocks that cannot contain a candidate; shorter lists are cheaper to
+        decode whole and look up.
+        """
+        if not term_ids:
+            return [], []
+        ordered = sorted(term_ids, key=self.doc_freq)
+        candidates = dict(zip(*self.postings(ordered[0])))
+        for term_id in ordered[1:]:
+            if not candidates:
+                break
+            if self.doc_freq(term_id) > SKIP_RATIO * len(candidates):
+                cursor = self.cursor(term_id)
+                matches = {}
+                for doc_id, total in candidates.items():
+                    found = cursor.next_geq(doc_id)
+                    if found is None:
+                        break
+                    if found == doc_id:
+                        matches[doc_id] = total + cursor.freq
+            else:
+                other = dict(zip(*self.postings(term_id)))
+                matches = {doc_id: total + other[doc_id] for doc_id, total in candidates.items() if doc_id in other}
+            candidates = matches
+        return list(candidates), list(candidates.values())
+
+
+class PostingsCursor:
+    """Forward iterator over one term's postings with skip-pointer seeks"""
+
+    def __init__(self, postings: CompactPostings, term_id: int):
+        self._postings = postings
+        self._term_id = term_id
+        self._block = postings._first_block[term_id]
+        self._end_block = postings._first_block[term_id + 1]
+        self._docs: List[int] = []
+        self._freqs: List[int] = []
+        self._position = 0
+        self.doc: Optional[int] = None  # Current document ID; None once exhausted
+        self.freq = 0
+        self.blocks_decoded = 0
+        if self._block < self._end_block:
+            self._load(self._block)
+
+    def _load(self, block: int):
+        self._block = block
+        self._docs, self._freqs = self._postings._decode_block(self._term_id, block)
+        self.blocks_decoded += 1
+        self._set(0)
+
+    def _set(self, position: int):
+        self._position = position
+        self.doc = self._docs[position]
+        self.freq = self._freqs[position]
+
+    def next(self) -> Optional[int]:
+        """Advance to the next posting"""
+        if self.doc is None:
+            return None
+        if self._position + 1 < len(self._docs):
+            self._set(self._position + 1)
+        elif self._block + 1 < self._end_block:
+            self._load(self._block + 1)
+        else:
+            self.doc = None
+        return self.doc
+
+    def next_geq(self, target: int) -> Optional[int]:
+        """Advance to the first posting with document ID >= target"""
+        if self.doc is None or self.doc >= target:
+            return self.doc
+        if target > self._docs[-1]:
+            # Skip pointers: find the first block whose last document reaches the target
+            block = bisect_left(self._postings._block_last, target, self._block + 1, self._end_block)
+            if block == self._end_block:
+                self.doc = None
+                return None
+            self._load(block)
+        self._set(bisect_left(self._docs, target, self._position))
+        return self.doc
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Prompt templates with a byte-stable static prefix
+
+Providers cache prompts by exact prefix match, so everything that never
+changes (system prompt, knowledge base instructions) is compiled once into
+a single prefix and every per-request value goes at the end.
+"""
+
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+from conversation_memory import estimate_tokens
+
+SYSTEM_PROMPT = (
+    "You are a helpful and intelligent SMS assistant. Keep responses concise but informative, "
+    "ideally under 160 characters for SMS compatibility. You can help with weather, general questions, "
+    "calculations, definitions, and basic tasks. If provided with relevant information from a knowledge "
+    "base, incorporate it naturally and accurately into your response. Be friendly and professional."
+)
+
+KNOWLEDGE_BASE_HEADER = (
+    "Knowledge base excerpts, when available, are given in the user message under "
+    "\"Relevant information from knowledge base:\". Treat them as the authoritative source "
+    "and do not mention the excerpts themselves."
+)
+
+
+def _normalize(text: str) -> str:
+    """Collapse whitespace so source formatting never leaks into the prompt"""
+    return " ".join(text.split())
+
+
+class PromptTemplate:
+    """A precompiled prompt: static prefix first, variable parts last"""
+
+    def __init__(self, name: str, system_prompt: str, knowledge_base_header: str = ""):
+        self.name = name
+        parts = [_normalize(system_prompt)]
+        if knowledge_base_header:
+            parts.append(_normalize(knowledge_base_header))
+        self.static_prefix = "\n\n".join(parts)
+        self.prefix_tokens = estimate_tokens(self.static_prefix)
+        self.prefix_hash = hashlib.sha256(self.static_prefix.encode("utf-8")).hexdigest()[:16]
+        self._system_message = {"role": "system", "content": self.static_prefix}
+
+    def build_messages(self, message: str, user_id: str, context: Optional[str] = None,
+                       history: Optional[List[dict]] = None) -> List[dict]:
+        """Assemble chat messages; only the trailing user message varies per request"""
+        if context:
+            user_content = (f"Relevant information from knowledge base:\n{context}\n\n"
+                            f"User ({user_id}) asks: {message}")
+        else:
+            user_content = f"User ({user_id}) asks: {message}"
+        return [dict(self._system_message), *(history or []), {"role": "user", "content": user_content}]
+
+
+class PromptStats:
+    """Tracks how much of each prompt is cacheable by the provider"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cacheable_tokens = 0
+        self.provider_cached_tokens = 0
+
+    def record(self, template: PromptTemplate, messages: List[dict]):
+        """Record estimated prompt and cacheable-prefix tokens for a request"""
+        total = sum(estimate_tokens(m["content"]) for m in messages)
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += total
+            self.cacheable_tokens += template.prefix_tokens
+
+    def record_usage(self, usage: Optional[dict]):
+        """Record cached tokens reported by the provider, if any"""
+        if not usage:
+            return
+        details = usage.get("prompt_tokens_details") or {}
+        cached = details.get("cached_tokens") or 0
+        if cached:
+            with self._lock:
+                self.provider_cached_tokens += cached
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "prompt_tokens": self.prompt_tokens,
+                "cacheable_tokens": self.cacheable_tokens,
+                "cacheable_ratio": round(self.cacheable_tokens / self.prompt_tokens, 3) if self.prompt_tokens else 0.0,
+                "avg_cacheable_tokens_per_request": round(self.cacheable_tokens / self.requests, 1) if self.requests else 0.0,
+                "provider_cached_tokens": self.provider_cached_tokens
+            }
+
+
+class PromptLibrary:
+    """Templates compiled once at startup, looked up by name"""
+
+    def __init__(self, templates: Optional[Dict[str, PromptTemplate]] = None):
+        self.templates = templates or {
+            "default": PromptTemplate("default", SYSTEM_PROMPT, KNOWLEDGE_BASE_HEADER)
+        }
+        self.stats = PromptStats()
+
+    def get(self, name: str = "default") -> PromptTemplate:
+        return self.templates[name]
+
+    def get_status(self) -> dict:
+        """Get prompt template status and cacheability stats"""
+        return {
+            "templates": {
+                name: {
+                    "prefix_hash": template.prefix_hash,
+                    "prefix_tokens": template.prefix_tokens
+                }
+                for name, template in self.templates.items()
+            },
+            "stats": self.stats.snapshot()
+        }
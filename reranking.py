@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Two-stage retrieval: candidate generation, then reranking
+
+The inverted index cheaply ranks documents by which query terms they
+contain and how often, pruning documents that cannot make the cut. Its
+top candidates are then rescored with signals too costly to compute for
+every matching document:
+
+- proximity: how close together the query terms occur
+- headings: query terms in the Markdown headings of .md files
+- recency: newer files score higher, halving every half-life
+
+Each stage has its own time budget, capped by the request's deadline.
+Candidate generation that runs out of time returns the best it has scored
+so far; reranking that runs out keeps the first stage's order, and is
+skipped outright when the request has too little time left.
+"""
+
+import logging
+import math
+import re
+import time
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from deadlines import has_time, remaining
+from metrics import STAGE_DURATION
+from simple_rag import MATCH_WEIGHT
+from text_analysis import analyze, normalize_token, tokenize
+
+logger = logging.getLogger(__name__)
+
+HEADING_PATTERN = re.compile(r"^#{1,6}[ \t]+(.+)$", re.MULTILINE)
+
+DEFAULT_WEIGHTS = {
+    "coverage": 4.0,  # Share of the query's terms the document contains
+    "frequency": 1.0,  # Summed term frequency, log-scaled against the best candidate
+    "proximity": 1.0,  # 1.0 when the matched terms occur side by side
+    "heading": 1.0,  # Share of the query's terms found in .md headings
+    "recency": 0.5,  # 1.0 for a file modified now, 0.5 one half-life ago
+}
+
+
+def _min_window(positions: List[Tuple[int, str]], distinct: int) -> int:
+    """Span (last - first position) of the shortest window holding all distinct terms"""
+    best = None
+    counts: Dict[str, int] = {}
+    covered = 0
+    left = 0
+    for position, term in positions:
+        counts[term] = counts.get(term, 0) + 1
+        if counts[term] == 1:
+            covered += 1
+        while covered == distinct:
+            left_position, left_term = positions[left]
+            span = position - left_position
+            if best is None or span < best:
+                best = span
+            counts[left_term] -= 1
+            if counts[left_term] == 0:
+                covered -= 1
+            left += 1
+    return best or 0
+
+
+class Reranker:
+    """Rescores a small set of candidates with proximity, heading and recency signals"""
+
+    def __init__(self, files: Sequence[dict], weights: Optional[Dict[str, float]] = None,
+                 half_life_days: float = 180.0):
+        self.files = files
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.half_life = half_life_days * 86400
+        self._headings: Dict[int, FrozenSet[str]] = {}
+
+    def heading_terms(self, doc_id: int) -> FrozenSet[str]:
+        """Analyzed terms of a .md file's headings (empty for other files)"""
+        terms = self._headings.get(doc_id)
+        if terms is None:
+            file = self.files[doc_id]
+            headings = HEADING_PATTERN.findall(file["text"]) if file["name"].endswith(".md") else []
+            terms = self._headings[doc_id] = frozenset(analyze(" ".join(headings)))
+        return terms
+
+    def proximity(self, doc_id: int, terms: Set[str], token_terms: Optional[Dict[str, Optional[str]]] = None) -> float:
+        """How tightly the query terms found in a document cluster, from 0 to 1
+
+        token_terms caches each token's term and may be shared across calls.
+        """
+        if len(terms) < 2:
+            return 0.0
+        positions = []
+        token_terms = {} if token_terms is None else token_terms
+        position = 0
+        for token in tokenize(self.files[doc_id]["text"]):
+            if token not in token_terms:
+                token_terms[token] = normalize_token(token)
+            term = token_terms[token]
+            if term is None:
+                continue  # Stop words do not count towards distance
+            if term in terms:
+                positions.append((position, term))
+            position += 1
+        distinct = len({term for _, term in positions})
+        if distinct < 2:
+            return 0.0
+        return (distinct - 1) / _min_window(positions, distinct)
+
+    def recency(self, doc_id: int, now: float) -> float:
+        age = max(0.0, now - self.files[doc_id].get("modified", now))
+        return 0.5 ** (age / self.half_life) if self.half_life > 0 else 0.0
+
+    def rerank(self, candidates: List[Tuple[int, int]], terms: Set[str],
+               deadline: Optional[float] = None) -> Optional[List[int]]:
+        """Candidate document IDs reordered by the combined score; None if the deadline passed
+
+        candidates are the first stage's (document ID, score) pairs, where
+        the score is MATCH_WEIGHT per matched term plus summed frequencies.
+        """
+        if not candidates or not terms:
+            return [doc_id for doc_id, _ in candidates]
+        weights = self.weights
+        now = time.time()
+        top_frequency = max(math.log1p(score % MATCH_WEIGHT) for _, score in candidates) or 1.0
+        token_terms: Dict[str, Optional[str]] = {}
+        scored = []
+        for rank, (doc_id, score) in enumerate(candidates):
+            if deadline is not None and time.perf_counter() > deadline:
+                return None
+            combined = (weights["coverage"] * (score // MATCH_WEIGHT) / len(terms)
+                        + weights["frequency"] * math.log1p(score % MATCH_WEIGHT) / top_frequency
+                        + weights["proximity"] * self.proximity(doc_id, terms, token_terms)
+                        + weights["heading"] * len(terms & self.heading_terms(doc_id)) / len(terms)
+                        + weights["recency"] * self.recency(doc_id, now))
+            scored.append((-combined, rank, doc_id))
+        scored.sort()
+        return [doc_id for _, _, doc_id in scored]
+
+
+class TwoStageRetriever:
+    """Candidate generation on an InvertedIndex followed by reranking, each with its own budget"""
+
+    def __init__(self, index, reranker: Reranker, candidates: int = 20, candidate_budget: float = 0.05,
+                 rerank_budget: float = 0.02, reserve: float = 0.0):
+        self.index = index
+        self.reranker = reranker
+        self.candidates = candidates
+        self.candidate_budget = candidate_budget
+        self.rerank_budget = rerank_budget
+        # Reranking is skipped when the request has less than this many seconds left
+        self.reserve = reserve
+        self.queries = 0
+        self.candidate_timeouts = 0
+        self.rerank_timeouts = 0
+        self.rerank_skipped = 0
+
+    def retrieve(self, term_ids: Tuple[int, ...], max_results: int = 3) -> Tuple[List[int], bool]:
+        """Top document IDs, and whether both stages finished within budget"""
+        self.queries += 1
+        started = time.perf_counter()
+        candidate_budget = min(self.candidate_budget, remaining(default=self.candidate_budget))
+        candidates, complete = self.index.candidates(term_ids, max(self.candidates, max_results),
+                                                     deadline=started + candidate_budget)
+        generated = time.perf_counter()
+        STAGE_DURATION.observe(generated - started, stage="retrieval_candidates")
+        if not complete:
+            self.candidate_timeouts += 1
+            logger.warning(f"Candidate generation over its {candidate_budget * 1000:.0f}ms budget")
+
+        if not has_time(self.reserve + self.rerank_budget):
+            self.rerank_skipped += 1
+            return [doc_id for doc_id, _ in candidates[:max_results]], False
+
+        terms = {self.index.terms.term(term_id) for term_id in term_ids}
+        ranked = self.reranker.rerank(candidates, terms, deadline=generated + self.rerank_budget)
+        STAGE_DURATION.observe(time.perf_counter() - generated, stage="retrieval_rerank")
+        if ranked is None:
+            self.rerank_timeouts += 1
+            complete = False
+            ranked = [doc_id for doc_id, _ in candidates]
+        return ranked[:max_results], complete
+
+    def get_status(self) -> dict:
+        return {
+            "candidates": self.candidates,
+            "candidate_budget_ms": round(self.candidate_budget * 1000, 1),
+            "rerank_budget_ms": round(self.rerank_budget * 1000, 1),
+            "queries": self.queries,
+            "candidate_timeouts": self.candidate_timeouts,
+            "rerank_timeouts": self.rerank_timeouts,
+            "rerank_skipped": self.rerank_skipped
+        }
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Response cache shared by all workers through SQLite
+
+Answers to stand-alone questions are cached under two keys: the exact
+question (case and whitespace folded) and a normalized key made of its
+words in order, which also matches questions that only differ in
+punctuation. Word order is kept, since "does A depend on B" and "does B
+depend on A" are different questions. Keys are namespaced by prompt
+template, index generation and anything user-specific in the prompt, so a
+corpus reload invalidates them and answers are not shared across users.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def exact_key(question: str) -> str:
+    return " ".join(question.lower().split())
+
+
+def normalized_key(question: str) -> str:
+    return " ".join(WORD_PATTERN.findall(question.lower()))
+
+
+def _digest(namespace: str, tier: str, key: str) -> str:
+    return hashlib.sha256(f"{namespace}\0{tier}\0{key}".encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """TTL-bounded question -> answer cache in a WAL-mode SQLite file"""
+
+    def __init__(self, path: str, ttl: float = 3600.0, max_entries: int = 10000, prune_every: int = 100):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.prune_every = prune_every
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits = {"exact": 0, "normalized": 0}
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Workers share the file; WAL lets readers proceed while one writes
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, answer TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, question: str, namespace: str) -> Optional[Tuple[str, str]]:
+        """Cached (answer, tier) for a question, trying the exact key first"""
+        keys = {"exact": _digest(namespace, "exact", exact_key(question)),
+                "normalized": _digest(namespace, "normalized", normalized_key(question))}
+        cutoff = time.time() - self.ttl
+        try:
+            with self._lock:
+                rows = dict(self._conn.execute(
+                    "SELECT key, answer FROM responses WHERE key IN (?, ?) AND created_at >= ?",
+                    (keys["exact"], keys["normalized"], cutoff)
+                ).fetchall())
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+        for tier, key in keys.items():
+            if key in rows:
+                self.hits[tier] += 1
+                return rows[key], tier
+        self.misses += 1
+        return None
+
+    def put(self, question: str, namespace: str, answer: str):
+        """Store an answer under both keys"""
+        now = time.time()
+        rows = [(_digest(namespace, "exact", exact_key(question)), answer, now),
+                (_digest(namespace, "normalized", normalized_key(question)), answer, now)]
+        try:
+            with self._lock:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO responses (key, answer, created_at) VALUES (?, ?, ?)", rows
+                    )
+                self._puts += 1
+                if self._puts % self.prune_every == 0:
+                    self._prune(now)
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    def _prune(self, now: float):
+        with self._conn:
+            self._conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key NOT IN "
+                "(SELECT key FROM responses ORDER BY created_at DESC LIMIT ?)", (self.max_entries,)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get_status(self) -> dict:
+        lookups = self.misses + sum(self.hits.values())
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "path": self.path,
+            "ttl": self.ttl,
+            "entries": entries,
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "hit_rate": round(sum(self.hits.values()) / lookups, 3) if lookups else 0.0
+        }
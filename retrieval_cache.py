@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+LRU cache of retrieval results
+
+Maps a query's normalized terms to the ranked document IDs it retrieved,
+so repeated and reworded questions skip scoring the corpus. Only IDs are
+stored, keeping entries small; the cache empties itself whenever the index
+generation changes, since IDs from an older corpus no longer apply.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Tuple
+
+
+class RetrievalCache:
+    """Thread-safe LRU of query key -> ranked document IDs for one index generation"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[int, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _check_generation(self, generation: int):
+        if generation != self.generation:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.generation = generation
+
+    def get(self, generation: int, key: Hashable) -> Optional[Tuple[int, ...]]:
+        if self.max_entries <= 0:
+            return None
+        with self._lock:
+            self._check_generation(generation)
+            doc_ids = self._entries.get(key)
+            if doc_ids is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return doc_ids
+
+    def put(self, generation: int, key: Hashable, doc_ids):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._check_generation(generation)
+            self._entries[key] = tuple(doc_ids)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_status(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "max_entries": self.max_entries,
+            "entries": len(self._entries),
+            "generation": self.generation,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations
+        }
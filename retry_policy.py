@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Retry policy for upstream HTTP calls
+
+Decorrelated jittered backoff that honors Retry-After, bounded by a
+per-request deadline and a global retry budget so retries cannot pile
+extra load onto a provider that is already struggling.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from deadlines import current_deadline
+
+# Statuses worth retrying: throttling and transient server failures
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Statuses where the server rejected the request before doing any work,
+# so retrying is safe even for non-idempotent requests
+REJECTED_STATUSES = frozenset({429, 503})
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+class RetryBudget:
+    """Global token bucket: each request earns a fraction of a retry"""
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 20.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+            return False
+
+
+class RetryPolicy:
+    """Retries transient upstream failures with jittered exponential backoff"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.25, max_delay: float = 8.0,
+                 deadline: float = 45.0, max_retry_after: float = 30.0,
+                 budget: Optional[RetryBudget] = None, sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.max_retry_after = max_retry_after
+        self.budget = budget or RetryBudget()
+        self._sleep = sleep
+        self.requests = 0
+        self.retries = 0
+        self.retry_after_honored = 0
+        self.budget_exhausted = 0
+        self.deadline_exceeded = 0
+
+    def backoff(self, previous: float) -> float:
+        """Decorrelated jitter: random between base and 3x the previous delay"""
+        return min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous * 3)))
+
+    @staticmethod
+    def is_retryable(status: Optional[int] = None, error: Optional[BaseException] = None,
+                     idempotent: bool = True) -> bool:
+        """Whether a failure is safe to retry
+
+        Connection failures and explicit rejections (429/503) mean the server
+        never processed the request, so they are always safe. Timeouts and
+        other 5xx responses may have done work upstream and are only retried
+        for idempotent requests.
+        """
+        if error is not None:
+            if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+                return True
+            return idempotent and isinstance(error, (httpx.TimeoutException, httpx.RemoteProtocolError))
+        if status in REJECTED_STATUSES:
+            return True
+        return idempotent and status in RETRYABLE_STATUSES
+
+    def new_deadline(self) -> float:
+        """Absolute monotonic deadline for a request starting now, within the current request's deadline"""
+        deadline = time.monotonic() + self.deadline
+        request_deadline = current_deadline()
+        return deadline if request_deadline is None else min(deadline, request_deadline)
+
+    async def execute(self, send: Callable[[float], Awaitable[httpx.Response]], timeout: float = 30.0,
+                      deadline: Optional[float] = None, idempotent: bool = True,
+                      retry_timeouts: bool = True) -> httpx.Response:
+        """Call send(timeout) until it succeeds, fails permanently, or runs out of time
+
+        Returns the last response (retryable or not) so callers keep their
+        status handling; re-raises the last transport error if no response
+        was received. With retry_timeouts=False a timeout is raised at once,
+        for callers whose timeout is a cut-off rather than a sign of failure.
+        """
+        self.requests += 1
+        self.budget.deposit()
+        deadline = deadline if deadline is not None else self.new_deadline()
+        delay = self.base_delay
+        attempt = 0
+
+        while True:
+            attempt += 1
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.deadline_exceeded += 1
+                raise httpx.TimeoutException("Request deadline exceeded before sending")
+
+            response: Optional[httpx.Response] = None
+            try:
+                response = await send(min(timeout, remaining))
+            except httpx.TransportError as e:
+                if (attempt >= self.max_attempts or not self.is_retryable(error=e, idempotent=idempotent) or
+                        (not retry_timeouts and isinstance(e, httpx.TimeoutException))):
+                    raise
+                failure: BaseException = e
+            else:
+                if (response.status_code not in RETRYABLE_STATUSES or attempt >= self.max_attempts or
+                        not self.is_retryable(status=response.status_code, idempotent=idempotent)):
+                    return response
+                failure = None
+
+            delay = self.backoff(delay)
+            wait = delay
+            if response is not None:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None:
+                    if retry_after > self.max_retry_after:
+                        return response
+                    wait = max(wait, retry_after)
+                    self.retry_after_honored += 1
+
+            if time.monotonic() + wait >= deadline:
+                self.deadline_exceeded += 1
+                if response is not None:
+                    return response
+                raise failure
+            if not self.budget.try_withdraw():
+                self.budget_exhausted += 1
+                if response is not None:
+                    return response
+                raise failure
+
+            self.retries += 1
+            await self._sleep(wait)
+
+    def get_status(self) -> dict:
+        """Get retry configuration and counters"""
+        return {
+            "max_attempts": self.max_attempts,
+            "base_delay": self.base_delay,
+            "max_delay": self.max_delay,
+            "deadline": self.deadline,
+            "budget_tokens": round(self.budget.tokens, 2),
+            "requests": self.requests,
+            "retries": self.retries,
+            "retry_after_honored": self.retry_after_honored,
+            "budget_exhausted": self.budget_exhausted,
+            "deadline_exceeded": self.deadline_exceeded
+        }
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Shared read-only document index for multi-worker deployments
+
+The corpus is written once to an immutable generation file that every
+worker maps with mmap, so N workers share one copy of the index in the
+page cache instead of each holding the corpus in Python strings. The file
+holds the same analyzed terms and compact postings as the single-worker
+InvertedIndex, so queries match whole terms and rank the same way (and go
+through the same reranker) in either deployment; only the small term
+dictionary and postings tables are copied into each worker.
+
+A CURRENT file names the live generation. Rebuilds write a new generation
+and atomically swap CURRENT under a file lock; each worker checks CURRENT
+before searching and switches to the new generation on its next query.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from collections.abc import Sequence
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from postings import CompactPostings
+from simple_rag import InvertedIndex
+from text_analysis import TermDictionary
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"PAIDX002"
+HEADER = struct.Struct("<8sQQ")  # magic, document count, metadata length
+KEEP_GENERATIONS = 2
+
+
+def corpus_fingerprint(data_dir: str) -> str:
+    """Identify a corpus directory's contents by file names, sizes and mtimes"""
+    digest = hashlib.sha256()
+    if os.path.isdir(data_dir):
+        for filename in sorted(os.listdir(data_dir)):
+            if filename.endswith(('.txt', '.md')):
+                stat = os.stat(os.path.join(data_dir, filename))
+                digest.update(f"{filename}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _generation_of(filename: str) -> int:
+    """Generation number from a gen-NNNNNN.idx file name"""
+    return int(filename[4:-4])
+
+
+def write_index(path: str, files: List[dict], metadata: dict):
+    """Index files (name, text, modified) into an index file, atomically via a temporary file"""
+    documents = [file["text"] for file in files]
+    index = InvertedIndex(documents)
+    # Terms are \w+ tokens, so a newline cannot occur inside one
+    terms = "\n".join(index.terms.term(term_id) for term_id in range(len(index.terms))).encode("utf-8")
+    postings = index.postings.to_bytes()
+    texts = [doc.encode("utf-8") for doc in documents]
+    offsets = array("Q", [0])
+    for data in texts:
+        offsets.append(offsets[-1] + len(data))
+
+    metadata = {**metadata, "documents": len(documents), "characters": sum(len(doc) for doc in documents),
+                "terms": len(index.terms), "postings": index.posting_count,
+                "terms_bytes": len(terms), "postings_bytes": len(postings),
+                "names": [file["name"] for file in files], "modified": [file.get("modified") for file in files]}
+    meta = json.dumps(metadata, separators=(",", ":")).encode()
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(documents), len(meta)))
+        f.write(meta)
+        f.write(offsets.tobytes())
+        f.write(terms)
+        f.write(postings)
+        f.writelines(texts)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class _MappedTexts(Sequence):
+    """Document texts decoded from the map on access"""
+
+    def __init__(self, index: "SharedIndex"):
+        self._index = index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, doc_id: int) -> str:
+        return self._index.document(doc_id)
+
+
+class _MappedFiles(Sequence):
+    """The file records Reranker reads (name, text, modified), built on access"""
+
+    def __init__(self, index: "SharedIndex"):
+        self._index = index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, doc_id: int) -> dict:
+        metadata = self._index.metadata
+        return {"name": metadata["names"][doc_id], "text": self._index.document(doc_id),
+                "modified": metadata["modified"][doc_id]}
+
+
+class SharedIndex:
+    """A memory-mapped, read-only index generation"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, meta_len = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an index file")
+        position = HEADER.size
+        self.metadata = json.loads(self._mm[position:position + meta_len])
+        position += meta_len
+        offsets_size = (count + 1) * 8
+        self._offsets = array("Q", self._mm[position:position + offsets_size])
+        position += offsets_size
+        terms = TermDictionary()
+        terms_bytes = self._mm[position:position + self.metadata["terms_bytes"]]
+        for term in terms_bytes.decode("utf-8").split("\n") if terms_bytes else ():
+            terms.intern(term)
+        position += self.metadata["terms_bytes"]
+        self._postings_view = memoryview(self._mm)[position:position + self.metadata["postings_bytes"]]
+        position += self.metadata["postings_bytes"]
+        self._text_start = position
+        self._count = count
+        self.index = InvertedIndex.from_parts(_MappedTexts(self), terms, CompactPostings.from_buffer(self._postings_view))
+        self.files = _MappedFiles(self)
+
+    @property
+    def generation(self) -> int:
+        return self.metadata["generation"]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def document(self, doc_id: int) -> str:
+        start = self._text_start + self._offsets[doc_id]
+        end = self._text_start + self._offsets[doc_id + 1]
+        return self._mm[start:end].decode("utf-8")
+
+    def search(self, query: str, max_results: int = 3) -> List[int]:
+        """Candidate search on the analyzed postings, as InvertedIndex ranks it; returns document IDs, best first"""
+        return self.index.search_terms(self.index.query_key(query), max_results)
+
+    def close(self):
+        self.index.postings.release()
+        self._postings_view.release()
+        self._mm.close()
+
+
+class SharedIndexStore:
+    """Directory of index generations shared by all workers on a host"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._current_path = os.path.join(directory, "CURRENT")
+        self._lock_path = os.path.join(directory, "LOCK")
+        self._index: Optional[SharedIndex] = None
+        self._current_stat: Optional[Tuple[int, int]] = None
+        self._build_lock = threading.Lock()
+        self._swap_lock = threading.Lock()
+        self.swaps = 0
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Exclusive cross-process lock held while building or publishing"""
+        import fcntl
+
+        with self._build_lock, open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_current(self) -> Optional[str]:
+        try:
+            with open(self._current_path) as f:
+                name = f.read().strip()
+        except FileNotFoundError:
+            return None
+        return os.path.join(self.directory, name) if name else None
+
+    def _publish(self, files: List[dict], fingerprint: str) -> int:
+        current = self._read_current()
+        generation = _generation_of(os.path.basename(current)) + 1 if current else 1
+        name = f"gen-{generation:06d}.idx"
+        write_index(os.path.join(self.directory, name), files,
+                    {"generation": generation, "fingerprint": fingerprint, "created": time.time()})
+        tmp_path = f"{self._current_path}.tmp{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            f.write(name)
+        os.replace(tmp_path, self._current_path)
+        self._remove_old_generations(generation)
+        logger.info(f"Published index generation {generation} with {len(files)} documents")
+        return generation
+
+    def _remove_old_generations(self, generation: int):
+        # Workers still mapping an unlinked generation keep reading it until they swap
+        for filename in os.listdir(self.directory):
+            if filename.startswith("gen-") and filename.endswith(".idx"):
+                if _generation_of(filename) <= generation - KEEP_GENERATIONS:
+                    os.remove(os.path.join(self.directory, filename))
+
+    def ensure(self, load_files: Callable[[], List[dict]], fingerprint: str) -> int:
+        """Build a generation unless the live one already matches the corpus
+
+        Workers starting together wait on the lock; the first builds and the
+        rest find a matching generation and just map it. Generations written
+        in an older file format are rebuilt.
+        """
+        with self._locked():
+            current = self._read_current()
+            if current and os.path.exists(current):
+                with open(current, "rb") as f:
+                    header = f.read(HEADER.size)
+                if header[:len(MAGIC)] == MAGIC:
+                    index = SharedIndex(current)
+                    generation = index.generation
+                    matches = index.metadata.get("fingerprint") == fingerprint
+                    index.close()
+                    if matches:
+                        return generation
+            return self._publish(load_files(), fingerprint)
+
+    def rebuild(self, files: List[dict], fingerprint: str) -> int:
+        """Publish a new generation; every worker switches to it on its next query"""
+        with self._locked():
+            return self._publish(files, fingerprint)
+
+    def current(self) -> Optional[SharedIndex]:
+        """The live generation, reopened if another worker published a new one"""
+        try:
+            stat = os.stat(self._current_path)
+        except FileNotFoundError:
+            return None
+        signature = (stat.st_ino, stat.st_mtime_ns)
+        if signature != self._current_stat:
+            path = self._read_current()
+            if path is None:
+                return None
+            index = SharedIndex(path)
+            with self._swap_lock:
+                if self._index is not None:
+                    self.swaps += 1
+                # The old map is released once no in-flight search still references it
+                self._index = index
+                self._current_stat = signature
+        return self._index
+
+    def get_status(self) -> dict:
+        index = self._index
+        return {
+            "directory": self.directory,
+            "generation": index.generation if index else None,
+            "documents": len(index) if index else 0,
+            "terms": index.metadata["terms"] if index else 0,
+            "postings": index.metadata["postings"] if index else 0,
+            "bytes": os.path.getsize(index.path) if index and os.path.exists(index.path) else 0,
+            "swaps": self.swaps
+        }
@@ -3,17 +3,22 @@
 Simple RAG (Retrieval-Augmented Generation) implementation
 """
 
+import heapq
 import os
-from typing import List
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
 from dotenv import load_dotenv
+from postings import SKIP_RATIO, CompactPostings
+from text_analysis import TermDictionary, normalize_token, tokenize
 
-def load_documents(data_dir: str = "data") -> List[str]:
-    """Load documents from data directory"""
-    documents = []
+def load_document_files(data_dir: str = "data") -> List[dict]:
+    """Load documents with their file name and modification time"""
+    files = []
     
     if not os.path.exists(data_dir):
         print(f"Data directory {data_dir} not found")
-        return documents
+        return files
     
     for filename in os.listdir(data_dir):
         if filename.endswith(('.txt', '.md')):
@@ -21,12 +26,16 @@ def load_documents(data_dir: str = "data") -> List[str]:
             try:
                 with open(filepath, 'r', encoding='utf-8') as f:
                     content = f.read()
-                    documents.append(content)
+                    files.append({"name": filename, "text": content, "modified": os.path.getmtime(filepath)})
                     print(f"Loaded: {filename}")
             except Exception as e:
                 print(f"Error loading {filename}: {e}")
     
-    return documents
+    return files
+
+def load_documents(data_dir: str = "data") -> List[str]:
+    """Load documents from data directory"""
+    return [file["text"] for file in load_document_files(data_dir)]
 
 def simple_search(query: str, documents: List[str], max_results: int = 3) -> List[str]:
     """Simple keyword-based document search"""
@@ -47,6 +56,165 @@ def simple_search(query: str, documents: List[str], max_results: int = 3) -> Lis
     results.sort(key=lambda x: x[0], reverse=True)
     return [doc for score, doc in results[:max_results]]
 
+def simple_search_batch(queries: List[str], documents: List[str], max_results: int = 3) -> List[List[str]]:
+    """Run simple_search for many queries in one pass over the documents
+
+    Each document is lowercased once per batch instead of once per query,
+    and a word shared by several queries is only counted once.
+    """
+    query_words = [query.lower().split() for query in queries]
+    vocabulary = {word for words in query_words for word in words}
+    scored = [[] for _ in queries]
+    
+    for doc in documents:
+        doc_lower = doc.lower()
+        counts = {word: doc_lower.count(word) for word in vocabulary}
+        for candidates, words in zip(scored, query_words):
+            score = sum(counts[word] for word in words)
+            if score > 0:
+                candidates.append((score, doc))
+    
+    for candidates in scored:
+        candidates.sort(key=lambda x: x[0], reverse=True)
+    return [[doc for score, doc in candidates[:max_results]] for candidates in scored]
+
+MATCH_WEIGHT = 1 << 32  # Larger than any document's summed term frequency
+
+class InvertedIndex:
+    """Keyword index over analyzed terms: term ID -> documents containing it
+
+    Documents and queries share text_analysis's pipeline, so "assistant?"
+    matches "assistant" and stop words like "a" match nothing. A query
+    only touches the postings of its own terms instead of every document.
+    Documents matching more of the query's terms rank first, then by
+    summed term frequency; ties keep corpus order.
+    """
+    
+    def __init__(self, documents: List[str]):
+        self.documents = documents
+        self.terms = TermDictionary()
+        postings: List[List[int]] = []  # Per term ID: document IDs, ascending
+        frequencies: List[List[int]] = []  # Per term ID: occurrences in each of those documents
+        # Each distinct token is stemmed once; -1 marks stop words
+        token_terms: Dict[str, int] = {}
+        for doc_id, doc in enumerate(documents):
+            counts: Dict[int, int] = {}
+            for token, count in Counter(tokenize(doc)).items():
+                term_id = token_terms.get(token)
+                if term_id is None:
+                    term = normalize_token(token)
+                    term_id = self.terms.intern(term) if term else -1
+                    token_terms[token] = term_id
+                if term_id >= 0:
+                    counts[term_id] = counts.get(term_id, 0) + count
+            for term_id, count in counts.items():
+                while term_id >= len(postings):
+                    postings.append([])
+                    frequencies.append([])
+                postings[term_id].append(doc_id)
+                frequencies[term_id].append(count)
+        # The lists are only needed while building; queries read the packed form
+        self.postings = CompactPostings(postings, frequencies)
+    
+    @classmethod
+    def from_parts(cls, documents: Sequence[str], terms: TermDictionary,
+                   postings: CompactPostings) -> "InvertedIndex":
+        """An index over already-built terms and postings, e.g. read from a shared index file"""
+        index = cls.__new__(cls)
+        index.documents = documents
+        index.terms = terms
+        index.postings = postings
+        return index
+    
+    def __len__(self) -> int:
+        return len(self.documents)
+    
+    @property
+    def posting_count(self) -> int:
+        return self.postings.posting_count
+    
+    def query_key(self, query: str) -> Tuple[int, ...]:
+        """Sorted IDs of the query's terms that occur in the corpus; unknown terms cannot match"""
+        term_ids = set()
+        for token in tokenize(query):
+            term = normalize_token(token)
+            term_id = self.terms.lookup(term) if term else None
+            if term_id is not None:
+                term_ids.add(term_id)
+        return tuple(sorted(term_ids))
+    
+    def candidates(self, term_ids: Tuple[int, ...], count: int,
+                   deadline: Optional[float] = None) -> Tuple[List[Tuple[int, int]], bool]:
+        """Top (document ID, score) pairs, best first, and whether scoring finished
+
+        MaxScore-style pruning: a term adds at most MATCH_WEIGHT plus its
+        largest frequency to a score, so documents that cannot reach the
+        current top `count` are never scored. If at least `count` documents
+        contain every term, nothing outside that intersection can reach
+        them. Otherwise terms are scored rarest first, and once no new
+        document can reach the top, the remaining (longer) lists only update
+        documents already being scored, seeking with skip pointers. Past
+        the perf_counter() deadline the best scored so far is returned.
+        """
+        postings = self.postings
+        if not term_ids or count <= 0:
+            return [], True
+        if deadline is not None and time.perf_counter() > deadline:
+            return [], False
+        if len(term_ids) > 1:
+            doc_ids, totals = postings.intersect(term_ids)
+            if len(doc_ids) >= count:
+                # nlargest is stable and doc_ids ascend, so ties keep corpus order
+                best = heapq.nlargest(count, range(len(doc_ids)), key=totals.__getitem__)
+                weight = MATCH_WEIGHT * len(term_ids)
+                return [(doc_ids[i], weight + totals[i]) for i in best], True
+        
+        ordered = sorted(term_ids, key=postings.doc_freq)
+        # Most a document can still gain from the terms not yet scored
+        remaining = sum(MATCH_WEIGHT + postings.max_frequency(term_id) for term_id in ordered)
+        scores: Dict[int, int] = {}
+        for term_id in ordered:
+            if deadline is not None and time.perf_counter() > deadline:
+                return self._top(scores, count), False
+            threshold = heapq.nlargest(count, scores.values())[-1] if len(scores) >= count else -1
+            if threshold > remaining:
+                # A document not scored yet cannot reach the top; drop those that no longer can either
+                scores = {doc_id: score for doc_id, score in scores.items() if score + remaining >= threshold}
+                self._add_to_scored(scores, term_id)
+            else:
+                for doc_id, freq in zip(*postings.postings(term_id)):
+                    scores[doc_id] = scores.get(doc_id, 0) + MATCH_WEIGHT + freq
+            remaining -= MATCH_WEIGHT + postings.max_frequency(term_id)
+        return self._top(scores, count), True
+    
+    def _add_to_scored(self, scores: Dict[int, int], term_id: int):
+        """Add a term's contribution to documents already in scores only"""
+        postings = self.postings
+        if postings.doc_freq(term_id) > SKIP_RATIO * len(scores):
+            cursor = postings.cursor(term_id)
+            for doc_id in sorted(scores):
+                found = cursor.next_geq(doc_id)
+                if found is None:
+                    break
+                if found == doc_id:
+                    scores[doc_id] += MATCH_WEIGHT + cursor.freq
+        else:
+            for doc_id, freq in zip(*postings.postings(term_id)):
+                if doc_id in scores:
+                    scores[doc_id] += MATCH_WEIGHT + freq
+    
+    @staticmethod
+    def _top(scores: Dict[int, int], count: int) -> List[Tuple[int, int]]:
+        return [(doc_id, scores[doc_id]) for doc_id in heapq.nlargest(count, sorted(scores), key=scores.__getitem__)]
+    
+    def search_terms(self, term_ids: Tuple[int, ...], max_results: int = 3) -> List[int]:
+        """Top document IDs for a set of term IDs, best first"""
+        return [doc_id for doc_id, _ in self.candidates(term_ids, max_results)[0]]
+    
+    def search(self, query: str, max_results: int = 3) -> List[str]:
+        """Top documents for a query, best first"""
+        return [self.documents[doc_id] for doc_id in self.search_terms(self.query_key(query), max_results)]
+
 def main():
     """Test the simple RAG functionality"""
     load_dotenv()
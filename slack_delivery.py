@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Outbound Slack message delivery
+
+Replies are queued per channel and posted by a background task for that
+channel, so a slow or rate-limited Slack API never holds up the handler
+(and the LLM call it made). Each channel queue:
+
+- posts in order, at most about one message per second with short bursts
+  (chat.postMessage's per-channel limit); a send spends its token when it
+  completes, so the gap before the next post is measured from when Slack
+  had the previous one, however long its connection took
+- waits out 429 responses for as long as Retry-After says, through the
+  shared RetryPolicy; posts are not idempotent, so only requests Slack
+  rejected outright (connection failures, 429, 503) are retried
+- splits long replies into Block Kit section blocks, and into several
+  messages when a reply needs more blocks than one message allows
+
+The Web API client shares one keep-alive httpx client per event loop.
+Each post is traced as a root span linked to the span that queued it.
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from metrics import STAGE_DURATION
+from retry_policy import RetryBudget, RetryPolicy
+from tracing import SPAN_KIND_CLIENT, Tracer, current_span
+
+logger = logging.getLogger(__name__)
+
+SECTION_LIMIT = 3000  # Characters of text in one section block
+MAX_BLOCKS = 50  # Blocks in one message
+FALLBACK_LIMIT = 3000  # Characters of the plain-text fallback shown in notifications
+
+
+def split_text(text: str, limit: int = SECTION_LIMIT) -> List[str]:
+    """Split text into chunks of at most limit characters, preferring paragraph, line and word breaks"""
+    chunks = []
+    text = text.strip()
+    while len(text) > limit:
+        window = text[:limit + 1]
+        for separator in ("\n\n", "\n", " "):
+            cut = window.rfind(separator)
+            if cut > limit // 2:
+                break
+        else:
+            cut = limit
+        chunks.append(text[:cut].rstrip())
+        text = text[cut:].lstrip()
+    if text:
+        chunks.append(text)
+    return chunks
+
+
+def build_messages(text: str, section_limit: int = SECTION_LIMIT, max_blocks: int = MAX_BLOCKS) -> List[dict]:
+    """chat.postMessage bodies (text fallback plus section blocks) carrying a reply"""
+    chunks = split_text(text, section_limit) or [text]
+    messages = []
+    for start in range(0, len(chunks), max_blocks):
+        group = chunks[start:start + max_blocks]
+        fallback = "\n\n".join(group)
+        if len(fallback) > FALLBACK_LIMIT:
+            fallback = fallback[:FALLBACK_LIMIT - 1].rstrip() + "…"
+        messages.append({
+            "text": fallback,
+            "blocks": [{"type": "section", "text": {"type": "mrkdwn", "text": chunk}} for chunk in group]
+        })
+    return messages
+
+
+class SlackWebClient:
+    """Minimal async Slack Web API client over a pooled httpx client"""
+
+    def __init__(self, token: str, base_url: str = "https://slack.com/api/", timeout: float = 10.0,
+                 max_connections: int = 20):
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json; charset=utf-8"}
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._http_client_loop = None
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._http_client is None or self._http_client.is_closed or self._http_client_loop is not loop:
+            self._http_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections)
+            )
+            self._http_client_loop = loop
+        return self._http_client
+
+    async def post(self, method: str, payload: dict, timeout: Optional[float] = None) -> httpx.Response:
+        """POST a JSON body to a Web API method"""
+        return await self._get_http_client().post(self.base_url + method, headers=self.headers, json=payload,
+                                                  timeout=timeout or self.timeout)
+
+    async def aclose(self):
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+
+class _Channel:
+    """One channel's queue, rate limiter and sender task"""
+
+    def __init__(self, burst: int):
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.task: Optional[asyncio.Task] = None
+        self.sending = False
+
+
+class SlackDelivery:
+    """Per-channel send queues for chat.postMessage that respect Slack's rate limits"""
+
+    def __init__(self, client: SlackWebClient, rate: float = 1.0, burst: int = 3, max_queue: int = 100,
+                 idle_seconds: float = 30.0, retry_policy: Optional[RetryPolicy] = None,
+                 tracer: Optional[Tracer] = None):
+        self.client = client
+        self.rate = rate
+        self.burst = burst
+        self.max_queue = max_queue
+        self.idle_seconds = idle_seconds
+        # Waiting out Retry-After is the point here, so the retry budget is generous
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=5, base_delay=1.0, max_delay=10.0,
+                                                        deadline=120.0, max_retry_after=60.0,
+                                                        budget=RetryBudget(ratio=1.0, max_tokens=50.0))
+        self.tracer = tracer or Tracer()
+        self._channels: Dict[str, _Channel] = {}
+        self._loop = None
+        self.queued = 0
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.rate_limited = 0
+
+    def deliver(self, channel: str, text: str, thread_ts: Optional[str] = None,
+                event_id: Optional[str] = None) -> bool:
+        """Queue a reply for a channel without waiting for Slack; False if the channel's queue is full
+
+        event_id names the Slack event being answered, for tracing.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Queues and tasks belong to one event loop
+            self._channels = {}
+            self._loop = loop
+        state = self._channels.get(channel)
+        if state is None:
+            state = self._channels[channel] = _Channel(self.burst)
+        messages = build_messages(text)
+        if state.queue.qsize() + len(messages) > self.max_queue:
+            self.dropped += len(messages)
+            logger.warning(f"Slack delivery queue for {channel} is full; dropped a reply")
+            return False
+        queued_at = time.perf_counter()
+        origin = current_span().context
+        for message in messages:
+            body = {"channel": channel, **message}
+            if thread_ts:
+                body["thread_ts"] = thread_ts
+            state.queue.put_nowait((body, queued_at, origin, event_id))
+        self.queued += len(messages)
+        if state.task is None or state.task.done():
+            # A fresh context, so the sender does not inherit this request's deadline or trace
+            state.task = loop.create_task(self._run(channel, state), context=contextvars.Context())
+        return True
+
+    async def _throttle(self, state: _Channel):
+        """Wait until the channel's bucket has a token; _spend takes it once the send completes"""
+        while True:
+            now = time.monotonic()
+            state.tokens = min(float(self.burst), state.tokens + (now - state.updated) * self.rate)
+            state.updated = now
+            if state.tokens >= 1.0:
+                return
+            await asyncio.sleep((1.0 - state.tokens) / self.rate)
+
+    @staticmethod
+    def _spend(state: _Channel):
+        """Take a send's token when it completes; the bucket refills from then, not from when the send started"""
+        state.tokens -= 1.0
+        state.updated = time.monotonic()
+
+    async def _run(self, channel: str, state: _Channel):
+        """Send a channel's queued messages in order, exiting once the queue has been idle for a while"""
+        while True:
+            try:
+                body, queued_at, origin, event_id = await asyncio.wait_for(state.queue.get(), self.idle_seconds)
+            except asyncio.TimeoutError:
+                if state.queue.empty():
+                    if self._channels.get(channel) is state:
+                        del self._channels[channel]
+                    return
+                continue
+            state.sending = True
+            try:
+                await self._throttle(state)
+                queue_seconds = time.perf_counter() - queued_at
+                STAGE_DURATION.observe(queue_seconds, stage="slack_delivery_queue")
+                try:
+                    with self.tracer.span("slack.post", SPAN_KIND_CLIENT, links=[origin], **{
+                            "slack.event_id": event_id,
+                            "slack.channel": channel, "slack.thread_ts": body.get("thread_ts"),
+                            "slack.blocks": len(body.get("blocks", [])),
+                            "slack.queue_seconds": round(queue_seconds, 4)}):
+                        await self._send(body)
+                finally:
+                    self._spend(state)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Failed to deliver Slack message to {channel}: {e}")
+            finally:
+                state.sending = False
+                state.queue.task_done()
+
+    async def _send(self, body: dict):
+        """Post one message, retrying what Slack rejected before doing any work"""
+        async def send(timeout: float) -> httpx.Response:
+            response = await self.client.post("chat.postMessage", body, timeout=timeout)
+            if response.status_code == 429:
+                self.rate_limited += 1
+                logger.warning(f"Slack rate limited {body['channel']}; Retry-After {response.headers.get('Retry-After')}")
+            return response
+
+        started = time.perf_counter()
+        response = await self.retry_policy.execute(send, timeout=self.client.timeout, idempotent=False)
+        STAGE_DURATION.observe(time.perf_counter() - started, stage="slack_post")
+        current_span().set_attribute("http.response.status_code", response.status_code)
+        data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {}
+        if response.status_code != 200 or not data.get("ok"):
+            raise RuntimeError(f"chat.postMessage failed: HTTP {response.status_code} {data.get('error', '')}".strip())
+        self.sent += 1
+
+    async def drain(self, timeout: float = 5.0) -> bool:
+        """Wait for queued messages to be sent (e.g. at shutdown); False if some were still pending"""
+        pending = [state.queue.join() for state in list(self._channels.values())]
+        if not pending:
+            return True
+        try:
+            await asyncio.wait_for(asyncio.gather(*pending), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def aclose(self, timeout: float = 5.0) -> int:
+        """Give queued messages up to timeout to be sent, then stop the senders; returns how many were not sent"""
+        delivered = await self.drain(timeout)
+        channels = list(self._channels.values())
+        undelivered = sum(state.queue.qsize() + state.sending for state in channels)
+        tasks = [state.task for state in channels if state.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._channels = {}
+        await self.client.aclose()
+        if not delivered:
+            logger.warning(f"Closed Slack delivery with {undelivered} messages not sent")
+        return undelivered
+
+    def get_status(self) -> dict:
+        return {
+            "rate_per_channel": self.rate,
+            "burst": self.burst,
+            "channels": len(self._channels),
+            "pending": sum(state.queue.qsize() for state in self._channels.values()),
+            "queued": self.queued,
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "rate_limited": self.rate_limited,
+            "retries": self.retry_policy.retries
+        }
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Test script for batch question answering
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+
+# Add the benchmarks directory for the mock LLM server
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from batch_qa import BatchRunner, Checkpoint, parse_questions
+from concurrency_limit import AdaptiveLimiter
+from mock_llm_server import MockBehavior, MockLLMServer
+from retry_policy import RetryPolicy
+from simple_rag import simple_search, simple_search_batch
+
+class FakeClient:
+    """Answers after a random delay and records peak concurrency"""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.in_flight = 0
+        self.peak = 0
+        self.calls = []
+
+    async def answer(self, message, user_id, thread_key=None, context=None, retrieve=True):
+        assert retrieve is False
+        self.calls.append(message)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(random.uniform(0.001, 0.01))
+            if message in self.fail:
+                raise RuntimeError("upstream error")
+            return f"answer to {message} with {context}"
+        finally:
+            self.in_flight -= 1
+
+class FakeRAG:
+    def __init__(self):
+        self.batches = []
+
+    async def query_documents_batch(self, queries):
+        self.batches.append(len(queries))
+        return [f"ctx:{query}" for query in queries]
+
+def _questions(n):
+    return [{"request_id": f"q{i}", "question": f"question {i}"} for i in range(n)]
+
+async def _collect(runner, questions, checkpoint=None):
+    return [result async for result in runner.run(questions, checkpoint)]
+
+def test_parse_questions():
+    """Both backlog-style and question-style records are accepted"""
+    print("=== Batch Parse Test ===")
+    questions = parse_questions([
+        '{"request_id": "a", "title": "Title", "body": "Body"}',
+        '',
+        '{"question": "Plain question?"}',
+    ])
+    assert questions == [{"request_id": "a", "question": "Title\n\nBody"},
+                         {"request_id": "line-3", "question": "Plain question?"}]
+    for bad in (['not json'], ['[1, 2]'], ['{"request_id": "x"}'],
+                ['{"id": 1, "question": "a"}', '{"id": 1, "question": "b"}']):
+        try:
+            parse_questions(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad} should be rejected")
+    print("✅ Questions parsed and bad input rejected")
+
+def test_bounded_concurrency_and_batched_retrieval():
+    """All questions answered with at most `concurrency` LLM calls in flight"""
+    print("\n=== Batch Concurrency Test ===")
+    client, rag = FakeClient(), FakeRAG()
+    runner = BatchRunner(client, rag, concurrency=4, batch_size=10)
+    results = asyncio.run(_collect(runner, _questions(25)))
+
+    assert sorted(r["request_id"] for r in results) == sorted(q["request_id"] for q in _questions(25))
+    assert all(r["status"] == "ok" and r["has_context"] for r in results)
+    assert results[0]["answer"].endswith(f"ctx:{results[0]['question']}")
+    assert client.peak <= 4
+    assert rag.batches == [10, 10, 5]
+    print(f"✅ 25 answered, peak {client.peak} in flight, retrieval batches {rag.batches}")
+
+def test_shares_the_service_limit():
+    """Batch calls wait for limiter slots, never shed, and report failures to it"""
+    print("\n=== Batch Load Limit Test ===")
+    client = FakeClient(fail={"question 3"})
+    limiter = AdaptiveLimiter(initial=2, min_limit=2, max_limit=2)
+    held = limiter.try_acquire()  # An interactive reply in progress
+    results = asyncio.run(_collect(BatchRunner(client, None, concurrency=8, limiter=limiter), _questions(10)))
+    assert len(results) == 10 and client.peak <= 1
+    status = limiter.get_status()
+    assert status["shed"] == 0 and status["admitted"] == 11 and status["inflight"] == 1
+    assert status["decreases"] == 1  # The failed question
+    limiter.release(held)
+    print(f"✅ Peak {client.peak} in flight beside one interactive reply")
+
+def test_checkpoint_resume():
+    """A rerun only answers questions that are not already ok in the checkpoint"""
+    print("\n=== Batch Checkpoint Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "job.ndjson")
+        checkpoint = Checkpoint(path)
+        results = asyncio.run(_collect(BatchRunner(FakeClient(fail={"question 2"}), None), _questions(5), checkpoint))
+        checkpoint.close()
+        assert [r["status"] for r in results].count("error") == 1
+
+        # Simulate a crash mid-write
+        with open(path, "a") as f:
+            f.write('{"request_id": "q4", "sta')
+
+        checkpoint = Checkpoint(path)
+        assert checkpoint.completed == {"q0", "q1", "q3", "q4"}
+        client = FakeClient()
+        results = asyncio.run(_collect(BatchRunner(client, None), _questions(5), checkpoint))
+        checkpoint.close()
+        assert client.calls == ["question 2"]
+        assert [r["request_id"] for r in results] == ["q2"]
+        assert not results[0]["has_context"]
+    print("✅ Resumed run answered only the failed question")
+
+def test_upstream_failure_retried_on_resume():
+    """Questions the LLM failed to answer are errors, not checkpointed, and answered on resume"""
+    print("\n=== Batch Upstream Failure Test ===")
+    from main import HypermodeClient
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "job.ndjson")
+
+        def run(behavior):
+            with MockLLMServer(behavior) as server:
+                client = HypermodeClient("test-key", server.base_url, retry_policy=RetryPolicy(max_attempts=1))
+                checkpoint = Checkpoint(path)
+                try:
+                    return asyncio.run(_collect(BatchRunner(client, None), _questions(2), checkpoint))
+                finally:
+                    checkpoint.close()
+
+        results = run(MockBehavior(latency=0.0, error_rate=1.0, error_status=500))
+        assert [r["status"] for r in results] == ["error", "error"]
+        checkpoint = Checkpoint(path)
+        assert checkpoint.completed == set()
+        checkpoint.close()
+
+        results = run(MockBehavior(latency=0.0))
+        assert sorted(r["request_id"] for r in results) == ["q0", "q1"]
+        assert all(r["status"] == "ok" and r["answer"].startswith("Mock answer to:") for r in results)
+    print("✅ Failed questions answered on resume")
+
+def test_search_batch_matches_simple_search():
+    """Batched search returns the same documents as per-query search"""
+    print("\n=== Batch Search Parity Test ===")
+    documents = ["Deploy with Render", "Slack bot setup and deploy", "RAG search over documents",
+                 "deploy deploy deploy", "Unrelated text"]
+    queries = ["deploy", "slack setup", "search documents", "nothing here", "Deploy RAG"]
+    assert simple_search_batch(queries, documents) == [simple_search(q, documents) for q in queries]
+    print("✅ simple_search_batch matches simple_search")
+
+def main():
+    """Main test function"""
+    print("🧪 Running batch QA tests...\n")
+
+    test_parse_questions()
+    test_bounded_concurrency_and_batched_retrieval()
+    test_shares_the_service_limit()
+    test_checkpoint_resume()
+    test_upstream_failure_retried_on_resume()
+    test_search_batch_matches_simple_search()
+
+    print(f"\n{'=' * 40}")
+    print("🎉 Batch QA tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test script for the adaptive concurrency limit
+"""
+
+import asyncio
+import time
+from concurrency_limit import AdaptiveLimiter
+
+def test_sheds_over_limit():
+    """Requests beyond the limit are turned away immediately"""
+    print("=== Load Shedding Test ===")
+    limiter = AdaptiveLimiter(initial=3, min_limit=1, batch_reserve=0)
+    slots = [limiter.try_acquire() for _ in range(5)]
+    assert slots[3] is None and slots[4] is None and all(slot is not None for slot in slots[:3])
+    limiter.release(slots[0])
+    assert limiter.try_acquire() is not None
+    assert limiter.get_status()["shed"] == 2
+
+    # Waiting callers take the next free slot instead of being shed
+    async def wait_for_slot():
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.03)
+        assert not waiter.done()
+        limiter.release(slots[1])
+        return await asyncio.wait_for(waiter, 1.0)
+    assert asyncio.run(wait_for_slot()) is not None
+    assert limiter.inflight == 3 and limiter.get_status()["shed"] == 2
+    print("✅ Excess requests shed")
+
+def test_aimd():
+    """Fast completions grow the limit additively, slow ones cut it once per round"""
+    print("\n=== AIMD Test ===")
+    limiter = AdaptiveLimiter(initial=10, min_limit=2, max_limit=12, latency_target=0.5, backoff=0.5)
+    for _ in range(100):
+        slots = [limiter.try_acquire() for _ in range(int(limiter.limit))]
+        for slot in slots:
+            limiter.release(slot)
+    assert limiter.limit == 12
+
+    # A round of slow completions cuts the limit once, not once per completion
+    slots = [limiter.try_acquire() for _ in range(6)]
+    for slot in slots:
+        limiter.release(slot - 1.0)
+    assert limiter.limit == 6 and limiter.decreases == 1
+    # Failures count as slow; requests started after the cut cut again
+    time.sleep(0.001)
+    limiter.release(limiter.try_acquire(), ok=False)
+    assert limiter.limit == 3
+    time.sleep(0.001)
+    limiter.release(limiter.try_acquire(), ok=False)
+    assert limiter.limit == 2  # Never below the minimum
+
+    # An idle service does not inflate the limit
+    idle = AdaptiveLimiter(initial=10)
+    for _ in range(50):
+        idle.release(idle.try_acquire())
+    assert idle.limit == 10
+    print("✅ Limit adapts additively up and multiplicatively down")
+
+def test_batch_leaves_room_for_interactive():
+    """Waiting batch work is woken by release but leaves the reserved slots to try_acquire"""
+    print("\n=== Batch Reserve Test ===")
+    limiter = AdaptiveLimiter(initial=4, min_limit=4, max_limit=4, batch_reserve=0.5)
+
+    async def compete():
+        batch = [asyncio.create_task(limiter.acquire()) for _ in range(4)]
+        await asyncio.sleep(0)
+        assert sum(task.done() for task in batch) == 2 and limiter.get_status()["waiting"] == 2
+        # Interactive requests still get the reserved half
+        interactive = [limiter.try_acquire(), limiter.try_acquire()]
+        assert None not in interactive and limiter.try_acquire() is None
+        # A finished batch call frees a slot, but it is not handed to batch work
+        # while interactive requests hold the reserve
+        limiter.release(batch[0].result())
+        await asyncio.sleep(0.01)
+        interactive.append(limiter.try_acquire())
+        assert sum(task.done() for task in batch) == 2 and interactive[-1] is not None
+        for slot in interactive:
+            limiter.release(slot)
+        # Released slots wake the waiters at once, in order, without polling
+        started = time.monotonic()
+        await asyncio.wait_for(batch[2], 1.0)
+        assert time.monotonic() - started < 0.01 and not batch[3].done()
+        # A cancelled waiter gives up its place in line
+        batch[3].cancel()
+        await asyncio.gather(batch[3], return_exceptions=True)
+        return limiter.get_status()
+
+    status = asyncio.run(compete())
+    assert status["waiting"] == 0 and status["inflight"] == 2 and status["shed"] == 1
+    print("✅ Batch work waits without taking the interactive reserve")
+
+def main():
+    """Main test function"""
+    print("🧪 Running concurrency limit tests...\n")
+
+    test_sheds_over_limit()
+    test_aimd()
+    test_batch_leaves_room_for_interactive()
+
+    print(f"\n{'=' * 40}")
+    print("🎉 Concurrency limit tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test script for conversation memory
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+from conversation_memory import ConversationMemory, SQLiteMemoryStore, build_thread_key, estimate_tokens
+
+def test_ring_buffer_and_summary():
+    """Old turns roll out of the buffer into the summary"""
+    print("=== Conversation Memory Ring Buffer Test ===")
+    memory = ConversationMemory(max_turns=4)
+    key = build_thread_key("C123", "1700000000.0001")
+
+    for i in range(4):
+        memory.add_exchange(key, f"question {i}", f"answer {i}")
+
+    history = memory.get_history(key, token_budget=1000)
+    assert history[0]["role"] == "system"
+    assert "question 0" in history[0]["content"]
+    assert [m["content"] for m in history[1:]] == ["question 2", "answer 2", "question 3", "answer 3"]
+    print("✅ Ring buffer keeps recent turns and summarizes older ones")
+
+def test_token_budget():
+    """History is trimmed to the token budget, newest turns first"""
+    print("\n=== Conversation Memory Token Budget Test ===")
+    memory = ConversationMemory(max_turns=10)
+    memory.add_exchange("C1", "a" * 400, "b" * 400)
+    memory.add_exchange("C1", "short question", "short answer")
+
+    history = memory.get_history("C1", token_budget=20)
+    assert [m["content"] for m in history] == ["short question", "short answer"]
+    assert sum(estimate_tokens(m["content"]) for m in history) <= 20
+    assert memory.get_history("unknown", token_budget=100) == []
+    print("✅ History respects the token budget")
+
+def test_lru_eviction():
+    """Least recently used threads are evicted past the cap"""
+    print("\n=== Conversation Memory Eviction Test ===")
+    memory = ConversationMemory(max_turns=4, max_threads=2)
+    memory.add_turn("C1", "user", "one")
+    memory.add_turn("C2", "user", "two")
+    memory.get_history("C1")
+    memory.add_turn("C3", "user", "three")
+
+    status = memory.get_status()
+    assert status["threads"] == 2
+    assert status["evictions"] == 1
+    assert memory.get_history("C2") == []
+    assert memory.get_history("C1")
+    print("✅ Idle threads are evicted")
+
+def test_sqlite_persistence():
+    """Persisted threads survive a restart"""
+    print("\n=== Conversation Memory Persistence Test ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "memory.db")
+        memory = ConversationMemory(store=SQLiteMemoryStore(path, batch_size=100))
+        memory.add_exchange("C1:1.0", "hello", "hi there")
+        memory.close()
+
+        restored = ConversationMemory(store=SQLiteMemoryStore(path))
+        history = restored.get_history("C1:1.0")
+        restored.close()
+        assert [m["content"] for m in history] == ["hello", "hi there"]
+    print("✅ Conversation memory persisted to SQLite")
+
+def test_top_level_history_per_user():
+    """Top-level messages in a channel keep one history per user; threads are shared"""
+    print("\n=== Conversation Memory Key Test ===")
+    memory = ConversationMemory()
+    memory.add_exchange(build_thread_key("C1", None, "U1"), "my name is Ada", "hi Ada")
+    memory.add_exchange(build_thread_key("C1", None, "U2"), "my name is Bob", "hi Bob")
+    assert [m["content"] for m in memory.get_history(build_thread_key("C1", None, "U2"))] == ["my name is Bob", "hi Bob"]
+    assert build_thread_key("C1", "1.0", "U1") == build_thread_key("C1", "1.0", "U2") == "C1:1.0"
+    assert build_thread_key("C1") == "C1"
+    print("✅ Users do not share top-level history")
+
+def test_saves_land_in_order():
+    """Concurrent writers leave the stored thread equal to memory, with writes off the event loop"""
+    print("\n=== Conversation Memory Save Order Test ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "memory.db")
+        store = SQLiteMemoryStore(path, batch_size=1)
+        memory = ConversationMemory(max_turns=50, store=store)
+        writers = [threading.Thread(target=lambda n=n: [memory.add_turn("C1:1.0", "user", f"{n}-{i}")
+                                                        for i in range(20)]) for n in range(4)]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+
+        flush_threads = []
+        flush = store.flush
+        store.flush = lambda: flush_threads.append(threading.current_thread()) or flush()
+        asyncio.run(memory.record_exchange("C1:1.0", "last question", "last answer"))
+        assert flush_threads and threading.main_thread() not in flush_threads
+        expected = memory.get_history("C1:1.0", token_budget=10000)
+        memory.close()
+
+        restored = ConversationMemory(max_turns=50, store=SQLiteMemoryStore(path))
+        history = restored.get_history("C1:1.0", token_budget=10000)
+        restored.close()
+        assert history == expected and history[-1]["content"] == "last answer"
+    print("✅ Stored history matches memory")
+
+def main():
+    """Main test function"""
+    print("🧪 Running conversation memory tests...\n")
+
+    test_ring_buffer_and_summary()
+    test_token_budget()
+    test_lru_eviction()
+    test_sqlite_persistence()
+    test_top_level_history_per_user()
+    test_saves_land_in_order()
+
+    print(f"\n{'=' * 40}")
+    print("🎉 Conversation memory tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for per-request deadlines
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+# Add the current directory and benchmarks to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from deadlines import DeadlineExceeded, check, current_deadline, deadline_scope, has_time, remaining
+from hedging import HedgePolicy
+from main import HypermodeClient
+from mock_llm_server import MockBehavior, MockLLMServer
+from reranking import Reranker, TwoStageRetriever
+from retry_policy import RetryPolicy
+from simple_rag import InvertedIndex
+
+def test_scopes_only_tighten():
+    """Nested scopes never extend the deadline, and worker threads see it"""
+    print("=== Deadline Scope Test ===")
+    assert current_deadline() is None and remaining(default=7.0) == 7.0 and has_time(1e9)
+    with deadline_scope(10.0) as outer:
+        with deadline_scope(60.0) as inner:
+            assert inner == outer
+        with deadline_scope(0.5):
+            assert remaining() <= 0.5 and not has_time(1.0)
+            assert 0 < asyncio.run(asyncio.to_thread(remaining)) <= 0.5
+        assert 9.0 < remaining() <= 10.0
+        assert RetryPolicy(deadline=45.0).new_deadline() <= outer
+    assert current_deadline() is None
+
+    with deadline_scope(0.0):
+        try:
+            check("upstream")
+            assert False, "expected DeadlineExceeded"
+        except DeadlineExceeded as e:
+            assert "upstream" in str(e)
+    print("✅ Deadlines propagate and only tighten")
+
+def test_reranking_skipped_when_short():
+    """With less time left than the reserve, retrieval keeps first-stage order and is not cached"""
+    print("\n=== Optional Reranking Test ===")
+    now = time.time()
+    files = [
+        {"name": "scattered.txt", "modified": now,
+         "text": "Deploy deploy notes. " + "filler " * 30 + "The assistant is described elsewhere."},
+        {"name": "phrase.txt", "modified": now, "text": "How to deploy the assistant in one step."},
+    ]
+    index = InvertedIndex([file["text"] for file in files])
+    retriever = TwoStageRetriever(index, Reranker(files), candidates=5, reserve=2.0)
+    key = index.query_key("deploy assistant")
+    assert retriever.retrieve(key) == ([1, 0], True)
+    with deadline_scope(1.0):
+        assert retriever.retrieve(key) == ([0, 1], False)
+    assert retriever.get_status()["rerank_skipped"] == 1
+    print("✅ Reranking skipped under a short deadline")
+
+def test_upstream_respects_deadline():
+    """Replies stop at the deadline, and hedging is skipped when time is short"""
+    print("\n=== Upstream Deadline Test ===")
+    with MockLLMServer(MockBehavior(latency=0.3)) as server:
+        client = HypermodeClient("test-key", server.base_url,
+                                 hedging=HedgePolicy(enabled=True, default_delay=0.05, min_delay=0.01))
+
+        async def ask(seconds):
+            with deadline_scope(seconds):
+                return await client.generate_response("Hello", "test_user")
+
+        assert asyncio.run(ask(0.0)) == "Sorry, that took too long to answer. Please try again."
+        assert sum(server.stats.values()) == 0
+
+        async def respond(seconds):
+            with deadline_scope(seconds):
+                return await client.respond("Hello", "test_user")
+
+        # The outcome the load limiter sees: a timeout is a failure, however fast it gave up
+        assert asyncio.run(respond(0.0)) == ("Sorry, that took too long to answer. Please try again.", False)
+
+        assert asyncio.run(ask(2.0)).startswith("Mock answer to:")  # Under the 5s reserve: no hedge
+        assert client.hedging.hedges_fired == 0
+        assert asyncio.run(ask(30.0)).startswith("Mock answer to:")
+        assert client.hedging.hedges_fired == 1
+
+        started = time.monotonic()
+        reply = asyncio.run(ask(0.1))
+        assert time.monotonic() - started < 0.3
+        assert reply.startswith("Sorry, I'm having trouble connecting")
+    print("✅ Upstream calls bounded by the request deadline")
+
+def main():
+    """Main test function"""
+    print("🧪 Running deadline tests...\n")
+
+    test_scopes_only_tighten()
+    test_reranking_skipped_when_short()
+    test_upstream_respects_deadline()
+
+    print(f"\n{'=' * 40}")
+    print("🎉 Deadline tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQLite FTS5 retrieval backend
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from fts_index import FTSIndex
+from main import RAGManager
+from retrieval_cache import RetrievalCache
+
+FILES = [
+    {"name": "deploy.md", "text": "Deploying the assistant: deploy to Render, then deploy again."},
+    {"name": "slack.txt", "text": "Slack setup: create an app and add the bot token."},
+    {"name": "cafe.txt", "text": "Notes from the Café in Zürich about deployment."},
+]
+
+def test_search_and_persistence():
+    """bm25 ranking, prefix stems, and an index that survives reopening"""
+    print("=== FTS5 Search Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "fts.db")
+        index = FTSIndex(path, pool_size=2, batch_size=2)
+        assert index.ensure(lambda: FILES, "v1") == 1
+        assert len(index) == 3
+
+        assert index.search("how do I deploy?") == [FILES[0]["text"], FILES[2]["text"]]
+        assert index.search("cafe zurich") == [FILES[2]["text"]]
+        assert index.search("Slack bot setup", max_results=1) == [FILES[1]["text"]]
+        assert index.search("is it the") == []
+        index.close()
+
+        reopened = FTSIndex(path)
+        assert reopened.ensure(lambda: FILES[:1], "v1") == 1  # Fingerprint matches: nothing reindexed
+        assert len(reopened) == 3
+        assert reopened.rebuild(FILES[:1], "v2") == 2
+        assert len(reopened) == 1 and reopened.search("slack") == []
+        assert reopened.get_status()["last_build"]["documents"] == 1
+        reopened.close()
+    print("✅ FTS5 index searches, persists and rebuilds")
+
+def test_exact_stems_and_old_schema():
+    """Stems match inflections but not longer words, and an old index file is rebuilt"""
+    print("\n=== FTS5 Stem Matching Test ===")
+    files = [
+        {"name": "time.txt", "text": "Timing requests: the time each call takes."},
+        {"name": "timber.txt", "text": "Timber framing and a useful user guide to the makefile."},
+        {"name": "make.txt", "text": "Making changes, then make them again."},
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "fts.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        conn.execute("CREATE VIRTUAL TABLE documents USING fts5(name UNINDEXED, body)")
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", [("generation", "3"), ("fingerprint", "v1")])
+        conn.commit()
+        conn.close()
+
+        index = FTSIndex(path)
+        assert index.ensure(lambda: files, "v1") == 4  # Rebuilt despite the matching fingerprint
+        assert index.search("times") == [files[0]["text"]]
+        assert index.search("make") == [files[2]["text"]]
+        assert index.search("use") == []
+        assert index.search("users") == [files[1]["text"]]
+        index.close()
+    print("✅ Exact stems matched and old index rebuilt")
+
+def test_pool_from_worker_threads():
+    """More concurrent queries than connections share the pool"""
+    print("\n=== FTS5 Connection Pool Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        index = FTSIndex(os.path.join(directory, "fts.db"), pool_size=2)
+        index.rebuild(FILES * 50, "pool")
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: index.search_terms(("deploy",), 3), range(64)))
+        assert all(len(doc_ids) == 3 for doc_ids in results)
+        assert index.pool._created <= 2
+        index.close()
+    print("✅ Queries shared two pooled connections")
+
+def test_rag_manager_backend():
+    """RAGManager answers from FTS5 and notices another worker's rebuild"""
+    print("\n=== FTS5 RAGManager Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        data_dir = os.path.join(directory, "data")
+        os.makedirs(data_dir)
+        for file in FILES:
+            with open(os.path.join(data_dir, file["name"]), "w", encoding="utf-8") as f:
+                f.write(file["text"])
+        path = os.path.join(directory, "fts.db")
+        manager = RAGManager(data_dir, fts_index=FTSIndex(path, refresh_interval=0.0),
+                             retrieval_cache=RetrievalCache(16))
+        context = asyncio.run(manager.query_documents("slack token"))
+        assert context.startswith("Slack setup")
+        assert manager._search("Slack tokens?")[1][0].startswith("Slack setup")
+        assert manager.get_status()["retrieval_cache"]["hits"] == 1
+        assert manager.get_status()["backend"] == "fts5"
+
+        other_worker = FTSIndex(path)
+        other_worker.rebuild(FILES[:1], "other")
+        assert manager._search("slack token") == ([], [])
+        assert manager.get_status()["generation"] == 2
+        assert manager.get_status()["documents_loaded"] == 1
+        other_worker.close()
+        manager.fts_index.close()
+    print("✅ RAGManager uses the FTS5 backend")
+
+def main():
+    """Main test function"""
+    print("🧪 Running FTS5 backend tests...\n")
+
+    test_search_and_persistence()
+    test_exact_stems_and_old_schema()
+    test_pool_from_worker_threads()
+    test_rag_manager_backend()
+
+    print(f"\n{'=' * 40}")
+    print("🎉 FTS5 backend tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for hedged requests
+"""
+
+import asyncio
+from hedging import HedgePolicy
+
+def _call(result, delay, log=None, fail=False):
+    async def run():
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if log is not None:
+                log.append(f"{result} cancelled")
+            raise
+        if fail:
+            raise RuntimeError(f"{result} failed")
+        return result
+    return run
+
+def test_fast_primary_does_not_hedge():
+    """No backup is sent when the primary beats the hedge delay"""
+    print("=== Hedging Fast Primary Test ===")
+    policy = HedgePolicy(default_delay=0.2)
+    result = asyncio.run(policy.run("m", _call("primary", 0.01), _call("backup", 0.01)))
+
+    assert result == "primary"
+    assert policy.hedges_fired == 0
+    print("✅ Fast primary returned without hedging")
+
+def test_slow_primary_is_hedged_and_cancelled():
+    """The backup wins against a slow primary, which is then cancelled"""
+    print("\n=== Hedging Slow Primary Test ===")
+    policy = HedgePolicy(default_delay=0.05)
+    log = []
+
+    async def scenario():
+        result = await policy.run("m", _call("primary", 1.0, log), _call("backup", 0.01))
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(scenario()) == "backup"
+    assert log == ["primary cancelled"]
+    status = policy.get_status()
+    assert status["hedges_fired"] == 1 and status["hedges_won"] == 1
+    print(f"✅ Backup won; hedge win rate {status['hedge_win_rate']}")
+
+def test_failed_backup_falls_back_to_primary():
+    """A failing backup does not lose the primary's answer"""
+    print("\n=== Hedging Backup Failure Test ===")
+    policy = HedgePolicy(default_delay=0.02)
+    result = asyncio.run(policy.run("m", _call("primary", 0.1), _call("backup", 0.01, fail=True)))
+
+    assert result == "primary"
+    assert policy.hedges_won == 0
+    print("✅ Primary answer used after backup failure")
+
+def test_budget_caps_hedges():
+    """Hedges stop once the budget is spent"""
+    print("\n=== Hedging Budget Test ===")
+    policy = HedgePolicy(default_delay=0.01, budget_ratio=0.0)
+    policy.budget.tokens = 1.0
+
+    async def scenario():
+        for _ in range(3):
+            await policy.run("m", _call("primary", 0.03), _call("backup", 0.001))
+
+    asyncio.run(scenario())
+    assert policy.hedges_fired == 1
+    assert policy.budget_exhausted == 2
+    print("✅ Hedge budget enforced")
+
+def test_delay_tracks_percentile():
+    """The hedge delay follows the recorded latency percentile"""
+    print("\n=== Hedging Delay Test ===")
+    policy = HedgePolicy(percentile=0.9, min_samples=10, min_delay=0.0)
+    for i in range(1, 101):
+        policy.record_latency("m", i / 100)
+
+    assert abs(policy.delay_for("m") - 0.91) < 1e-9
+    assert policy.delay_for("other") == policy.default_delay
+    print(f"✅ Hedge delay: {policy.delay_for('m')}s")
+
+def test_backup_wins_still_record_primary():
+    """Primaries beaten by the backup still count, so the hedge delay does not drift down"""
+    print("\n=== Hedging Lower Bound Test ===")
+    policy = HedgePolicy(percentile=0.5, min_samples=5, min_delay=0.0)
+    for _ in range(5):
+        policy.record_latency("m", 0.02)
+
+    async def scenario():
+        for _ in range(10):
+            assert await policy.run("m", _call("primary", 1.0), _call("backup", 0.05)) == "backup"
+
+    asyncio.run(scenario())
+    assert policy.hedges_won == 10
+    assert policy.delay_for("m") >= 0.06  # At least the time the primary had run when the backup won
+    print(f"✅ Hedge delay rose to {policy.delay_for('m'):.3f}s")
+
+def main():
+    """Main test function"""
+    print("🧪 Running hedging tests...\n")
+
+    test_fast_primary_does_not_hedge()
+    test_slow_primary_is_hedged_and_cancelled()
+    test_failed_backup_falls_back_to_primary()
+    test_budget_caps_hedges()
+    test_delay_tracks_percentile()
+    test_backup_wins_still_record_primary()
+
+    print(f"\n{'=' * 40}")
+    print("🎉 Hedging tests passed!")
+
+if __name__ == "__main__":
+    main()
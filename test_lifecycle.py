@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Test script for startup readiness tracking
+"""
+
+import asyncio
+from lifecycle import Readiness
+
+def test_ready_after_required_tasks():
+    """Readiness waits for every task, and optional failures do not block it"""
+    print("=== Readiness Tasks Test ===")
+    readiness = Readiness()
+    assert not readiness.is_ready
+
+    async def scenario():
+        async with readiness.track("slack"):
+            pass
+        warmup_started = asyncio.Event()
+
+        async def warm_up():
+            async with readiness.track("rag", required=False):
+                warmup_started.set()
+                await asyncio.sleep(0.05)
+                raise OSError("corpus unreadable")
+
+        task = asyncio.create_task(warm_up())
+        await warmup_started.wait()
+        assert not readiness.is_ready
+        assert await readiness.wait(timeout=1.0)
+        await task
+
+    asyncio.run(scenario())
+    status = readiness.get_status()
+    assert status["ready"]
+    assert status["tasks"]["slack"]["state"] == "ready"
+    assert status["tasks"]["rag"] == {"state": "failed", "required": False, "detail": "corpus unreadable"}
+    assert status["timings"]["rag"] >= 0.05
+    print("✅ Ready once startup tasks finished")
+
+def test_required_failure_blocks_readiness():
+    """A failed required task keeps the service out of rotation"""
+    print("\n=== Readiness Required Failure Test ===")
+    readiness = Readiness()
+
+    async def scenario():
+        try:
+            async with readiness.track("slack"):
+                raise RuntimeError("bad token")
+        except RuntimeError:
+            pass
+        return await readiness.wait(timeout=0.05)
+
+    assert not asyncio.run(scenario())
+    assert readiness.get_status()["tasks"]["slack"]["state"] == "failed"
+    print("✅ Required failure reported as not ready")
+
+def main():
+    """Main test function"""
+    print("🧪 Running lifecycle tests...\n")
+
+    test_ready_after_required_tasks()
+    test_required_failure_blocks_readiness()
+
+    print(f"\n{'=' * 40}")
+    print("🎉 Lifecycle tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for Prometheus-style metrics
+"""
+
+import time
+from metrics import MetricsRegistry
+
+def test_counter_and_gauge_rendering():
+    """Counters and gauges render in the text exposition format"""
+    print("=== Metrics Counter/Gauge Test ===")
+    registry = MetricsRegistry()
+    calls = registry.counter("llm_calls_total", "LLM calls", ["model", "status"])
+    inflight = registry.gauge("inflight", "In-flight requests", ["kind"])
+    docs = registry.gauge("docs", "Documents")
+
+    calls.inc(model="gpt-4", status="200")
+    calls.inc(2, model="gpt-4", status="200")
+    with inflight.track_inprogress(kind="slack"):
+        assert inflight.value(kind="slack") == 1
+    docs.set_function(lambda: 42)
+
+    text = registry.render()
+    assert "# TYPE llm_calls_total counter" in text
+    assert 'llm_calls_total{model="gpt-4",status="200"} 3' in text
+    assert 'inflight{kind="slack"} 0' in text
+    assert "docs 42" in text
+    print("✅ Counters and gauges rendered")
+
+def test_histogram_buckets():
+    """Histogram buckets are cumulative with sum and count"""
+    print("\n=== Metrics Histogram Test ===")
+    registry = MetricsRegistry()
+    stages = registry.histogram("stage_seconds", "Stage latency", ["stage"], buckets=[0.1, 1.0])
+    for value in (0.05, 0.5, 5.0):
+        stages.observe(value, stage="upstream")
+
+    text = registry.render()
+    assert 'stage_seconds_bucket{stage="upstream",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="upstream",le="1"} 2' in text
+    assert 'stage_seconds_bucket{stage="upstream",le="+Inf"} 3' in text
+    assert 'stage_seconds_count{stage="upstream"} 3' in text
+    assert 'stage_seconds_sum{stage="upstream"} 5.55' in text
+    print("✅ Histogram rendered")
+
+def test_labels_are_validated():
+    """Recording with the wrong labels fails loudly"""
+    print("\n=== Metrics Label Validation Test ===")
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls", ["model"])
+    try:
+        calls.inc(status="200")
+        raise AssertionError("wrong labels should raise")
+    except ValueError:
+        pass
+    print("✅ Label mismatch rejected")
+
+def test_recording_overhead():
+    """Recording stays cheap enough for the hot path"""
+    print("\n=== Metrics Overhead Test ===")
+    registry = MetricsRegistry()
+    stages = registry.histogram("stage_seconds", "Stage latency", ["stage"])
+    iterations = 50000
+    started = time.perf_counter()
+    for _ in range(iterations):
+        stages.observe(0.01, stage="retrieval")
+    per_call = (time.perf_counter() - started) / iterations
+    assert per_call < 20e-6
+    print(f"✅ observe() costs {per_call * 1e6:.2f}µs")
+
+def main():
+    """Main test function"""
+    print("🧪 Running metrics tests...\n")
+
+    test_counter_and_gauge_rendering()
+    test_histogram_buckets()
+    test_labels_are_validated()
+    test_recording_overhead()
+
+    print(f"\n{'=' * 40}")
+    print("🎉 Metrics tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test script for cost- and latency-aware model routing
+"""
+
+from model_router import ModelRouter
+
+def _messages(text):
+    return [{"role": "user", "content": text}]
+
+def test_cheapest_model_within_slo():
+    """Simple questions go to the cheapest model"""
+    print("=== Model Router Cost Test ===")
+    router = ModelRouter(latency_slo=8.0)
+    decision = router.choose("hi there", _messages("hi there"))
+
+    assert decision.model == "gpt-3.5-turbo"
+    assert decision.hedge_model is None
+    print(f"✅ Routed to {decision.model} ({decision.reason})")
+
+def test_context_lowers_quality_floor():
+    """Complex questions need a stronger model unless RAG context was found"""
+    print("\n=== Model Router Quality Floor Test ===")
+    router = ModelRouter(latency_slo=8.0)
+    question = "Explain why the deployment failed"
+
+    without_context = router.choose(question, _messages(question), has_context=False)
+    with_context = router.choose(question, _messages(question), has_context=True)
+
+    assert without_context.model == "gpt-4-turbo"
+    assert with_context.model == "gpt-3.5-turbo"
+    print("✅ Retrieved context lets cheaper models answer")
+
+def test_slow_model_is_avoided_and_hedged():
+    """Observed latency over the SLO moves traffic and enables hedging"""
+    print("\n=== Model Router Latency Test ===")
+    router = ModelRouter(latency_slo=5.0, min_samples=3)
+    question = "Explain why the deployment failed"
+    for _ in range(5):
+        router.record("gpt-4-turbo", 9.0, success=True)
+
+    decision = router.choose(question, _messages(question))
+    assert decision.model == "gpt-4"
+
+    for _ in range(5):
+        router.record("gpt-4", 12.0, success=True)
+    decision = router.choose(question, _messages(question))
+    assert decision.model == "gpt-4-turbo"
+    assert decision.hedge_model == "gpt-3.5-turbo"
+
+    table = router.routing_table()
+    assert table["models"]["gpt-4"]["running_slow"]
+    print(f"✅ Slow models avoided; hedge model: {decision.hedge_model}")
+
+def test_failing_model_is_skipped():
+    """Models over the error-rate limit are not routed to"""
+    print("\n=== Model Router Error Rate Test ===")
+    router = ModelRouter(max_error_rate=0.5)
+    for _ in range(10):
+        router.record("gpt-3.5-turbo", 1.0, success=False)
+
+    decision = router.choose("hi", _messages("hi"))
+    assert decision.model != "gpt-3.5-turbo"
+    assert router.routing_table()["models"]["gpt-3.5-turbo"]["error_rate"] == 1.0
+    print(f"✅ Failing model skipped; routed to {decision.model}")
+
+def test_failing_model_recovers():
+    """A single failure does not exclude a model, and excluded models get traffic again"""
+    print("\n=== Model Router Recovery Test ===")
+    now = [0.0]
+    router = ModelRouter(max_error_rate=0.5, min_samples=5, error_window=60.0, clock=lambda: now[0])
+    router.record("gpt-3.5-turbo", 1.0, success=False)
+    assert router.choose("hi", _messages("hi")).model == "gpt-3.5-turbo"
+
+    for _ in range(5):
+        router.record("gpt-3.5-turbo", 1.0, success=False)
+    assert router.choose("hi", _messages("hi")).model != "gpt-3.5-turbo"
+    assert not router.routing_table()["models"]["gpt-3.5-turbo"]["healthy"]
+
+    # Once the failures age out of the window the cheap model is tried again
+    now[0] = 61.0
+    assert router.choose("hi", _messages("hi")).model == "gpt-3.5-turbo"
+    for _ in range(5):
+        router.record("gpt-3.5-turbo", 1.0, success=True)
+    assert router.routing_table()["models"]["gpt-3.5-turbo"]["error_rate"] == 0.0
+    print("✅ Failing model recovers")
+
+def test_slow_model_recovers():
+    """A slow spell stops steering traffic away once its samples leave the latency window"""
+    print("\n=== Model Router Latency Recovery Test ===")
+    now = [0.0]
+    router = ModelRouter(latency_slo=5.0, min_samples=3, latency_window=60.0, clock=lambda: now[0])
+    for _ in range(5):
+        router.record("gpt-3.5-turbo", 9.0, success=True)
+    assert router.choose("hi", _messages("hi")).model != "gpt-3.5-turbo"
+    assert router.is_running_slow("gpt-3.5-turbo")
+
+    # No traffic reaches the slow model, but its samples still age out
+    now[0] = 61.0
+    assert not router.is_running_slow("gpt-3.5-turbo")
+    assert router.choose("hi", _messages("hi")).model == "gpt-3.5-turbo"
+    assert router.routing_table()["models"]["gpt-3.5-turbo"]["p95_latency"] is None
+    print("✅ Slow model recovers")
+
+def main():
+    """Main test function"""
+    print("🧪 Running model router tests...\n")
+
+    test_cheapest_model_within_slo()
+    test_context_lowers_quality_floor()
+    test_slow_model_is_avoided_and_hedged()
+    test_failing_model_is_skipped()
+    test_failing_model_recovers()
+    test_slow_model_recovers()
+
+    print(f"\n{'=' * 40}")
+    print("🎉 Model router tests passed!")
+
+if __name__ == "__main__":
+    main()
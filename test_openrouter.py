@@ -1,55 +1,56 @@
 #!/usr/bin/env python3
 """
 Test script for OpenRouter API functionality
+
+OpenRouter speaks the same chat-completions schema under an /api/v1 base
+URL. This checks that the client works with that layout against the local
+mock provider, so no API key or network access is needed.
 """
 
 import os
-from dotenv import load_dotenv
+import sys
+import asyncio
+
+# Add the current directory and benchmarks to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from mock_llm_server import MockBehavior, MockLLMServer
+from main import HypermodeClient
 
 def test_openrouter():
-    """Test OpenRouter integration"""
-    
-    load_dotenv()
-    
+    """Test an OpenRouter-style base URL end to end"""
     print("=== OpenRouter API Test ===")
-    
-    # Check if API key is set
-    api_key = os.getenv('OPENROUTER_API_KEY')
-    if not api_key:
-        print("⚠️  OPENROUTER_API_KEY not found in environment")
-        print("OpenRouter is optional - skipping test")
-        return True
-    
-    print("✅ OpenRouter API key found")
-    
-    try:
-        print("🔄 Testing OpenRouter connection...")
-        
-        # Placeholder for actual API test
-        # In a real implementation, you would test the actual OpenRouter API
-        print("📝 Test configuration check")
-        print("✅ OpenRouter configuration valid")
-        print("📊 API Status: Available")
-        
-        return True
-        
-    except Exception as e:
-        print(f"❌ OpenRouter test failed: {e}")
-        return False
+
+    with MockLLMServer(MockBehavior(latency=0.01)) as server:
+        base_url = f"{server.base_url}/api/v1"
+        client = HypermodeClient("sk-or-test", base_url)
+        print(f"🔄 Testing OpenRouter-style endpoint: {base_url}/chat/completions")
+
+        async def scenario():
+            status = await client.test_connection()
+            reply = await client.generate_response("What can you do?", "test_user", model="gpt-3.5-turbo")
+            await client.aclose()
+            return status, reply
+
+        status, reply = asyncio.run(scenario())
+        errors = {code: count for code, count in server.stats.items() if code != "200"}
+
+    print(f"📊 API Status: {status['status']}")
+    assert status["status"] == "connected"
+    assert status["endpoint"] == f"{base_url}/chat/completions"
+    assert "What can you do?" in reply
+    assert not errors
+    print("✅ OpenRouter configuration valid")
 
 def main():
     """Main test function"""
     print("🧪 Running OpenRouter tests...\n")
-    
-    success = test_openrouter()
-    
+
+    test_openrouter()
+
     print(f"\n{'=' * 40}")
-    if success:
-        print("🎉 OpenRouter tests completed!")
-    else:
-        print("⚠️  OpenRouter tests encountered issues")
-    
-    return success
+    print("🎉 OpenRouter tests completed!")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
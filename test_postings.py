@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for compact postings
+"""
+
+import random
+from postings import BLOCK_SIZE, CompactPostings
+from simple_rag import InvertedIndex
+
+def _random_lists(seed=3):
+    rng = random.Random(seed)
+    postings, frequencies = [], []
+    for size, universe in [(1, 10), (BLOCK_SIZE, 200), (1000, 2000), (700, 5_000_000), (3 * BLOCK_SIZE + 5, 100_000)]:
+        doc_ids = sorted(rng.sample(range(universe), size))
+        postings.append(doc_ids)
+        frequencies.append([rng.choice([1, 1, 2, 3, 300, 70000]) for _ in doc_ids])
+    return postings, frequencies
+
+def test_round_trip():
+    """Packed postings decode to the original lists, in much less space"""
+    print("=== Postings Round Trip Test ===")
+    postings, frequencies = _random_lists()
+    packed = CompactPostings(postings, frequencies)
+    for term_id, (doc_ids, freqs) in enumerate(zip(postings, frequencies)):
+        assert packed.postings(term_id) == (doc_ids, freqs)
+        assert packed.doc_freq(term_id) == len(doc_ids)
+        assert packed.max_frequency(term_id) == max(freqs)
+    assert packed.posting_count == sum(len(doc_ids) for doc_ids in postings)
+    assert packed.nbytes < 8 * packed.posting_count
+
+    # Serialized for the shared index file and read back in place
+    loaded = CompactPostings.from_buffer(memoryview(b"header" + packed.to_bytes())[6:])
+    for term_id, (doc_ids, freqs) in enumerate(zip(postings, frequencies)):
+        assert loaded.postings(term_id) == (doc_ids, freqs)
+        assert loaded.cursor(term_id).next_geq(doc_ids[-1]) == doc_ids[-1]
+    assert loaded.nbytes == packed.nbytes
+    loaded.release()
+    print(f"✅ {packed.posting_count} postings in {packed.nbytes} bytes")
+
+def test_cursor_seeks():
+    """next_geq lands on the first document at or after the target, skipping blocks"""
+    print("\n=== Postings Cursor Test ===")
+    postings, frequencies = _random_lists()
+    packed = CompactPostings(postings, frequencies)
+    doc_ids = postings[4]
+    cursor = packed.cursor(4)
+    assert cursor.doc == doc_ids[0] and cursor.next() == doc_ids[1]
+    target = doc_ids[-3] - 1
+    assert cursor.next_geq(target) == min(doc for doc in doc_ids if doc >= target)
+    assert cursor.blocks_decoded == 2  # The first block, then straight to the last one
+    assert cursor.next_geq(target) == cursor.doc  # Never moves backwards
+    assert cursor.next_geq(doc_ids[-1] + 1) is None and cursor.next() is None
+    print("✅ Cursor seeks with skip pointers")
+
+def test_intersect():
+    """Intersections match set intersection, through both the seek and decode paths"""
+    print("\n=== Postings Intersect Test ===")
+    rng = random.Random(5)
+    common = sorted(rng.sample(range(50_000), 5000))
+    rare = sorted(rng.sample(common, 20) + rng.sample(range(50_000, 60_000), 10))
+    medium = sorted(rng.sample(range(50_000), 4000))
+    lists = [common, rare, medium]
+    packed = CompactPostings(lists, [[1] * len(doc_ids) for doc_ids in lists])
+    for term_ids in ([0, 1], [0, 2], [0, 1, 2], [2]):
+        expected = sorted(set.intersection(*(set(lists[term_id]) for term_id in term_ids)))
+        doc_ids, totals = packed.intersect(term_ids)
+        assert doc_ids == expected and totals == [len(term_ids)] * len(expected)
+    assert packed.intersect([]) == ([], [])
+    print("✅ Intersections correct")
+
+def test_index_ranks_full_matches_first():
+    """Documents containing every query term outrank ones with more hits of a single term"""
+    print("\n=== Inverted Index Ranking Test ===")
+    documents = ["slack slack slack slack", "slack deploy", "deploy deploy deploy", "deploy slack slack"]
+    index = InvertedIndex(documents)
+    assert index.search("slack deploy", max_results=2) == [documents[3], documents[1]]
+    assert index.search("slack deploy", max_results=3) == [documents[3], documents[1], documents[0]]
+    assert index.search("slack", max_results=4) == [documents[0], documents[3], documents[1]]
+    print("✅ Full matches rank first")
+
+def main():
+    """Main test function"""
+    print("🧪 Running postings tests...\n")
+
+    test_round_trip()
+    test_cursor_seeks()
+    test_intersect()
+    test_index_ranks_full_matches_first()
+
+    print(f"\n{'=' * 40}")
+    print("🎉 Postings tests passed!")
+
+if __name__ == "__main__":
+    main()
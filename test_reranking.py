@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for two-stage retrieval
+"""
+
+import random
+import time
+from reranking import Reranker, TwoStageRetriever
+from simple_rag import MATCH_WEIGHT, InvertedIndex
+
+def _brute_force(index, term_ids, count):
+    scores = {}
+    for term_id in term_ids:
+        for doc_id, freq in zip(*index.postings.postings(term_id)):
+            scores[doc_id] = scores.get(doc_id, 0) + MATCH_WEIGHT + freq
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:count]
+
+def test_candidates_match_exhaustive_scoring():
+    """Pruned candidate generation returns exactly the exhaustive top results"""
+    print("=== Candidate Generation Test ===")
+    rng = random.Random(11)
+    vocabulary = [f"w{i}" for i in range(60)]
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    documents = [" ".join(rng.choices(vocabulary, weights=weights, k=rng.randint(5, 40))) for _ in range(800)]
+    # Two terms that co-occur often while a third rarely joins them exercises the pruned path
+    documents += ["pairone pairtwo " * rng.randint(1, 3) for _ in range(30)] + ["pairone pairtwo lonely"]
+    documents += ["lonely " * rng.randint(1, 5) for _ in range(400)]
+    index = InvertedIndex(documents)
+
+    queries = ["pairone pairtwo lonely", "w0 w1", "w5 w30 w59", "w59", "w2 w3 w4 w5", "nothing"]
+    queries += [" ".join(rng.sample(vocabulary, rng.randint(1, 4))) for _ in range(40)]
+    for query in queries:
+        term_ids = index.query_key(query)
+        for count in (1, 3, 20):
+            candidates, complete = index.candidates(term_ids, count)
+            assert complete
+            assert candidates == _brute_force(index, term_ids, count), query
+
+    late, complete = index.candidates(index.query_key("w0 w1 w2"), 5, deadline=time.perf_counter() - 1)
+    assert not complete and late == []
+    print(f"✅ {len(queries)} queries match exhaustive scoring")
+
+def _files():
+    now = time.time()
+    return [
+        {"name": "scattered.txt", "modified": now,
+         "text": "Deploy notes. " + "filler " * 30 + "The assistant is described elsewhere."},
+        {"name": "phrase.txt", "modified": now, "text": "How to deploy the assistant in one step."},
+        {"name": "guide.md", "modified": now, "text": "# Slack setup\n\nCreate an app, then configure it."},
+        {"name": "notes.txt", "modified": now, "text": "# Slack setup\n\nCreate an app, then configure it."},
+        {"name": "old.md", "modified": now - 3 * 365 * 86400, "text": "Render hosting guide"},
+        {"name": "new.md", "modified": now, "text": "Render hosting guide"},
+    ]
+
+def test_reranker_signals():
+    """Proximity, .md headings and recency each move a document up"""
+    print("\n=== Reranker Signals Test ===")
+    files = _files()
+    reranker = Reranker(files, half_life_days=180)
+    index = InvertedIndex([file["text"] for file in files])
+
+    def rerank(query, doc_ids):
+        terms = {index.terms.term(term_id) for term_id in index.query_key(query)}
+        candidates = _brute_force(index, index.query_key(query), 10)
+        return [doc_id for doc_id in reranker.rerank(candidates, terms) if doc_id in doc_ids]
+
+    assert reranker.proximity(1, {"deploy", "assistant"}) == 1.0
+    assert reranker.proximity(0, {"deploy", "assistant"}) < 0.1
+    assert rerank("deploy assistant", {0, 1}) == [1, 0]
+    assert reranker.heading_terms(2) == {"slack", "setup"} and reranker.heading_terms(3) == frozenset()
+    assert rerank("slack setup", {2, 3}) == [2, 3]
+    assert rerank("render hosting", {4, 5}) == [5, 4]
+    assert reranker.rerank([(0, MATCH_WEIGHT)], {"deploy"}, deadline=time.perf_counter() - 1) is None
+    print("✅ Reranking signals applied")
+
+def test_stage_budgets():
+    """A stage over its budget falls back instead of blocking, and is counted"""
+    print("\n=== Stage Budget Test ===")
+    files = _files()
+    index = InvertedIndex([file["text"] for file in files])
+    key = index.query_key("deploy assistant")
+
+    retriever = TwoStageRetriever(index, Reranker(files), candidates=5)
+    assert retriever.retrieve(key, max_results=2) == ([1, 0], True)
+
+    retriever = TwoStageRetriever(index, Reranker(files), candidates=5, rerank_budget=-1.0)
+    doc_ids, complete = retriever.retrieve(key, max_results=2)
+    assert not complete and doc_ids == [doc_id for doc_id, _ in index.candidates(key, 2)[0]]
+    assert retriever.get_status()["rerank_timeouts"] == 1
+
+    retriever = TwoStageRetriever(index, Reranker(files), candidates=5, candidate_budget=-1.0)
+    assert retriever.retrieve(index.query_key("deploy"), max_results=2) == ([], False)
+    assert retriever.get_status()["candidate_timeouts"] == 1
+    print("✅ Budgets enforced per stage")
+
+def main():
+    """Main test function"""
+    print("🧪 Running two-stage retrieval tests...\n")
+
+    test_candidates_match_exhaustive_scoring()
+    test_reranker_signals()
+    test_stage_budgets()
+
+    print(f"\n{'=' * 40}")
+    print("🎉 Two-stage retrieval tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared response cache
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add the benchmarks directory for the mock LLM server
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from mock_llm_server import MockBehavior, MockLLMServer
+from response_cache import ResponseCache
+
+def test_exact_and_normalized_hits():
+    """Punctuation differences hit the normalized key; reordered words and other namespaces miss"""
+    print("=== Response Cache Hit Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResponseCache(os.path.join(directory, "cache.db"))
+        cache.put("How do I deploy the app?", "prefix:1", "Use Render.")
+
+        assert cache.get("how do I  deploy the app?", "prefix:1") == ("Use Render.", "exact")
+        assert cache.get("How do I deploy the app", "prefix:1") == ("Use Render.", "normalized")
+        assert cache.get("Deploy the app: how do I?", "prefix:1") is None
+        assert cache.get("How do I deploy the app?", "prefix:2") is None
+        assert cache.get("How do I delete the app?", "prefix:1") is None
+
+        status = cache.get_status()
+        assert status["hits"] == {"exact": 1, "normalized": 1}
+        assert status["misses"] == 3
+        assert status["entries"] == 2
+
+        cache.put("Does the router depend on the cache?", "prefix:1", "No.")
+        assert cache.get("Does the cache depend on the router?", "prefix:1") is None
+        cache.close()
+    print("✅ Exact and normalized keys hit")
+
+def test_shared_between_workers_with_ttl():
+    """A second connection sees entries written by the first until they expire"""
+    print("\n=== Response Cache Sharing Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cache.db")
+        worker_a = ResponseCache(path, ttl=0.2)
+        worker_b = ResponseCache(path, ttl=0.2)
+
+        worker_a.put("What is RAG?", "ns", "Retrieval-augmented generation.")
+        assert worker_b.get("what is rag", "ns") == ("Retrieval-augmented generation.", "normalized")
+        time.sleep(0.25)
+        assert worker_b.get("What is RAG?", "ns") is None
+        worker_a.close()
+        worker_b.close()
+    print("✅ Entries shared and expired")
+
+def test_prune_bounds_entries():
+    """Pruning keeps only the newest entries"""
+    print("\n=== Response Cache Prune Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResponseCache(os.path.join(directory, "cache.db"), max_entries=10, prune_every=5)
+        for i in range(20):
+            cache.put(f"question {i}", "ns", f"answer {i}")
+        assert cache.get_status()["entries"] <= 10 + 2 * 4
+        assert cache.get("question 19", "ns") == ("answer 19", "exact")
+        cache.close()
+    print("✅ Cache size bounded")
+
+def test_client_caches_per_user():
+    """The client answers a user's repeat from the cache, but not another user's question"""
+    print("\n=== Response Cache Per-User Test ===")
+    from main import HypermodeClient
+    with tempfile.TemporaryDirectory() as directory, MockLLMServer(MockBehavior(latency=0.0)) as server:
+        cache = ResponseCache(os.path.join(directory, "cache.db"))
+        client = HypermodeClient("test-key", server.base_url, response_cache=cache)
+
+        async def ask():
+            return [await client.generate_response("What is RAG?", user)
+                    for user in ("U1", "U1", "U2")]
+
+        answers = asyncio.run(ask())
+        assert all(answer.startswith("Mock answer to:") for answer in answers)
+        assert cache.get_status()["hits"]["exact"] == 1
+        assert sum(server.stats.values()) == 2
+        cache.close()
+    print("✅ Cached answers stay with their user")
+
+def main():
+    """Main test function"""
+    print("🧪 Running response cache tests...\n")
+
+    test_exact_and_normalized_hits()
+    test_shared_between_workers_with_ttl()
+    test_prune_bounds_entries()
+    test_client_caches_per_user()
+
+    print(f"\n{'=' * 40}")
+    print("🎉 Response cache tests passed!")
+
+if __name__ == "__main__":
+    main()
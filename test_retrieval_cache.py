@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Test script for query normalization and the retrieval cache
+"""
+
+import os
+import tempfile
+from main import RAGManager
+from retrieval_cache import RetrievalCache
+from text_analysis import analyze, query_key, stem
+
+def test_query_normalization():
+    """Stop words dropped, words stemmed, order and repeats ignored"""
+    print("=== Query Normalization Test ===")
+    assert analyze("How do I deploy the assistant?") == ["deploy", "assistant"]
+    assert [stem(word) for word in ("deploying", "deployed", "deploys", "deployment")] == ["deploy"] * 4
+    assert stem("class") == "class" and stem("bus") == "bus"
+    assert query_key("Deploying the assistant") == query_key("assistant deploys, deploy!")
+    assert query_key("what is it") == ()
+    print("✅ Queries normalized")
+
+def test_lru_and_generations():
+    """Least recently used entries are evicted; a new generation empties the cache"""
+    print("\n=== Retrieval Cache LRU Test ===")
+    cache = RetrievalCache(max_entries=2)
+    cache.put(1, "a", [0, 1])
+    cache.put(1, "b", [2])
+    assert cache.get(1, "a") == (0, 1)
+    cache.put(1, "c", [3])
+    assert cache.get(1, "b") is None
+    assert cache.get(1, "c") == (3,)
+    assert cache.get(2, "a") is None
+
+    status = cache.get_status()
+    assert status["entries"] == 0 and status["generation"] == 2 and status["invalidations"] == 1
+    assert status["hits"] == 2 and status["misses"] == 2 and status["hit_rate"] == 0.5
+    assert RetrievalCache(max_entries=0).get(1, "a") is None
+    print("✅ LRU eviction and generation invalidation work")
+
+def test_rag_manager_uses_cache():
+    """Reworded questions hit the cache and reloads invalidate it"""
+    print("\n=== RAGManager Retrieval Cache Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, text in [("deploy.md", "# Deploy\nDeploying the assistant on Render"),
+                           ("slack.txt", "Slack setup: create an app and add the bot token")]:
+            with open(os.path.join(directory, name), "w") as f:
+                f.write(text)
+        manager = RAGManager(directory, retrieval_cache=RetrievalCache(max_entries=16))
+        doc_ids, texts = manager._search("How do I deploy the assistant?")
+        assert len(doc_ids) == 1 and "Render" in texts[0]
+        assert manager._search("deploying assistant") == (doc_ids, texts)
+        assert manager._search("is it the") == ([], [])
+
+        results = manager._search_batch(["slack setup", "Slack setup?", "deploy"])
+        assert results[0] == results[1] and "bot token" in results[0][1][0]
+        status = manager.get_status()["retrieval_cache"]
+        assert status["hits"] == 1 and status["misses"] == 3
+
+        assert manager.reload_documents() == "Successfully reloaded 2 documents"
+        manager._search("deploy")
+        status = manager.get_status()["retrieval_cache"]
+        assert status["invalidations"] == 1 and status["entries"] == 1
+
+        # Counts are the manager's own, not whichever manager last set the index size gauge
+        with tempfile.TemporaryDirectory() as other_directory:
+            with open(os.path.join(other_directory, "only.txt"), "w") as f:
+                f.write("A single document")
+            assert RAGManager(other_directory).get_status()["documents_loaded"] == 1
+        assert manager.get_status()["documents_loaded"] == 2
+    print("✅ RAGManager answers repeats from the cache")
+
+def main():
+    """Main test function"""
+    print("🧪 Running retrieval cache tests...\n")
+
+    test_query_normalization()
+    test_lru_and_generations()
+    test_rag_manager_uses_cache()
+
+    print(f"\n{'=' * 40}")
+    print("🎉 Retrieval cache tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for the upstream retry policy
+"""
+
+import asyncio
+import os
+import sys
+import time
+from email.utils import formatdate
+
+import httpx
+
+# Add the current directory and benchmarks to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from deadlines import deadline_scope
+from retry_policy import RetryBudget, RetryPolicy, parse_retry_after
+
+def _policy(**kwargs):
+    """Retry policy that records sleeps instead of waiting"""
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    return RetryPolicy(sleep=fake_sleep, **kwargs), sleeps
+
+def _sender(responses):
+    """Send function replaying a list of statuses/exceptions"""
+    calls = []
+
+    async def send(timeout):
+        item = responses[min(len(calls), len(responses) - 1)]
+        calls.append(timeout)
+        if isinstance(item, Exception):
+            raise item
+        status, headers = item if isinstance(item, tuple) else (item, {})
+        return httpx.Response(status, headers=headers)
+
+    return send, calls
+
+def test_parse_retry_after():
+    """Retry-After accepts delta-seconds and HTTP-dates"""
+    print("=== Retry-After Parsing Test ===")
+    now = time.time()
+    assert parse_retry_after("3") == 3.0
+    assert 9 <= parse_retry_after(formatdate(now + 10, usegmt=True), now=now) <= 10
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+    print("✅ Retry-After parsed")
+
+def test_retries_until_success_and_honors_retry_after():
+    """429 with Retry-After waits at least the advertised time"""
+    print("\n=== Retry Success Test ===")
+    policy, sleeps = _policy(base_delay=0.01, max_delay=0.05)
+    send, calls = _sender([(429, {"Retry-After": "2"}), 500, 200])
+
+    response = asyncio.run(policy.execute(send))
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert sleeps[0] >= 2.0 and sleeps[1] <= 0.05
+    assert policy.retry_after_honored == 1
+    print(f"✅ Succeeded after {policy.retries} retries (sleeps: {[round(s, 3) for s in sleeps]})")
+
+def test_gives_up_and_returns_last_response():
+    """After max attempts the last response is returned to the caller"""
+    print("\n=== Retry Exhaustion Test ===")
+    policy, _ = _policy(max_attempts=3, base_delay=0.01)
+    send, calls = _sender([503])
+
+    response = asyncio.run(policy.execute(send))
+    assert response.status_code == 503
+    assert len(calls) == 3
+    print("✅ Retries bounded by max_attempts")
+
+def test_non_idempotent_requests_only_retry_safe_failures():
+    """Read timeouts are retried only for idempotent requests; connect errors always"""
+    print("\n=== Idempotency Test ===")
+    policy, _ = _policy(base_delay=0.01)
+    send, calls = _sender([httpx.ReadTimeout("slow"), 200])
+    try:
+        asyncio.run(policy.execute(send, idempotent=False))
+        raise AssertionError("read timeout should not be retried")
+    except httpx.ReadTimeout:
+        pass
+    assert len(calls) == 1
+
+    send, calls = _sender([httpx.ConnectError("refused"), 200])
+    assert asyncio.run(policy.execute(send, idempotent=False)).status_code == 200
+    assert not RetryPolicy.is_retryable(status=500, idempotent=False)
+    assert RetryPolicy.is_retryable(status=429, idempotent=False)
+    print("✅ Only safe failures retried for non-idempotent requests")
+
+def test_budget_and_deadline_stop_retries():
+    """An empty budget or a passed deadline stops retrying"""
+    print("\n=== Retry Budget and Deadline Test ===")
+    budget = RetryBudget(ratio=0.0)
+    budget.tokens = 0.0
+    policy, _ = _policy(budget=budget)
+    send, calls = _sender([500, 200])
+    assert asyncio.run(policy.execute(send)).status_code == 500
+    assert policy.budget_exhausted == 1
+
+    policy, _ = _policy()
+    send, calls = _sender([(429, {"Retry-After": "5"}), 200])
+    response = asyncio.run(policy.execute(send, deadline=time.monotonic() + 1.0))
+    assert response.status_code == 429
+    assert policy.deadline_exceeded == 1
+    assert calls[0] <= 1.0
+    print("✅ Budget and deadline respected")
+
+def test_slo_cutoff_falls_back_without_retrying():
+    """A primary slower than the SLO is cut off once, not retried, and the faster model answers"""
+    print("\n=== SLO Cut-off Test ===")
+    from main import HypermodeClient
+    from mock_llm_server import MockBehavior, MockLLMServer
+    from model_router import ModelRouter
+
+    router = ModelRouter(latency_slo=0.3, min_samples=3)
+    for _ in range(3):
+        router.record("gpt-4-turbo", 0.5, success=True)
+        router.record("gpt-4", 0.6, success=True)
+        router.record("gpt-3.5-turbo", 0.01, success=True)
+    question = "Explain why the deployment failed"
+
+    with MockLLMServer(MockBehavior(latency=0.01, model_latency={"gpt-4-turbo": 2.0})) as server:
+        policy = RetryPolicy(base_delay=0.01)
+        client = HypermodeClient("test-key", server.base_url, router=router, retry_policy=policy)
+        client.deadline_reserve = 0.5
+
+        async def ask():
+            with deadline_scope(3.0):
+                return await client.respond(question, "test_user")
+
+        started = time.monotonic()
+        reply, ok = asyncio.run(ask())
+        elapsed = time.monotonic() - started
+    assert ok and reply.startswith("Mock answer to:")
+    assert elapsed < 1.0
+    assert policy.retries == 0
+    assert router.routing_table()["models"]["gpt-4-turbo"]["errors"] == 0
+    print(f"✅ Answered by the hedge model in {elapsed:.2f}s")
+
+def main():
+    """Main test function"""
+    print("🧪 Running retry policy tests...\n")
+
+    test_parse_retry_after()
+    test_retries_until_success_and_honors_retry_after()
+    test_gives_up_and_returns_last_response()
+    test_non_idempotent_requests_only_retry_safe_failures()
+    test_budget_and_deadline_stop_retries()
+    test_slo_cutoff_falls_back_without_retrying()
+
+    print(f"\n{'=' * 40}")
+    print("🎉 Retry policy tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared mmap index
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from shared_index import SharedIndexStore, corpus_fingerprint
+from simple_rag import InvertedIndex
+
+DOCUMENTS = [
+    "The personal assistant answers questions in Slack.",
+    "Deploy the app to Render or Railway; the assistant needs an API key.",
+    "Zebras have stripes. ZEBRA zebra zebra.",
+    "Ünïcödé text about the Assistant and the café, because it can start anywhere.",
+]
+
+def _files(documents):
+    return [{"name": f"doc{i}.txt", "text": doc, "modified": 0.0} for i, doc in enumerate(documents)]
+
+def test_search_matches_inverted_index():
+    """The mmap index holds the same analyzed postings and ranks exactly like InvertedIndex"""
+    print("=== Shared Index Search Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        store = SharedIndexStore(directory)
+        store.rebuild(_files(DOCUMENTS), "v1")
+        index = store.current()
+        inverted = InvertedIndex(DOCUMENTS)
+
+        for query in ["assistant", "the app", "ZEBRA stripes", "café ünïcödé", "deploying", "missing", ""]:
+            expected = inverted.search(query, max_results=3)
+            actual = [index.document(doc_id) for doc_id in index.search(query, max_results=3)]
+            assert actual == expected, (query, actual, expected)
+        # Whole terms only: "us" is not in "because", nor "art" in "start"
+        assert index.search("us art") == []
+        assert len(index) == 4 and index.metadata["terms"] == len(inverted.terms)
+        assert index.metadata["characters"] == sum(len(doc) for doc in DOCUMENTS)
+        assert index.files[3] == _files(DOCUMENTS)[3]
+        index.close()
+    print("✅ Rankings match the inverted index")
+
+def test_manager_ranks_alike_in_both_modes():
+    """RAGManager returns the same reranked results with and without a shared index"""
+    print("\n=== Shared Index Manager Test ===")
+    from main import RAGManager
+
+    with tempfile.TemporaryDirectory() as data_dir, tempfile.TemporaryDirectory() as index_dir:
+        for i, doc in enumerate(DOCUMENTS):
+            with open(os.path.join(data_dir, f"doc{i}.md"), "w", encoding="utf-8") as f:
+                f.write(f"# Notes {i}\n\n{doc}")
+        single = RAGManager(data_dir)
+        shared = RAGManager(data_dir, index_store=SharedIndexStore(index_dir))
+        for query in ["assistant", "the assistant app", "zebra", "us art"]:
+            assert shared._search(query) == single._search(query), query
+        # "us art" has no term in the corpus, so it is answered without searching
+        assert shared.retriever.get_status()["queries"] == 3
+    print("✅ Both modes rank alike")
+
+def test_workers_swap_generations():
+    """A rebuild by one worker is picked up by the others on their next lookup"""
+    print("\n=== Shared Index Generation Swap Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        worker_a = SharedIndexStore(directory)
+        worker_b = SharedIndexStore(directory)
+
+        assert worker_a.ensure(lambda: _files(DOCUMENTS[:2]), "v1") == 1
+        # Same corpus: the second worker maps the existing generation instead of rebuilding
+        assert worker_b.ensure(lambda: 1 / 0, "v1") == 1
+        assert worker_b.current().generation == 1
+
+        assert worker_a.rebuild(_files(DOCUMENTS), "v2") == 2
+        assert worker_b.current().generation == 2
+        assert len(worker_b.current()) == 4
+        assert worker_b.swaps == 1
+
+        worker_a.rebuild(_files(DOCUMENTS[:1]), "v3")
+        files = sorted(name for name in os.listdir(directory) if name.endswith(".idx"))
+        assert files == ["gen-000002.idx", "gen-000003.idx"]
+        # The old generation keeps working for whoever still has it mapped
+        assert len(worker_b._index) == 4
+    print("✅ Workers converged on the new generation")
+
+def test_corpus_fingerprint_changes_with_files():
+    """Adding or editing a document changes the corpus fingerprint"""
+    print("\n=== Shared Index Fingerprint Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        before = corpus_fingerprint(directory)
+        with open(os.path.join(directory, "notes.md"), "w") as f:
+            f.write("hello")
+        after = corpus_fingerprint(directory)
+        with open(os.path.join(directory, "ignored.pdf"), "w") as f:
+            f.write("binary")
+        assert before != after
+        assert corpus_fingerprint(directory) == after
+    print("✅ Fingerprint tracks .txt/.md files")
+
+def main():
+    """Main test function"""
+    print("🧪 Running shared index tests...\n")
+
+    test_search_matches_inverted_index()
+    test_manager_ranks_alike_in_both_modes()
+    test_workers_swap_generations()
+    test_corpus_fingerprint_changes_with_files()
+
+    print(f"\n{'=' * 40}")
+    print("🎉 Shared index tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ Test script for Slack integration functionality
 """
 
 import os
+import time
 import requests
 import json
 from dotenv import load_dotenv
@@ -83,6 +84,18 @@ def test_slack_webhook():
         print(f"❌ Error: {e}")
         return False
 
+def test_retried_events_answered_once():
+    """An event Slack retries is recognised by its event_id until it ages out"""
+    print("\n=== Slack Retry Dedupe Test ===")
+    from main import RecentEvents
+    events = RecentEvents(ttl=0.05)
+    assert events.first_time("Ev1") and events.first_time("Ev2")
+    assert not events.first_time("Ev1") and events.duplicates == 1
+    assert events.first_time(None)  # Payloads without an ID are never dropped
+    time.sleep(0.06)
+    assert events.first_time("Ev1")
+    print("✅ Retried events ignored")
+
 def check_environment():
     """Check Slack environment variables"""
     
@@ -117,6 +130,7 @@ def main():
     # Test endpoints
     status_ok = test_slack_status()
     webhook_ok = test_slack_webhook()
+    test_retried_events_answered_once()
     
     print(f"\n{'=' * 40}")
     if env_ok and status_ok:
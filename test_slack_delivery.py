@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for outbound Slack delivery
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+# Add the benchmarks directory for the mock Slack Web API
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from mock_llm_server import MockBehavior, MockLLMServer
+from retry_policy import RetryPolicy
+from slack_delivery import SlackDelivery, SlackWebClient, build_messages, split_text
+from tracing import InMemorySpanExporter, Tracer
+
+def test_block_kit_chunking():
+    """Long replies split on paragraph breaks into sections, then into several messages"""
+    print("=== Block Kit Chunking Test ===")
+    paragraphs = [f"Paragraph {i}: " + "word " * 300 for i in range(12)]
+    chunks = split_text("\n\n".join(paragraphs), limit=3000)
+    assert all(len(chunk) <= 3000 for chunk in chunks)
+    assert all(chunk.startswith("Paragraph") for chunk in chunks)
+    assert split_text("x" * 7000, limit=3000) == ["x" * 3000, "x" * 3000, "x" * 1000]
+
+    assert build_messages("Short answer") == [{"text": "Short answer", "blocks": [
+        {"type": "section", "text": {"type": "mrkdwn", "text": "Short answer"}}]}]
+    messages = build_messages("\n\n".join(paragraphs), section_limit=1600, max_blocks=5)
+    assert [len(message["blocks"]) for message in messages] == [5, 5, 2]
+    assert all(len(message["text"]) <= 3000 for message in messages)
+    print(f"✅ {len(chunks)} sections, {len(messages)} messages")
+
+async def _deliver(server, replies, **kwargs):
+    client = SlackWebClient("xoxb-test", f"{server.base_url}/api/")
+    delivery = SlackDelivery(client, retry_policy=RetryPolicy(base_delay=0.01, max_retry_after=5.0), **kwargs)
+    started = time.perf_counter()
+    for channel, text in replies:
+        assert delivery.deliver(channel, text, thread_ts="1.0")
+    enqueued = time.perf_counter() - started
+    assert await delivery.drain(timeout=10.0)
+    await delivery.aclose()
+    return delivery, enqueued
+
+def test_per_channel_order_and_rate_limits():
+    """Channels post in order at their own pace and 429s are waited out, not lost"""
+    print("\n=== Per-Channel Delivery Test ===")
+    with MockLLMServer(MockBehavior(slack_channel_interval=0.2)) as server:
+        replies = [("C1", f"first {i}") for i in range(4)] + [("C2", "second 0")]
+        # A bucket allowing bursts faster than the server accepts triggers 429s
+        delivery, enqueued = asyncio.run(_deliver(server, replies, rate=50.0, burst=2))
+        assert enqueued < 0.05  # Handlers never wait on Slack
+        posted = [message["text"] for message in server.slack_messages if message["channel"] == "C1"]
+        assert posted == [f"first {i}" for i in range(4)]
+        assert server.slack_rate_limited > 0 and delivery.rate_limited == server.slack_rate_limited
+        assert delivery.sent == 5 and delivery.failed == 0
+        assert all(message["thread_ts"] == "1.0" for message in server.slack_messages)
+
+    with MockLLMServer(MockBehavior(slack_channel_interval=0.2)) as server:
+        tracer = Tracer(exporter=InMemorySpanExporter(), sample_rate=1.0)
+        client = SlackWebClient("xoxb-test", f"{server.base_url}/api/")
+        delivery = SlackDelivery(client, rate=4.0, burst=1, tracer=tracer)
+
+        async def answer():
+            with tracer.span("slack.answer") as span:
+                for i in range(3):
+                    assert delivery.deliver("C1", f"paced {i}", thread_ts="1.0", event_id="Ev1")
+            assert await delivery.drain(timeout=10.0)
+            await delivery.aclose()
+            return span.context
+
+        trace_id, span_id = asyncio.run(answer())
+        assert server.slack_rate_limited == 0 and delivery.sent == 3
+        assert tracer.force_flush()
+        posts = [span for span in tracer.exporter.spans if span["name"] == "slack.post"]
+        assert len(posts) == 3
+        # Each post is its own trace, linked to the span that queued it and tagged with the event
+        assert all(post["links"] == [{"traceId": trace_id, "spanId": span_id}] for post in posts)
+        assert all({"key": "slack.event_id", "value": {"stringValue": "Ev1"}} in post["attributes"] for post in posts)
+        tracer.shutdown()
+    print("✅ Delivered in order within rate limits")
+
+def test_full_queue_and_failures():
+    """A full queue drops the reply and Slack errors are counted, not raised"""
+    print("\n=== Delivery Failure Test ===")
+
+    async def run(server):
+        delivery = SlackDelivery(SlackWebClient("xoxb-test", f"{server.base_url}/missing/"), max_queue=2)
+        assert delivery.deliver("C1", "one") and delivery.deliver("C1", "two")
+        assert not delivery.deliver("C1", "three")
+        assert await delivery.drain(timeout=5.0)
+        await delivery.aclose()
+        return delivery
+
+    with MockLLMServer(MockBehavior()) as server:
+        delivery = asyncio.run(run(server))
+        assert delivery.get_status()["dropped"] == 1 and delivery.failed == 2 and delivery.sent == 0
+
+        # Closing waits a bounded time for the queues, then stops the senders and counts what was left
+        async def close_backlog():
+            delivery = SlackDelivery(SlackWebClient("xoxb-test", f"{server.base_url}/api/"), rate=1.0, burst=1)
+            for i in range(4):
+                delivery.deliver("C1", f"reply {i}")
+            task = delivery._channels["C1"].task
+            started = time.perf_counter()
+            undelivered = await delivery.aclose(timeout=0.3)
+            assert time.perf_counter() - started < 1.0 and task.done()
+            return delivery, undelivered
+        delivery, undelivered = asyncio.run(close_backlog())
+        assert delivery.sent == 1 and undelivered == 3
+    print("✅ Failures counted, unsent replies reported at close")
+
+def main():
+    """Main test function"""
+    print("🧪 Running Slack delivery tests...\n")
+
+    test_block_kit_chunking()
+    test_per_channel_order_and_rate_limits()
+    test_full_queue_and_failures()
+
+    print(f"\n{'=' * 40}")
+    print("🎉 Slack delivery tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for text analysis and the inverted index
+"""
+
+from simple_rag import InvertedIndex
+from text_analysis import TermDictionary, analyze, fold, stem, tokenize
+
+DOCUMENTS = [
+    "The personal assistant answers questions in Slack.",
+    "Deploying the assistant: deploy to Render, then deploy again.",
+    "Café résumé notes for the Zürich office",
+    "A document about nothing in particular",
+]
+
+def test_pipeline():
+    """Punctuation, case and accents are folded away; stop words dropped"""
+    print("=== Text Analysis Test ===")
+    assert fold("Café RÉSUMÉ") == "cafe resume"
+    assert fold("Straße") == "strasse"
+    assert tokenize("assistant? Assistant!") == ["assistant", "assistant"]
+    assert analyze("Is a deployment of the assistant running?") == ["deploy", "assistant", "run"]
+    assert analyze("a the of") == []
+    print("✅ Pipeline normalizes text")
+
+def test_stem_groups():
+    """Inflections of a word share one stem, and words that only share a prefix do not"""
+    print("\n=== Stemming Test ===")
+    groups = [
+        ("query", "queries", "queried", "querying"),
+        ("policy", "policies"),
+        ("make", "makes", "making"),
+        ("use", "uses", "using", "used"),
+        ("time", "times", "timing"),
+        ("configure", "configured", "configuring", "configuration"),
+        ("status", "statuses"),
+        ("agree", "agreed", "agreeing"),
+        ("need", "needed", "needs"),
+        ("cookie", "cookies"),
+        ("movie", "movies"),
+        ("try", "tries", "tried"),
+        ("analysis", "analyses"),
+        ("crisis", "crises"),
+        ("bias", "biases", "biased"),
+        ("alias", "aliases"),
+        ("die", "dies", "died"),
+        ("day", "days"),
+    ]
+    for group in groups:
+        assert len({stem(word) for word in group}) == 1, [stem(word) for word in group]
+    distinct = [
+        ("use", "user", "useful"),
+        ("news", "new"),
+    ]
+    for words in distinct:
+        assert len({stem(word) for word in words}) == len(words), [stem(word) for word in words]
+    assert stem("timber") != stem("time") and stem("makefile") != stem("make")
+    print("✅ Inflections share a stem")
+
+def test_term_dictionary():
+    """Terms get dense, stable IDs"""
+    print("\n=== Term Dictionary Test ===")
+    terms = TermDictionary()
+    assert [terms.intern(term) for term in ("deploy", "slack", "deploy")] == [0, 1, 0]
+    assert terms.lookup("slack") == 1 and terms.lookup("render") is None
+    assert terms.term(0) == "deploy" and len(terms) == 2
+    print("✅ Terms interned")
+
+def test_inverted_index():
+    """Queries match analyzed terms and rank by term frequency"""
+    print("\n=== Inverted Index Test ===")
+    index = InvertedIndex(DOCUMENTS)
+    assert index.search("assistant?") == [DOCUMENTS[0], DOCUMENTS[1]]
+    assert index.search("how do I deploy it") == [DOCUMENTS[1]]
+    assert index.search("a") == []
+    assert index.search("cafe zurich") == [DOCUMENTS[2]]
+    assert index.search("CAFÉ") == [DOCUMENTS[2]]
+    assert index.search("unknownword") == []
+    # Terms absent from the corpus are left out of the key
+    assert index.query_key("deploy unknownword") == index.query_key("deploying")
+    assert index.search("assistant", max_results=1) == [DOCUMENTS[0]]
+    print("✅ Inverted index search works")
+
+def main():
+    """Main test function"""
+    print("🧪 Running text analysis tests...\n")
+
+    test_pipeline()
+    test_stem_groups()
+    test_term_dictionary()
+    test_inverted_index()
+
+    print(f"\n{'=' * 40}")
+    print("🎉 Text analysis tests passed!")
+
+if __name__ == "__main__":
+    main()
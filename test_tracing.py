@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test script for request tracing
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from tracing import FileSpanExporter, InMemorySpanExporter, Tracer, current_span, detached_context, root_span
+
+def _attributes(span):
+    return {item["key"]: item["value"] for item in span["attributes"]}
+
+def test_span_tree_across_tasks():
+    """Nested spans, including ones in child tasks, share a trace and link to their parent"""
+    print("=== Tracing Span Tree Test ===")
+    exporter = InMemorySpanExporter()
+    tracer = Tracer(exporter=exporter, sample_rate=1.0)
+
+    async def attempt(endpoint):
+        with tracer.span("llm.request", **{"url.full": endpoint}) as span:
+            await asyncio.sleep(0.01)
+            span.set_attribute("http.response.status_code", 200)
+
+    async def handle():
+        with tracer.span("slack.handle_message", **{"slack.channel": "C1"}):
+            with tracer.span("rag.query_documents") as span:
+                span.set_attribute("rag.chunk_ids", ["doc-0", "doc-3"])
+            with tracer.span("upstream"):
+                await asyncio.gather(attempt("a"), asyncio.ensure_future(attempt("b")))
+
+    asyncio.run(handle())
+    assert tracer.force_flush()
+    spans = {span["name"] + _attributes(span).get("url.full", {}).get("stringValue", ""): span
+             for span in exporter.spans}
+
+    root = spans["slack.handle_message"]
+    assert "parentSpanId" not in root
+    assert len({span["traceId"] for span in spans.values()}) == 1
+    assert spans["rag.query_documents"]["parentSpanId"] == root["spanId"]
+    assert spans["llm.requesta"]["parentSpanId"] == spans["upstream"]["spanId"]
+    assert spans["llm.requestb"]["parentSpanId"] == spans["upstream"]["spanId"]
+    chunk_ids = _attributes(spans["rag.query_documents"])["rag.chunk_ids"]["arrayValue"]["values"]
+    assert [value["stringValue"] for value in chunk_ids] == ["doc-0", "doc-3"]
+    assert _attributes(spans["llm.requesta"])["http.response.status_code"] == {"intValue": "200"}
+    assert current_span().span_id == ""
+    tracer.shutdown()
+    print("✅ Spans formed a single tree")
+
+def test_sampling_keeps_slow_and_failed_traces():
+    """Unsampled traces are still exported when they are slow or fail"""
+    print("\n=== Tracing Sampling Test ===")
+    exporter = InMemorySpanExporter()
+    tracer = Tracer(exporter=exporter, sample_rate=0.0, slow_threshold=0.05)
+
+    with tracer.span("fast"):
+        pass
+    with tracer.span("slow"):
+        time.sleep(0.06)
+    try:
+        with tracer.span("failed"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+
+    assert tracer.force_flush()
+    names = sorted(span["name"] for span in exporter.spans)
+    assert names == ["failed", "slow"]
+    failed = next(span for span in exporter.spans if span["name"] == "failed")
+    assert failed["status"] == {"code": 2, "message": "RuntimeError: boom"}
+    assert tracer.get_status()["traces_kept_as_slow"] == 1
+    tracer.shutdown()
+    print(f"✅ Kept {names} out of 3 traces at sample rate 0")
+
+def test_file_export_is_otlp_json():
+    """The file exporter writes one OTLP/JSON export request per line"""
+    print("\n=== Tracing File Export Test ===")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "traces", "traces.jsonl")
+        tracer = Tracer(service_name="assistant-test", exporter=FileSpanExporter(path))
+        with tracer.span("root"):
+            with tracer.span("child"):
+                pass
+        tracer.shutdown()
+
+        with open(path) as f:
+            requests = [json.loads(line) for line in f]
+
+    resource_spans = requests[0]["resourceSpans"][0]
+    assert _attributes(resource_spans["resource"]) == {"service.name": {"stringValue": "assistant-test"}}
+    spans = resource_spans["scopeSpans"][0]["spans"]
+    assert [span["name"] for span in spans] == ["child", "root"]
+    assert len(spans[0]["traceId"]) == 32 and len(spans[0]["spanId"]) == 16
+    assert int(spans[1]["endTimeUnixNano"]) >= int(spans[1]["startTimeUnixNano"])
+    print("✅ OTLP/JSON written")
+
+def test_disabled_tracer_is_noop():
+    """Without an exporter spans cost nothing and record nothing"""
+    print("\n=== Tracing Disabled Test ===")
+    tracer = Tracer()
+    with tracer.span("root", model="gpt-4") as span:
+        span.set_attribute("ignored", True)
+        assert current_span().span_id == ""
+    assert not tracer.enabled
+    assert tracer.get_status()["traces_started"] == 0
+    print("✅ Disabled tracer recorded nothing")
+
+def test_detached_work_starts_its_own_trace():
+    """Background tasks created with detached_context are new traces linked to the request's"""
+    print("\n=== Tracing Detached Context Test ===")
+    exporter = InMemorySpanExporter()
+    tracer = Tracer(exporter=exporter, sample_rate=1.0)
+
+    async def background():
+        with tracer.span("slack.answer"):
+            await asyncio.sleep(0.01)
+            # Work queued from here (e.g. a Slack post) links to this span in turn
+            origin = current_span().context
+        with tracer.span("slack.post", links=[origin]):
+            pass
+
+    async def handle():
+        with tracer.span("POST /slack/events"):
+            with tracer.span("slack.handle_message"):
+                root_span().set_attribute("slack.event_id", "Ev1")
+                task = asyncio.get_running_loop().create_task(background(), context=detached_context())
+        await task
+
+    asyncio.run(handle())
+    assert tracer.force_flush()
+    spans = {span["name"]: span for span in exporter.spans}
+    request, handler, answer, post = (spans[name] for name in
+                                      ("POST /slack/events", "slack.handle_message", "slack.answer", "slack.post"))
+    assert "parentSpanId" not in answer and answer["traceId"] != request["traceId"]
+    assert _attributes(request)["slack.event_id"] == {"stringValue": "Ev1"}
+    # Each trace's root links to the span that started it
+    assert answer["links"] == [{"traceId": request["traceId"], "spanId": handler["spanId"]}]
+    assert post["links"] == [{"traceId": answer["traceId"], "spanId": answer["spanId"]}]
+    assert "links" not in request and tracer.traces_started == 3
+    tracer.shutdown()
+    print("✅ Background work traced separately, linked to its request")
+
+def main():
+    """Main test function"""
+    print("🧪 Running tracing tests...\n")
+
+    test_span_tree_across_tasks()
+    test_sampling_keeps_slow_and_failed_traces()
+    test_file_export_is_otlp_json()
+    test_disabled_tracer_is_noop()
+    test_detached_work_starts_its_own_trace()
+
+    print(f"\n{'=' * 40}")
+    print("🎉 Tracing tests passed!")
+
+if __name__ == "__main__":
+    main()
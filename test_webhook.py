@@ -1,68 +1,65 @@
 #!/usr/bin/env python3
 """
-Test script for the SMS webhook endpoint
-Run this to test your webhook locally without Twilio
+Test script for the Slack events webhook
+Run this against a local server to send correctly signed Slack events without Slack
 """
 
+import os
+import sys
 import requests
-import json
-
-def test_sms_webhook():
-    """Test the /sms endpoint with sample data"""
-    
-    # Sample Twilio webhook data
-    webhook_data = {
-        "Body": "What's the weather in San Francisco?",
-        "From": "+1234567890",
-        "To": "+0987654321"
-    }
-    
-    # Test the webhook endpoint
+from dotenv import load_dotenv
+
+# Add benchmarks to Python path for the signed event generator
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from slack_events import sign_request, signed_event
+
+SERVER_URL = "http://localhost:8000"
+
+def test_slack_event_webhook():
+    """Test the /slack/events endpoint with a signed message event"""
+
+    load_dotenv()
+    signing_secret = os.getenv("SLACK_SIGNING_SECRET")
+    if not signing_secret:
+        print("⚠️  SLACK_SIGNING_SECRET not set - skipping signed event test")
+        return
+
+    body, headers = signed_event(signing_secret, "What's in the knowledge base?")
+
     try:
-        response = requests.post(
-            "http://localhost:8000/sms",
-            data=webhook_data,
-            headers={"Content-Type": "application/x-www-form-urlencoded"}
-        )
-        
+        response = requests.post(f"{SERVER_URL}/slack/events", data=body, headers=headers)
+
         print(f"Status Code: {response.status_code}")
-        print(f"Response Headers: {dict(response.headers)}")
         print(f"Response Body:\n{response.text}")
-        
+
         if response.status_code == 200:
             print("✅ Webhook test successful!")
         else:
             print("❌ Webhook test failed!")
-            
+
     except requests.exceptions.ConnectionError:
         print("❌ Could not connect to server. Make sure it's running on localhost:8000")
     except Exception as e:
         print(f"❌ Error: {e}")
 
-def test_outbound_sms():
-    """Test the /respond endpoint"""
-    
-    test_data = {
-        "to": "+1234567890",
-        "message": "This is a test message from the SMS Agent Stack!"
-    }
-    
+def test_bad_signature_rejected():
+    """Test that events with an invalid signature are rejected"""
+
+    body, _ = signed_event("not-the-real-secret", "This should be rejected")
+    headers = sign_request("not-the-real-secret", body)
+
     try:
-        response = requests.post(
-            "http://localhost:8000/respond",
-            json=test_data,
-            headers={"Content-Type": "application/json"}
-        )
-        
-        print(f"\nOutbound SMS Test:")
+        response = requests.post(f"{SERVER_URL}/slack/events", data=body, headers=headers)
+
+        print(f"\nBad Signature Test:")
         print(f"Status Code: {response.status_code}")
-        print(f"Response: {response.json()}")
-        
-        if response.status_code == 200:
-            print("✅ Outbound SMS test successful!")
+
+        if response.status_code in (401, 500):
+            print("✅ Unsigned event rejected!")
         else:
-            print("❌ Outbound SMS test failed!")
-            
+            print("❌ Unsigned event was accepted!")
+
     except requests.exceptions.ConnectionError:
         print("❌ Could not connect to server")
     except Exception as e:
@@ -70,36 +67,34 @@ def test_outbound_sms():
 
 def test_health_check():
     """Test the health check endpoint"""
-    
+
     try:
-        response = requests.get("http://localhost:8000/")
-        
+        response = requests.get(f"{SERVER_URL}/")
+
         print(f"\nHealth Check Test:")
         print(f"Status Code: {response.status_code}")
         print(f"Response: {response.json()}")
-        
+
         if response.status_code == 200:
             print("✅ Health check successful!")
         else:
             print("❌ Health check failed!")
-            
+
     except requests.exceptions.ConnectionError:
         print("❌ Could not connect to server")
     except Exception as e:
         print(f"❌ Error: {e}")
 
 if __name__ == "__main__":
-    print("🧪 Testing SMS Agent Stack Webhook")
+    print("🧪 Testing Slack Events Webhook")
     print("=" * 40)
-    
+
     # Test health check first
     test_health_check()
-    
-    # Test SMS webhook
-    test_sms_webhook()
-    
-    # Test outbound SMS (optional - requires Twilio credentials)
-    # test_outbound_sms()
-    
+
+    # Test signed Slack events
+    test_slack_event_webhook()
+    test_bad_signature_rejected()
+
     print("\n" + "=" * 40)
-    print("🎉 Testing complete!") 
\ No newline at end of file
+    print("🎉 Testing complete!")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Text analysis shared by indexing and querying
+
+Turns free text into the terms retrieval works with: word tokens folded
+to lowercase ASCII where possible ("Café" -> "cafe"), minus stop words,
+reduced to a common stem so "deploying", "deployed" and "deploys" all
+become "deploy". Stems need not be words: a final "e" is dropped so that
+"make", "makes" and "making" all become "mak", and a final "y" after a
+consonant becomes "i" so that "query", "queries" and "queried" all become
+"queri" (as do "cookie" and "cookies" -> "cooki"). Documents and queries go
+through the same pipeline, so a term in a query matches exactly the same
+term in the index.
+"""
+
+import re
+import sys
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+STOP_WORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between both
+but by can could did do does doing down during each few for from further had has have having he her here hers
+herself him himself his how i if in into is it its itself just me more most my myself no nor not now of off on
+once only or other our ours ourselves out over own same she should so some such than that the their theirs them
+themselves then there these they this those through to too under until up very was we were what when where which
+while who whom why will with would you your yours yourself yourselves
+""".split())
+
+# Longest first, so "ations" is stripped before "s"
+_SUFFIXES = ("izations", "ational", "ization", "fulness", "ousness", "iveness", "ations", "ements", "ingly",
+             "ation", "ement", "ments", "ness", "ment", "ings", "able", "ible", "edly", "ing", "ies", "ied",
+             "ers", "est", "ed", "er", "ly", "is", "es", "s")
+_UNDOUBLE_AFTER = frozenset({"ing", "ings", "ingly", "ed", "edly", "er", "ers", "est"})
+# Suffixes that replaced a final "e" of a three-letter word ("using", "used", "uses" -> "use")
+_RESTORE_E_AFTER = frozenset({"ing", "ings", "ed", "es"})
+_VOWELS = "aeiou"
+_MIN_STEM = 3
+# Words whose final "s" is not a plural; their own plurals add "es" ("biases" -> "bias")
+_NOT_PLURAL = frozenset({"alias", "atlas", "bias", "canvas", "news", "series", "species"})
+
+
+def stem(word: str) -> str:
+    """Strip a common English suffix and a final "e", keeping at least three characters"""
+    if not word.isalpha():
+        return word
+    # "ss" and "us" endings are not plurals: "class", "status"
+    if len(word) > _MIN_STEM and word not in _NOT_PLURAL and not word.endswith(("ss", "us")):
+        word = _strip_suffix(word)
+    # "query" and "queries" -> "queri", but "day" and "days" keep "day"
+    if len(word) >= _MIN_STEM and word[-1] == "y" and word[-2] not in _VOWELS:
+        word = word[:-1] + "i"
+    return word
+
+
+def _strip_suffix(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if not word.endswith(suffix):
+            continue
+        base = word[:-len(suffix)]
+        if suffix in ("ies", "ied"):
+            # "queries" -> "queri" like "query" and "cookies" -> "cooki" like "cookie"; "died" -> "die"
+            base += "ie" if len(base) == 1 else "i"
+        elif (suffix in _RESTORE_E_AFTER and len(base) == 2 and base[0] in _VOWELS
+              and base[1] not in _VOWELS + "wxy"):
+            base += "e"  # "using" -> "use"
+        elif suffix in ("ed", "es") and len(base) >= _MIN_STEM and base.endswith("e"):
+            base += "e"  # "agreed" -> "agree"
+        if len(base) < _MIN_STEM:
+            continue
+        # "running" -> "runn" -> "run", but "falling" keeps "fall"
+        if suffix in _UNDOUBLE_AFTER and base[-1] == base[-2] and base[-1] not in "aeioulsz":
+            base = base[:-1]
+        word = base
+        break
+    # "configure", "configured" and "configuring" all become "configur"
+    if word.endswith("e") and len(word) > _MIN_STEM:
+        word = word[:-1]
+    return word
+
+
+def fold(text: str) -> str:
+    """Case-fold and strip accents; plain ASCII takes a fast path"""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """Folded word tokens, stop words included"""
+    return TOKEN_PATTERN.findall(fold(text))
+
+
+def normalize_token(token: str) -> Optional[str]:
+    """The term for a folded token, or None for a stop word"""
+    if token in STOP_WORDS:
+        return None
+    return stem(token)
+
+
+def analyze(text: str) -> List[str]:
+    """Stemmed, stop-word-free terms of a text, in order"""
+    return [stem(token) for token in tokenize(text) if token not in STOP_WORDS]
+
+
+def query_key(query: str) -> Tuple[str, ...]:
+    """Order- and repetition-independent terms of a query, for caching"""
+    return tuple(sorted(set(analyze(query))))
+
+
+class TermDictionary:
+    """Interns terms as dense integer IDs so postings and cache keys hold ints, not strings"""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._terms: List[str] = []
+
+    def intern(self, term: str) -> int:
+        """ID for a term, assigning the next one if it is new"""
+        term_id = self._ids.get(term)
+        if term_id is None:
+            term_id = len(self._terms)
+            term = sys.intern(term)
+            self._ids[term] = term_id
+            self._terms.append(term)
+        return term_id
+
+    def lookup(self, term: str) -> Optional[int]:
+        """ID for a known term; None if it was never interned"""
+        return self._ids.get(term)
+
+    def term(self, term_id: int) -> str:
+        return self._terms[term_id]
+
+    def __len__(self) -> int:
+        return len(self._terms)
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Lightweight request tracing
+
+Spans are timed with a contextvar holding the current span, so nested
+`with tracer.span(...)` blocks (including across asyncio tasks) form a
+tree per Slack message. Finished traces are exported in OTLP/JSON to a
+JSON Lines file or an OTLP/HTTP collector from a background thread.
+
+Sampling is decided when a trace finishes: a trace is kept if it drew
+under the sample rate, failed, or took longer than the slow threshold,
+so slow replies are never missed even at a low sample rate.
+
+Work that outlives its request (a Slack reply generated after the event
+was acknowledged, a message posted by a delivery queue) runs as a trace
+of its own, whose root span carries an OTLP link back to the span that
+started it, so the traces of one Slack message can be joined up.
+"""
+
+import asyncio
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [_otlp_value(item) for item in value]}}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+# (trace ID, span ID) of a span another trace links to
+SpanContext = Tuple[str, str]
+
+
+class _Trace:
+    """Spans of one trace, collected until the root span ends"""
+
+    __slots__ = ("trace_id", "spans", "sampled", "error", "root")
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.spans: List["Span"] = []
+        self.sampled = sampled
+        self.error = False
+        self.root: Optional["Span"] = None
+
+
+class Span:
+    """A timed operation with attributes, events and a status"""
+
+    __slots__ = ("name", "kind", "span_id", "parent_id", "trace", "attributes", "events", "links",
+                 "start_ns", "end_ns", "status", "status_message")
+
+    def __init__(self, name: str, trace: _Trace, parent_id: Optional[str], kind: int,
+                 attributes: Dict[str, Any], links: Sequence[SpanContext] = ()):
+        self.name = name
+        self.kind = kind
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.trace = trace
+        self.attributes = attributes
+        self.events: List[dict] = []
+        self.links = list(links)
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    @property
+    def duration(self) -> float:
+        """Seconds, or time so far if still open"""
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    @property
+    def context(self) -> SpanContext:
+        return self.trace_id, self.span_id
+
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def add_event(self, name: str, **attributes):
+        self.events.append({"name": name, "time": time.time_ns(), "attributes": attributes})
+
+    def set_error(self, message: str):
+        self.status = STATUS_ERROR
+        self.status_message = message
+        self.trace.error = True
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        if self.events:
+            span["events"] = [{"name": event["name"], "timeUnixNano": str(event["time"]),
+                               "attributes": _otlp_attributes(event["attributes"])}
+                              for event in self.events]
+        if self.links:
+            span["links"] = [{"traceId": trace_id, "spanId": span_id} for trace_id, span_id in self.links]
+        return span
+
+
+class _NoopSpan:
+    """Stands in for a span when tracing is disabled"""
+
+    trace_id = ""
+    span_id = ""
+    duration = 0.0
+    context = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+    def add_event(self, name: str, **attributes):
+        pass
+
+    def set_error(self, message: str):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+# The span detached work was started from; root spans opened in that work link to it
+_detached_from: ContextVar[Optional[SpanContext]] = ContextVar("detached_from", default=None)
+
+
+def current_span():
+    """The innermost open span in this context, or a no-op span"""
+    return _current_span.get() or NOOP_SPAN
+
+
+def root_span():
+    """The root span of the current trace, or a no-op span"""
+    span = _current_span.get()
+    return span.trace.root if span is not None else NOOP_SPAN
+
+
+def detached_context() -> Context:
+    """A copy of the current context outside any span, for background work that outlives the request
+
+    Spans opened in it start their own trace instead of joining one whose
+    root may already have been exported; that trace's root links back to
+    the span current here.
+    """
+    context = copy_context()
+    span = _current_span.get()
+    context.run(_current_span.set, None)
+    if span is not None:
+        context.run(_detached_from.set, span.context)
+    return context
+
+
+class FileSpanExporter:
+    """Appends one OTLP/JSON export request per line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, request: dict):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(request, separators=(",", ":")) + "\n")
+
+    def shutdown(self):
+        pass
+
+
+class OTLPHttpSpanExporter:
+    """Posts OTLP/JSON export requests to a collector's /v1/traces"""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        endpoint = endpoint.rstrip("/")
+        self.endpoint = endpoint if endpoint.endswith("/v1/traces") else f"{endpoint}/v1/traces"
+        self._client = httpx.Client(timeout=timeout)
+
+    def export(self, request: dict):
+        response = self._client.post(self.endpoint, json=request)
+        response.raise_for_status()
+
+    def shutdown(self):
+        self._client.close()
+
+
+class InMemorySpanExporter:
+    """Keeps export requests in memory, for tests"""
+
+    def __init__(self):
+        self.requests: List[dict] = []
+
+    def export(self, request: dict):
+        self.requests.append(request)
+
+    def shutdown(self):
+        pass
+
+    @property
+    def spans(self) -> List[dict]:
+        return [span for request in self.requests
+                for resource in request["resourceSpans"]
+                for scope in resource["scopeSpans"]
+                for span in scope["spans"]]
+
+
+class BatchSpanProcessor:
+    """Exports finished traces from a background thread so the request path never blocks on I/O"""
+
+    def __init__(self, exporter, to_request, max_queue: int = 2048, max_batch: int = 512,
+                 interval: float = 2.0):
+        self.exporter = exporter
+        self.to_request = to_request
+        self.max_batch = max_batch
+        self.interval = interval
+        self._queue: "queue.Queue[Span]" = queue.Queue(max_queue)
+        self._flush_requested = threading.Event()
+        self._stopped = threading.Event()
+        self._idle = threading.Condition()
+        self._pending = 0
+        self.dropped = 0
+        self.exported = 0
+        self.export_errors = 0
+        self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+        self._thread.start()
+        # Export what is still queued if the process exits without a clean shutdown
+        atexit.register(self.shutdown)
+
+    def on_end(self, spans: List[Span]):
+        for span in spans:
+            try:
+                self._queue.put_nowait(span)
+                with self._idle:
+                    self._pending += 1
+            except queue.Full:
+                self.dropped += 1
+        if self._queue.qsize() >= self.max_batch:
+            self._flush_requested.set()
+
+    def _drain(self):
+        batch: List[Span] = []
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if not batch:
+            return False
+        try:
+            self.exporter.export(self.to_request(batch))
+            self.exported += len(batch)
+        except Exception as e:
+            self.export_errors += 1
+            logger.warning(f"Failed to export {len(batch)} spans: {e}")
+        with self._idle:
+            self._pending -= len(batch)
+            self._idle.notify_all()
+        return True
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._flush_requested.wait(self.interval)
+            self._flush_requested.clear()
+            while self._drain():
+                pass
+
+    def force_flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far has been exported"""
+        self._flush_requested.set()
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending <= 0, timeout)
+
+    def shutdown(self):
+        if self._stopped.is_set():
+            return
+        self.force_flush()
+        self._stopped.set()
+        self._flush_requested.set()
+        self._thread.join(timeout=5.0)
+        self.exporter.shutdown()
+
+
+class Tracer:
+    """Creates spans and hands finished, sampled traces to the exporter"""
+
+    def __init__(self, service_name: str = "personal-assistant", exporter=None, sample_rate: float = 1.0,
+                 slow_threshold: Optional[float] = None, interval: float = 2.0):
+        self.service_name = service_name
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.exporter = exporter
+        self.processor = BatchSpanProcessor(exporter, self._to_request, interval=interval) if exporter else None
+        self.traces_started = 0
+        self.traces_exported = 0
+        self.traces_slow = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.processor is not None
+
+    @contextmanager
+    def span(self, name: str, kind: int = SPAN_KIND_INTERNAL, links: Sequence[Optional[SpanContext]] = (),
+             **attributes) -> Iterator[Any]:
+        """Time a block as a child of the current span, or as a new trace's root
+
+        A new root links to the given span contexts and, in a detached
+        context, to the span the work was detached from.
+        """
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+
+        parent = _current_span.get()
+        if parent is None:
+            self.traces_started += 1
+            trace = _Trace(f"{random.getrandbits(128):032x}", random.random() < self.sample_rate)
+            span = Span(name, trace, None, kind, {k: v for k, v in attributes.items() if v is not None},
+                        [link for link in dict.fromkeys((*links, _detached_from.get())) if link])
+            trace.root = span
+            # Only the first root of detached work links back to where it came from
+            _detached_from.set(None)
+        else:
+            span = Span(name, parent.trace, parent.span_id, kind,
+                        {k: v for k, v in attributes.items() if v is not None})
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except asyncio.CancelledError:
+            span.set_attribute("cancelled", True)
+            raise
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            span.trace.spans.append(span)
+            if parent is None:
+                self._finish(span)
+
+    def _finish(self, root: Span):
+        trace = root.trace
+        slow = self.slow_threshold is not None and root.duration >= self.slow_threshold
+        if slow:
+            self.traces_slow += 1
+        if trace.sampled or trace.error or slow:
+            self.traces_exported += 1
+            self.processor.on_end(trace.spans)
+
+    def _to_request(self, spans: List[Span]) -> dict:
+        """Wrap spans in an OTLP ExportTraceServiceRequest"""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "tracing"},
+                    "spans": [span.to_otlp() for span in spans]
+                }]
+            }]
+        }
+
+    def force_flush(self, timeout: float = 5.0) -> bool:
+        return self.processor.force_flush(timeout) if self.processor else True
+
+    def shutdown(self):
+        if self.processor:
+            self.processor.shutdown()
+
+    def get_status(self) -> dict:
+        status = {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "slow_threshold": self.slow_threshold,
+            "traces_started": self.traces_started,
+            "traces_exported": self.traces_exported,
+            "traces_kept_as_slow": self.traces_slow
+        }
+        if self.processor:
+            status.update({
+                "exporter": type(self.exporter).__name__,
+                "spans_exported": self.processor.exported,
+                "spans_dropped": self.processor.dropped,
+                "export_errors": self.processor.export_errors
+            })
+        return status
+
+
+def create_tracer(export_path: Optional[str] = None, otlp_endpoint: Optional[str] = None,
+                  sample_rate: float = 0.1, slow_threshold: Optional[float] = None,
+                  service_name: str = "personal-assistant") -> Tracer:
+    """Build a tracer from configuration; tracing is off unless an export target is set"""
+    exporter = None
+    if otlp_endpoint:
+        exporter = OTLPHttpSpanExporter(otlp_endpoint)
+    elif export_path:
+        exporter = FileSpanExporter(export_path)
+    return Tracer(service_name, exporter, sample_rate=sample_rate, slow_threshold=slow_threshold)